@@ -8,9 +8,17 @@ from django.urls import path
 from .models import (
     User, Job, JobApplication, SkillBarterPost, SkillBarterOffer,
     CommissionLog, Badge, UserBadge, XPLog, Referral, LoyaltyPointLog, NotificationSettings, Review, CommissionExcuse, Notification,
-    PortfolioItem, SkillBarterApplication
+    AccountStanding,
+    PortfolioItem, SkillBarterApplication, SavedSearch, ArchivedJob, ArchivedJobApplication, ArchivedCommissionLog,
+    NotificationDigestEntry
 )
 from django.utils import timezone
+from .services.background import run_in_background
+from .services.notification_service import fan_out_notifications, materialize_read_watermark
+from .services.loyalty_service import bulk_credit_loyalty_points
+from .services.xp_service import bulk_award_xp
+from .services.notification_counters import invalidate_unread_counts
+from .services.commission_service import refresh_account_standings
 
 # Custom User Admin
 class NotificationForm(forms.Form):
@@ -24,6 +32,8 @@ class UserAdmin(BaseUserAdmin):
     ordering = ('email',)
     filter_horizontal = ()
     list_filter = ('role', 'is_staff', 'is_active')
+    # Kept by atomic updates from the XP ledger; User.save() never writes them
+    readonly_fields = ('xp_points', 'level')
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         ('Personal info', {'fields': ('full_name', 'role', 'is_remote_available', 'service_areas', 'username', 'referral_code', 'xp_points', 'level')}),
@@ -32,7 +42,7 @@ class UserAdmin(BaseUserAdmin):
     )
 
     # Admin Actions
-    actions = ['suspend_users', 'unsuspend_users', 'credit_loyalty_points', 'send_notification']
+    actions = ['suspend_users', 'unsuspend_users', 'credit_loyalty_points', 'award_xp', 'send_notification']
 
     def suspend_users(self, request, queryset):
         queryset.update(is_active=False)
@@ -45,12 +55,17 @@ class UserAdmin(BaseUserAdmin):
     unsuspend_users.short_description = "Unsuspend selected users"
 
     def credit_loyalty_points(self, request, queryset):
-        for user in queryset:
-            # Example: Credit 100 loyalty points for selected users
-            LoyaltyPointLog.objects.create(user=user, points=100, source='admin_credit')
-        self.message_user(request, "Loyalty points credited to selected users.")
+        # Credit 100 loyalty points for selected users, in bulk and off the request thread
+        run_in_background(bulk_credit_loyalty_points, queryset, 100, 'admin_credit')
+        self.message_user(request, "Loyalty points are being credited to selected users.")
     credit_loyalty_points.short_description = "Credit 100 loyalty points to selected users"
 
+    def award_xp(self, request, queryset):
+        # XP is read-only on the form; grants go through the XP service in bulk, off the request thread
+        run_in_background(bulk_award_xp, dict.fromkeys(queryset.values_list('pk', flat=True), 50))
+        self.message_user(request, "XP is being awarded to selected users.")
+    award_xp.short_description = "Award 50 XP to selected users"
+
     def send_notification(self, request, queryset):
         form = NotificationForm(request.POST or None)
 
@@ -58,9 +73,9 @@ class UserAdmin(BaseUserAdmin):
             if form.is_valid():
                 title = form.cleaned_data['title']
                 message = form.cleaned_data['message']
-                for user in queryset:
-                    Notification.objects.create(user=user, title=title, message=message, type="system")
-                self.message_user(request, f"Notification sent to {queryset.count()} users.")
+                # Recipients are streamed and written in bulk by a background worker
+                run_in_background(fan_out_notifications, queryset, title, message, type="system")
+                self.message_user(request, f"Notification queued for {queryset.count()} users.")
                 return HttpResponseRedirect(request.get_full_path())
 
         context = {
@@ -84,6 +99,27 @@ class JobAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     raw_id_fields = ('employer',)
 
+@admin.register(ArchivedJob)
+class ArchivedJobAdmin(admin.ModelAdmin):
+    list_display = ('title', 'employer', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'job_type')
+    search_fields = ('title', 'employer__full_name')
+    raw_id_fields = ('employer',)
+
+@admin.register(ArchivedJobApplication)
+class ArchivedJobApplicationAdmin(admin.ModelAdmin):
+    list_display = ('job', 'freelancer', 'status', 'applied_at')
+    list_filter = ('status',)
+    search_fields = ('job__title', 'freelancer__full_name')
+    raw_id_fields = ('job', 'freelancer')
+
+@admin.register(ArchivedCommissionLog)
+class ArchivedCommissionLogAdmin(admin.ModelAdmin):
+    list_display = ('job', 'total_amount', 'commission_amount', 'status', 'completion_date')
+    list_filter = ('status',)
+    search_fields = ('job__title',)
+    raw_id_fields = ('job',)
+
 # Register other models
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
@@ -116,9 +152,18 @@ class PortfolioItemAdmin(admin.ModelAdmin):
 
 @admin.register(CommissionLog)
 class CommissionLogAdmin(admin.ModelAdmin):
-    list_display = ('job', 'total_amount', 'commission_amount', 'freelancer_earning', 'created_at', 'has_excuse')
-    search_fields = ('job__title',)
+    list_display = ('job', 'freelancer', 'total_amount', 'commission_amount', 'freelancer_earning', 'created_at', 'has_excuse')
+    search_fields = ('job__title', 'freelancer__email')
     list_filter = ('status', 'has_excuse')
+    raw_id_fields = ('job', 'freelancer')
+
+@admin.register(AccountStanding)
+class AccountStandingAdmin(admin.ModelAdmin):
+    list_display = ('user', 'amount_overdue', 'overdue_count', 'oldest_due_date', 'excuse_status', 'is_suspended', 'updated_at')
+    list_filter = ('is_suspended', 'excuse_status')
+    search_fields = ('user__email', 'user__full_name')
+    raw_id_fields = ('user',)
+    readonly_fields = ('updated_at',)
 
 @admin.register(CommissionExcuse)
 class CommissionExcuseAdmin(admin.ModelAdmin):
@@ -128,27 +173,29 @@ class CommissionExcuseAdmin(admin.ModelAdmin):
     raw_id_fields = ('user', 'commission', 'reviewed_by')
     actions = ['approve_excuses', 'reject_excuses']
 
-    def approve_excuses(self, request, queryset):
-        queryset.update(status='approved', reviewed_at=timezone.now(), reviewed_by=request.user)
-        for excuse in queryset:
+    def _review_excuses(self, request, queryset, status):
+        # Read the selection before updating: the changelist may be filtered on status
+        excuses = list(queryset.select_related('commission__job'))
+        CommissionExcuse.objects.filter(pk__in=[excuse.pk for excuse in excuses]).update(
+            status=status, reviewed_at=timezone.now(), reviewed_by=request.user,
+        )
+        # update() skips the post_save hook that keeps AccountStanding current
+        refresh_account_standings(excuse.user_id for excuse in excuses)
+        for excuse in excuses:
             Notification.objects.create(
-                user=excuse.user,
-                title="Commission Excuse Approved",
-                message=f"Your excuse for commission on job '{excuse.commission.job.title}' has been approved.",
+                user_id=excuse.user_id,
+                title=f"Commission Excuse {status.capitalize()}",
+                message=f"Your excuse for commission on job '{excuse.commission.job.title}' has been {status}.",
                 type="commission"
             )
+
+    def approve_excuses(self, request, queryset):
+        self._review_excuses(request, queryset, 'approved')
         self.message_user(request, "Selected excuses have been approved.")
     approve_excuses.short_description = "Approve selected commission excuses"
 
     def reject_excuses(self, request, queryset):
-        queryset.update(status='rejected', reviewed_at=timezone.now(), reviewed_by=request.user)
-        for excuse in queryset:
-            Notification.objects.create(
-                user=excuse.user,
-                title="Commission Excuse Rejected",
-                message=f"Your excuse for commission on job '{excuse.commission.job.title}' has been rejected.",
-                type="commission"
-            )
+        self._review_excuses(request, queryset, 'rejected')
         self.message_user(request, "Selected excuses have been rejected.")
     reject_excuses.short_description = "Reject selected commission excuses"
 
@@ -162,15 +209,29 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread']
 
     def mark_as_read(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
         queryset.update(is_read=True)
+        invalidate_unread_counts(user_ids)
         self.message_user(request, "Selected notifications have been marked as read.")
     mark_as_read.short_description = "Mark selected as read"
 
     def mark_as_unread(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        # Rows under a mark-all-read watermark would still read as read otherwise
+        for user in User.objects.filter(pk__in=user_ids, notifications_read_until__isnull=False):
+            materialize_read_watermark(user)
         queryset.update(is_read=False)
+        invalidate_unread_counts(user_ids)
         self.message_user(request, "Selected notifications have been marked as unread.")
     mark_as_unread.short_description = "Mark selected as unread"
 
+@admin.register(NotificationDigestEntry)
+class NotificationDigestEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'title', 'type', 'created_at')
+    list_filter = ('type',)
+    search_fields = ('user__email', 'title')
+    raw_id_fields = ('user',)
+
 @admin.register(Badge)
 class BadgeAdmin(admin.ModelAdmin):
     list_display = ('name', 'description')
@@ -204,6 +265,13 @@ class NotificationSettingsAdmin(admin.ModelAdmin):
     list_display = ('user', 'job_alerts', 'application_updates', 'new_message_notifications')
     search_fields = ('user__full_name',)
 
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('user', 'name', 'job_type', 'criteria_count', 'is_active', 'created_at')
+    list_filter = ('is_active', 'job_type')
+    search_fields = ('user__full_name', 'name')
+    raw_id_fields = ('user',)
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('job', 'reviewer', 'reviewee', 'rating', 'created_at')
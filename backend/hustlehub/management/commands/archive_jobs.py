@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.archive_service import archive_old_jobs
+
+class Command(BaseCommand):
+    help = 'Moves old closed/expired jobs, their applications and commission logs into the archive tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=180, help='Only archive jobs created more than this many days ago.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Number of jobs to move per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many jobs are eligible.')
+
+    def handle(self, *args, **options):
+        totals = archive_old_jobs(options['older_than_days'], batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{totals['jobs']} jobs are eligible for archiving (dry run, nothing changed).")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {totals['jobs']} jobs, {totals['applications']} applications and {totals['commissions']} commission logs."
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from hustlehub.models import Job
+
+class Command(BaseCommand):
+    help = 'Marks open jobs whose deadline has passed as expired, in batches. Safe to re-run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of jobs to update per batch.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many jobs would expire.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        today = timezone.localdate()
+
+        # Served by the (status, deadline) index
+        stale_jobs = Job.objects.filter(status='open', deadline__lt=today)
+
+        if options['dry_run']:
+            self.stdout.write(f'{stale_jobs.count()} open jobs are past their deadline (dry run, nothing changed).')
+            return
+
+        expired = batches = 0
+        while True:
+            batch_ids = list(stale_jobs.order_by('deadline').values_list('id', flat=True)[:batch_size])
+            if not batch_ids:
+                break
+            # Re-check the status so jobs closed concurrently are left alone
+            expired += Job.objects.filter(id__in=batch_ids, status='open').update(status='expired')
+            batches += 1
+
+        remaining_open = Job.objects.filter(status='open').count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Expired {expired} jobs in {batches} batches. {remaining_open} jobs remain open.'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.notification_service import flush_notification_digests
+
+class Command(BaseCommand):
+    help = 'Delivers buffered low-priority notifications as one digest notification per user. Run every few minutes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-minutes', type=int, default=None, help='Digest window; defaults to NOTIFICATION_DIGEST_WINDOW_MINUTES.')
+        parser.add_argument('--all', action='store_true', help='Flush every pending entry regardless of the window.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of users to flush per transaction.')
+
+    def handle(self, *args, **options):
+        created, flushed = flush_notification_digests(
+            window_minutes=options['window_minutes'],
+            flush_all=options['all'],
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Delivered {flushed} pending entries as {created} digest notifications.'))
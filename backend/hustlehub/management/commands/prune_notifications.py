@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.notification_service import prune_notifications
+
+class Command(BaseCommand):
+    help = 'Deletes old read notifications (and optionally very old unread ones) in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-older-than-days', type=int, default=90, help='Delete read notifications created more than this many days ago.')
+        parser.add_argument('--unread-older-than-days', type=int, default=None, help='Also delete unread notifications older than this many days.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of notifications to delete per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many notifications are eligible.')
+
+    def handle(self, *args, **options):
+        count = prune_notifications(
+            read_older_than_days=options['read_older_than_days'],
+            unread_older_than_days=options['unread_older_than_days'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"{count} notifications are eligible for pruning (dry run, nothing changed).")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} notifications."))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.finance_rollup_service import rebuild_finance_rollups
+
+class Command(BaseCommand):
+    help = 'Recomputes the daily commission and earnings rollups (by county and job category) from the live and archived commission logs.'
+
+    def handle(self, *args, **options):
+        count = rebuild_finance_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} finance rollup rows.'))
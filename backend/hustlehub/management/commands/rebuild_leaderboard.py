@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.leaderboard_service import get_leaderboard
+
+class Command(BaseCommand):
+    help = 'Repopulates the XP leaderboard from User.xp_points (e.g. after bulk XP edits or a Redis flush).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of users to load per batch.')
+
+    def handle(self, *args, **options):
+        board = get_leaderboard()
+        total = board.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Leaderboard ({type(board).__name__}) rebuilt with {total} users.'))
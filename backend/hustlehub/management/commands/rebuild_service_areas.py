@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.geo_service import rebuild_service_areas
+
+class Command(BaseCommand):
+    help = 'Re-resolves every user\'s service_areas into UserServiceArea links (e.g. after bulk edits to wards or counties).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of users to resolve per batch.')
+
+    def handle(self, *args, **options):
+        total = rebuild_service_areas(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} service area links.'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.xp_rollup_service import rebuild_xp_rollups
+
+class Command(BaseCommand):
+    help = 'Recomputes the weekly, monthly and all-time XP rollups (overall and per county) from the XPLog ledger.'
+
+    def handle(self, *args, **options):
+        count = rebuild_xp_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} XP rollup rows.'))
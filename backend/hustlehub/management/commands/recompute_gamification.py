@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from hustlehub.models import User
+from hustlehub.services.gamification_service import recompute_gamification
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes xp_points, level, level badges and loyalty_points for every user from the XPLog and LoyaltyPointLog ledgers. '
+        'Users whose XP was set outside the ledger are reset to their ledger total, so review a --dry-run first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only print what would change.')
+        parser.add_argument('--workers', type=int, default=1, help='Number of parallel workers, each taking a user ID range.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of users to load and write per batch.')
+
+    def handle(self, *args, **options):
+        diffs = recompute_gamification(
+            workers=options['workers'], dry_run=options['dry_run'], chunk_size=options['chunk_size'],
+        )
+
+        if options['dry_run']:
+            emails = dict(User.objects.filter(pk__in=[diff['user_id'] for diff in diffs]).values_list('pk', 'email'))
+            for diff in diffs:
+                changes = [
+                    f"{field} {diff[field][0]} -> {diff[field][1]}"
+                    for field in ('xp_points', 'level', 'loyalty_points') if diff[field][0] != diff[field][1]
+                ]
+                if diff['missing_badges']:
+                    changes.append(f"missing badges: {', '.join(diff['missing_badges'])}")
+                self.stdout.write(f"{emails.get(diff['user_id'], diff['user_id'])}: {'; '.join(changes)}")
+            self.stdout.write(f"{len(diffs)} users would change (dry run, nothing changed).")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Recomputed gamification state; fixed {len(diffs)} users."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.notification_counters import reconcile_unread_counts
+
+class Command(BaseCommand):
+    help = 'Recomputes the cached unread-notification counter for every user to repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of users to recount per query.')
+
+    def handle(self, *args, **options):
+        checked, drifted = reconcile_unread_counts(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reconciled unread counters for {checked} users ({drifted} had drifted).'))
@@ -38,9 +38,11 @@ class Command(BaseCommand):
         ]
 
         for badge_data in badges:
+            # Achievement rules may award a badge named like a level badge, as a separate row
             badge, created = Badge.objects.get_or_create(
                 name=badge_data['name'],
-                defaults={'description': badge_data['description'], 'icon': badge_data['icon'], 'badge_type': badge_data['badge_type']}
+                badge_type=badge_data['badge_type'],
+                defaults={'description': badge_data['description'], 'icon': badge_data['icon']}
             )
             if created:
                 self.stdout.write(self.style.SUCCESS(f'Successfully created badge: {badge_data["name"]}'))
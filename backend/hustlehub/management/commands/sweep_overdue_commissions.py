@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.commission_service import sweep_overdue_commissions, SWEEP_CHUNK_SIZE
+
+class Command(BaseCommand):
+    help = 'Rebuilds every freelancer\'s account standing from overdue commissions and notifies suspension changes. Run daily.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=SWEEP_CHUNK_SIZE, help='Number of standings to write per transaction.')
+
+    def handle(self, *args, **options):
+        written, suspended, reinstated = sweep_overdue_commissions(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {written} account standings; {suspended} suspended, {reinstated} reinstated."
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from hustlehub.services.loyalty_service import verify_loyalty_balances
+
+class Command(BaseCommand):
+    help = 'Checks every User.loyalty_points balance against the LoyaltyPointLog ledger.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Overwrite mismatched balances with the ledger total.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of users to check per query.')
+
+    def handle(self, *args, **options):
+        mismatches = verify_loyalty_balances(fix=options['fix'], chunk_size=options['chunk_size'])
+        for user_id, stored, ledger in mismatches:
+            self.stdout.write(f'{user_id}: stored {stored}, ledger {ledger}')
+
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(mismatches)} loyalty balances.'))
+        elif mismatches:
+            self.stdout.write(self.style.WARNING(f'{len(mismatches)} loyalty balances differ from the ledger; rerun with --fix to repair.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All loyalty balances match the ledger.'))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subcounty',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subcounty',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ward',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ward',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['latitude', 'longitude'], name='hustlehub_j_latitud_91f3dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subcounty',
+            index=models.Index(fields=['latitude', 'longitude'], name='hustlehub_s_latitud_f61bfc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ward',
+            index=models.Index(fields=['latitude', 'longitude'], name='hustlehub_w_latitud_8be805_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:40
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0002_location_coordinates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('job_update', 'Job Update'), ('skill_barter', 'Skill Barter'), ('commission', 'Commission'), ('system', 'System'), ('review', 'Review'), ('badge_unlock', 'Badge Unlock'), ('level_up', 'Level Up'), ('job_alert', 'Job Alert')], default='system', max_length=50),
+        ),
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('skills', models.JSONField(blank=True, default=list)),
+                ('job_type', models.CharField(blank=True, choices=[('remote', 'Remote'), ('local', 'Local')], max_length=10)),
+                ('min_budget', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_budget', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('criteria_count', models.PositiveSmallIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('county', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='hustlehub.county')),
+                ('sub_county', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='hustlehub.subcounty')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+                ('ward', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='hustlehub.ward')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SavedSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='hustlehub.savedsearch')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', 'value'], name='hustlehub_s_dimensi_086298_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0003_saved_searches'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'deadline'], name='hustlehub_j_status_7f740b_idx'),
+        ),
+    ]
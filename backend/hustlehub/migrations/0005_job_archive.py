@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0004_job_status_deadline_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('skills', models.JSONField(blank=True, default=list)),
+                ('job_type', models.CharField(choices=[('remote', 'Remote'), ('local', 'Local')], max_length=10)),
+                ('location', models.CharField(blank=True, max_length=255, null=True)),
+                ('budget', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('status', models.CharField(max_length=20)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hustlehub.jobcategory')),
+                ('county', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hustlehub.county')),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to=settings.AUTH_USER_MODEL)),
+                ('sub_county', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hustlehub.subcounty')),
+                ('ward', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hustlehub.ward')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedCommissionLog',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('commission_percentage', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('commission_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('freelancer_earning', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('paid', 'Paid'), ('due', 'Due')], max_length=10)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('completion_date', models.DateField()),
+                ('created_at', models.DateTimeField()),
+                ('has_excuse', models.BooleanField(default=False)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='commission', to='hustlehub.archivedjob')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedJobApplication',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], max_length=20)),
+                ('applied_at', models.DateTimeField()),
+                ('freelancer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_applications', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='hustlehub.archivedjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['freelancer', 'applied_at'], name='hustlehub_a_freelan_0d85e1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0005_job_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loyaltypointlog',
+            name='source',
+            field=models.CharField(choices=[('job', 'Job Completion'), ('referral', 'Successful Referral'), ('admin_credit', 'Admin Credit')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:50
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('hustlehub', '0006_loyalty_admin_credit_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDigestEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('type', models.CharField(choices=[('job_update', 'Job Update'), ('skill_barter', 'Skill Barter'), ('commission', 'Commission'), ('system', 'System'), ('review', 'Review'), ('badge_unlock', 'Badge Unlock'), ('level_up', 'Level Up'), ('job_alert', 'Job Alert')], default='system', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('object_id', models.CharField(blank=True, max_length=36, null=True)),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_digest_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='hustlehub_n_user_id_3e2fa9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0007_notification_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='notifications_read_until',
+            field=models.DateTimeField(blank=True, help_text='Notifications created up to this time count as read (mark-all-read watermark).', null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('hustlehub', '0008_notification_read_watermark'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='hustlehub_n_user_id_357ee5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at'], name='hustlehub_n_created_3ee616_idx'),
+        ),
+    ]
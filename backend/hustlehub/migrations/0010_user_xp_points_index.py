@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0009_notification_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='xp_points',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
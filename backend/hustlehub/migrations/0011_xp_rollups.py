@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0010_user_xp_points_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XPRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_type', models.CharField(choices=[('week', 'Week'), ('month', 'Month'), ('all_time', 'All Time')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('xp', models.IntegerField(default=0)),
+                ('county', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='hustlehub.county')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='xp_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period_type', 'period_start', 'county', '-xp'], name='hustlehub_x_period__001f8e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'period_type', 'period_start', 'county'), name='unique_xp_rollup_per_county'), models.UniqueConstraint(condition=models.Q(('county__isnull', True)), fields=('user', 'period_type', 'period_start'), name='unique_xp_rollup_overall')],
+            },
+        ),
+    ]
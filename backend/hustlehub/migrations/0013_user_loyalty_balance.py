@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:02
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_loyalty_balances(apps, schema_editor):
+    User = apps.get_model('hustlehub', 'User')
+    LoyaltyPointLog = apps.get_model('hustlehub', 'LoyaltyPointLog')
+    ledger_total = (
+        LoyaltyPointLog.objects.filter(user=OuterRef('pk')).order_by()
+        .values('user').annotate(total=Sum('points')).values('total')
+    )
+    User.objects.update(loyalty_points=Coalesce(Subquery(ledger_total), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0012_achievement_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='loyalty_points',
+            field=models.IntegerField(default=0, help_text="Balance of the user's LoyaltyPointLog ledger, kept in step with each entry."),
+        ),
+        migrations.AlterField(
+            model_name='loyaltypointlog',
+            name='source',
+            field=models.CharField(choices=[('job', 'Job Completion'), ('referral', 'Successful Referral'), ('admin_credit', 'Admin Credit'), ('redemption', 'Redemption')], max_length=20),
+        ),
+        migrations.RunPython(backfill_loyalty_balances, migrations.RunPython.noop),
+    ]
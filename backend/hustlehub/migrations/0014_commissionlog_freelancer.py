@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_commission_freelancers(apps, schema_editor):
+    CommissionLog = apps.get_model('hustlehub', 'CommissionLog')
+    JobApplication = apps.get_model('hustlehub', 'JobApplication')
+    accepted = JobApplication.objects.filter(job_id=OuterRef('job_id'), status='accepted').values('freelancer_id')[:1]
+    CommissionLog.objects.filter(freelancer__isnull=True).update(freelancer_id=Subquery(accepted))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0013_user_loyalty_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commissionlog',
+            name='freelancer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='commission_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_commission_freelancers, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='commissionlog',
+            index=models.Index(fields=['freelancer', 'status', 'due_date'], name='hustlehub_c_freelan_9d7fb7_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0014_commissionlog_freelancer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountStanding',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='account_standing', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('amount_overdue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('overdue_count', models.PositiveIntegerField(default=0)),
+                ('oldest_due_date', models.DateField(blank=True, null=True)),
+                ('excuse_status', models.CharField(choices=[('none', 'None'), ('pending', 'Pending'), ('approved', 'Approved')], default='none', max_length=10)),
+                ('is_suspended', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='commissionlog',
+            index=models.Index(fields=['status', 'due_date'], name='hustlehub_c_status_c650d3_idx'),
+        ),
+    ]
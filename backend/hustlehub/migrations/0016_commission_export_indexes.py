@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0015_account_standing'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commissionlog',
+            index=models.Index(fields=['completion_date'], name='hustlehub_c_complet_a07c2a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commissionlog',
+            index=models.Index(fields=['status', 'completion_date'], name='hustlehub_c_status_9eea62_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0016_commission_export_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFinanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('commission_count', models.IntegerField(default=0)),
+                ('gross_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('commission_due', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('commission_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('freelancer_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='hustlehub.jobcategory')),
+                ('county', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='hustlehub.county')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'county', 'category'), name='unique_finance_rollup'), models.UniqueConstraint(condition=models.Q(('county__isnull', True)), fields=('day', 'category'), name='unique_finance_rollup_no_county'), models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('day', 'county'), name='unique_finance_rollup_no_category'), models.UniqueConstraint(condition=models.Q(('category__isnull', True), ('county__isnull', True)), fields=('day',), name='unique_finance_rollup_no_county_category')],
+            },
+        ),
+    ]
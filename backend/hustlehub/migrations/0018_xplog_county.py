@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_xplog_counties(apps, schema_editor):
+    XPLog = apps.get_model('hustlehub', 'XPLog')
+    Job = apps.get_model('hustlehub', 'Job')
+    county = Job.objects.filter(pk=OuterRef('source_job_id')).values('county_id')[:1]
+    XPLog.objects.filter(county__isnull=True, source_job__isnull=False).update(county_id=Subquery(county))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0017_daily_finance_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='xplog',
+            name='county',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hustlehub.county'),
+        ),
+        migrations.RunPython(backfill_xplog_counties, migrations.RunPython.noop),
+    ]
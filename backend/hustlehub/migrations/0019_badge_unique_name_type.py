@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:31
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_badges(apps, schema_editor):
+    """Folds duplicate (name, badge_type) badges into one, moving their holders across."""
+    Badge = apps.get_model('hustlehub', 'Badge')
+    UserBadge = apps.get_model('hustlehub', 'UserBadge')
+    duplicated = Badge.objects.values('name', 'badge_type').annotate(copies=Count('pk')).filter(copies__gt=1)
+    for group in duplicated:
+        keep, *extras = Badge.objects.filter(name=group['name'], badge_type=group['badge_type']).order_by('pk')
+        for extra in extras:
+            holders = UserBadge.objects.filter(badge=keep).values('user_id')
+            UserBadge.objects.filter(badge=extra, user_id__in=holders).delete()
+            UserBadge.objects.filter(badge=extra).update(badge=keep)
+            extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0018_xplog_county'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_badges, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='badge',
+            constraint=models.UniqueConstraint(fields=('name', 'badge_type'), name='unique_badge_name_type'),
+        ),
+    ]
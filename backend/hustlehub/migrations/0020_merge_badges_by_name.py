@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:02
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_badges_by_name(apps, schema_editor):
+    """
+    Achievement rules used to create their own copy of badges seeded as level badges
+    ('5-Star Streak', 'Client Magnet', 'Skill Barter Champ'). Folds each copy into the
+    level badge, moving its holders across.
+    """
+    Badge = apps.get_model('hustlehub', 'Badge')
+    UserBadge = apps.get_model('hustlehub', 'UserBadge')
+    duplicated = Badge.objects.values('name').annotate(copies=Count('pk')).filter(copies__gt=1)
+    for group in duplicated:
+        keep, *extras = Badge.objects.filter(name=group['name']).order_by('-badge_type', 'pk')
+        for extra in extras:
+            holders = UserBadge.objects.filter(badge=keep).values('user_id')
+            UserBadge.objects.filter(badge=extra, user_id__in=holders).delete()
+            UserBadge.objects.filter(badge=extra).update(badge=keep)
+            extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0019_badge_unique_name_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_badges_by_name, migrations.RunPython.noop),
+    ]
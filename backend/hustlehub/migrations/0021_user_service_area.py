@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from hustlehub.services.geo_service import match_service_areas, service_area_tokens
+
+
+def backfill_service_areas(apps, schema_editor):
+    """Resolves every user's existing service_areas text into UserServiceArea links."""
+    User = apps.get_model('hustlehub', 'User')
+    Ward = apps.get_model('hustlehub', 'Ward')
+    SubCounty = apps.get_model('hustlehub', 'SubCounty')
+    UserServiceArea = apps.get_model('hustlehub', 'UserServiceArea')
+    areas = [
+        (('ward_id', pk), name, county_name, lat, lng)
+        for pk, name, county_name, lat, lng in Ward.objects.values_list('pk', 'name', 'sub_county__county__name', 'latitude', 'longitude')
+    ] + [
+        (('sub_county_id', pk), name, county_name, lat, lng)
+        for pk, name, county_name, lat, lng in SubCounty.objects.values_list('pk', 'name', 'county__name', 'latitude', 'longitude')
+    ]
+    tokens_by_user = {
+        user_id: service_area_tokens(service_areas)
+        for user_id, service_areas in User.objects.exclude(service_areas='').values_list('pk', 'service_areas').iterator()
+    }
+    UserServiceArea.objects.bulk_create(
+        [
+            UserServiceArea(user_id=user_id, latitude=lat, longitude=lng, **{field: pk})
+            for user_id, (field, pk), lat, lng in match_service_areas(tokens_by_user, areas)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0020_merge_badges_by_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserServiceArea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('sub_county', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='hustlehub.subcounty')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='service_area_links', to=settings.AUTH_USER_MODEL)),
+                ('ward', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='hustlehub.ward')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='hustlehub_u_latitud_68319d_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_service_areas, migrations.RunPython.noop),
+    ]
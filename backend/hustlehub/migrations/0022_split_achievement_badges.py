@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:10
+
+from django.db import migrations
+
+# Achievement rules named after level badges: name -> (level that awards the level badge,
+# rule counter, rule threshold, description, icon), as the rules stood when this ran
+SPLIT_BADGES = {
+    'Skill Barter Champ': (12, 'barters_accepted', 5, 'Had 5 skill barter proposals accepted.', '🧠'),
+    'Client Magnet': (13, 'jobs_won', 10, 'Hired for 10 jobs.', '🧲'),
+    '5-Star Streak': (15, 'five_star_streak', 5, 'Received five 5-star reviews in a row.', '💎'),
+}
+
+
+def split_achievement_badges(apps, schema_editor):
+    """
+    0020 folded achievement awards into the same-named level badges, so users below the
+    badge's level hold it and the award was never notified. Gives each rule its own
+    achievement badge: holders below the level move to it, and users whose counter has
+    reached the threshold get it as well.
+    """
+    Badge = apps.get_model('hustlehub', 'Badge')
+    UserBadge = apps.get_model('hustlehub', 'UserBadge')
+    AchievementCounter = apps.get_model('hustlehub', 'AchievementCounter')
+    for name, (level, counter, threshold, description, icon) in SPLIT_BADGES.items():
+        achievement, _ = Badge.objects.get_or_create(
+            name=name, badge_type='achievement', defaults={'description': description, 'icon': icon},
+        )
+        UserBadge.objects.filter(badge__name=name, badge__badge_type='level', user__level__lt=level).update(badge=achievement)
+        earners = AchievementCounter.objects.filter(counter=counter, value__gte=threshold).values_list('user_id', flat=True)
+        UserBadge.objects.bulk_create(
+            [UserBadge(user_id=user_id, badge=achievement) for user_id in earners],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hustlehub', '0021_user_service_area'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_achievement_badges, migrations.RunPython.noop),
+    ]
@@ -68,41 +68,34 @@ class User(AbstractUser):
     skills = models.JSONField(default=list, blank=True)
     username = models.CharField(max_length=150, unique=True)
     referral_code = models.CharField(max_length=50, unique=True, blank=True, null=True)
-    xp_points = models.IntegerField(default=0)
+    xp_points = models.IntegerField(default=0, db_index=True)
+    loyalty_points = models.IntegerField(default=0, help_text="Balance of the user's LoyaltyPointLog ledger, kept in step with each entry.")
     level = models.IntegerField(default=1)
     bio = models.TextField(blank=True, null=True)
     preferred_job_type = models.CharField(max_length=10, choices=PREFERRED_JOB_TYPE_CHOICES, default='PAID')
+    notifications_read_until = models.DateTimeField(null=True, blank=True, help_text="Notifications created up to this time count as read (mark-all-read watermark).")
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['full_name', 'role', 'username']
+    # Written only by atomic UPDATEs (F() increments, guarded level bumps, the read
+    # watermark). A full save() of a stale instance would put old values back, so saving
+    # an existing user leaves these out unless they are named in update_fields.
+    COUNTER_FIELDS = frozenset({'xp_points', 'level', 'loyalty_points', 'notifications_read_until'})
     objects = CustomUserManager()
 
-    def add_xp(self, points):
-        self.xp_points += points
-        self.check_level_up()
-        self.save()
-
-    def check_level_up(self):
-        new_level = self.level
-        while new_level < len(LEVEL_THRESHOLDS) and self.xp_points >= LEVEL_THRESHOLDS[new_level]:
-            new_level += 1
-
-        if new_level > self.level:
-            self.level = new_level
-            self.unlock_level_badge()
-
-    def unlock_level_badge(self):
-        badge_name = BADGE_NAMES[self.level - 1]
-        badge, created = Badge.objects.get_or_create(name=badge_name, badge_type='level')
-        if created:
-            Notification.objects.create(
-                user=self,
-                title="Level Up!",
-                message=f"Congratulations! You've reached level {self.level} and unlocked the {badge_name} badge.",
-                type='level_up',
-                related_object=badge
-            )
-        UserBadge.objects.get_or_create(user=self, badge=badge)
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            skipped = self.COUNTER_FIELDS | self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+    def add_xp(self, points, source_job=None):
+        """Awards XP atomically and levels up; see services.xp_service.award_xp."""
+        from .services.xp_service import award_xp
+        return award_xp(self, points, source_job=source_job)
 
 
 class Profile(models.Model):
@@ -144,6 +137,37 @@ class Job(models.Model):
     deadline = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, default='open')
+    # Optional point for local jobs; falls back to the ward/sub-county centroid on save
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['status', 'deadline']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so save() can tell an area change from explicitly set coordinates
+        instance._loaded_location = tuple(instance.__dict__.get(f) for f in ('ward_id', 'sub_county_id', 'latitude', 'longitude'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_location', None)
+        if loaded is not None:
+            area_changed = (self.ward_id, self.sub_county_id) != loaded[:2]
+            if area_changed and (self.latitude, self.longitude) == loaded[2:]:
+                # The old coordinates belong to the old area
+                self.latitude = self.longitude = None
+        if self.latitude is None or self.longitude is None:
+            for area in (self.ward, self.sub_county):
+                if area is not None and area.latitude is not None and area.longitude is not None:
+                    self.latitude, self.longitude = area.latitude, area.longitude
+                    break
+        super().save(*args, **kwargs)
+        self._loaded_location = (self.ward_id, self.sub_county_id, self.latitude, self.longitude)
 
     def __str__(self):
         return self.title
@@ -218,6 +242,8 @@ class CommissionLog(models.Model):
     STATUS_CHOICES = (('paid', 'Paid'), ('due', 'Due'))
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     job = models.OneToOneField(Job, on_delete=models.CASCADE)
+    # The job's accepted freelancer, stored so per-freelancer reads skip the join through JobApplication
+    freelancer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='commission_logs')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     commission_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=20.0)
     commission_amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -228,6 +254,24 @@ class CommissionLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     has_excuse = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['freelancer', 'status', 'due_date']),
+            # Serves the overdue sweep's scan of due commissions by date
+            models.Index(fields=['status', 'due_date']),
+            # Serve date-range exports, with and without a status filter
+            models.Index(fields=['completion_date']),
+            models.Index(fields=['status', 'completion_date']),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.freelancer_id is None:
+            self.freelancer_id = (
+                JobApplication.objects.filter(job_id=self.job_id, status='accepted')
+                .values_list('freelancer_id', flat=True).first()
+            )
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Commission for {self.job.title}"
 
@@ -243,6 +287,107 @@ class CommissionExcuse(models.Model):
     def __str__(self):
         return f"Excuse by {self.user.email} for commission {self.commission.id if self.commission else 'N/A'}"
 
+class DailyFinanceRollup(models.Model):
+    """
+    Commission and earnings totals per completion day, county and job category, kept
+    current as commission logs are written so finance analytics never aggregate the raw
+    CommissionLog. Archived commissions stay counted. Rows without a county or category
+    hold jobs that have none.
+    """
+    day = models.DateField()
+    county = models.ForeignKey('County', on_delete=models.CASCADE, null=True, blank=True)
+    category = models.ForeignKey(JobCategory, on_delete=models.CASCADE, null=True, blank=True)
+    commission_count = models.IntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission_due = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    freelancer_earnings = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        # Nulls never conflict in a plain unique constraint, so each null pattern gets its own
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'county', 'category'], name='unique_finance_rollup'),
+            models.UniqueConstraint(fields=['day', 'category'], condition=models.Q(county__isnull=True), name='unique_finance_rollup_no_county'),
+            models.UniqueConstraint(fields=['day', 'county'], condition=models.Q(category__isnull=True), name='unique_finance_rollup_no_category'),
+            models.UniqueConstraint(fields=['day'], condition=models.Q(county__isnull=True, category__isnull=True), name='unique_finance_rollup_no_county_category'),
+        ]
+
+    def __str__(self):
+        return f"Finance rollup for {self.day}: {self.commission_count} commissions"
+
+class AccountStanding(models.Model):
+    """
+    A freelancer's overdue commission state, written by the sweep_overdue_commissions job
+    and refreshed when their commissions or excuses change. Request paths read this row.
+    """
+    EXCUSE_STATUS_CHOICES = (('none', 'None'), ('pending', 'Pending'), ('approved', 'Approved'))
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='account_standing')
+    amount_overdue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    oldest_due_date = models.DateField(null=True, blank=True)
+    excuse_status = models.CharField(max_length=10, choices=EXCUSE_STATUS_CHOICES, default='none')
+    is_suspended = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Account standing for {self.user.email}: {'suspended' if self.is_suspended else 'good'}"
+
+
+class ArchivedJob(models.Model):
+    """Cold copy of a closed job, moved out of the hot Job table by the archive_jobs command."""
+    id = models.UUIDField(primary_key=True, editable=False)
+    employer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_jobs')
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    category = models.ForeignKey(JobCategory, on_delete=models.SET_NULL, null=True, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    job_type = models.CharField(max_length=10, choices=Job.JOB_TYPE_CHOICES)
+    location = models.CharField(max_length=255, blank=True, null=True)
+    county = models.ForeignKey('County', on_delete=models.SET_NULL, null=True, blank=True)
+    sub_county = models.ForeignKey('SubCounty', on_delete=models.SET_NULL, null=True, blank=True)
+    ward = models.ForeignKey('Ward', on_delete=models.SET_NULL, null=True, blank=True)
+    budget = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    deadline = models.DateField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    status = models.CharField(max_length=20)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+class ArchivedJobApplication(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    job = models.ForeignKey(ArchivedJob, on_delete=models.CASCADE, related_name='applications')
+    freelancer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_applications')
+    status = models.CharField(max_length=20, choices=JobApplication.STATUS_CHOICES)
+    applied_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['freelancer', 'applied_at']),
+        ]
+
+    def __str__(self):
+        return f"Archived application for {self.job.title} by {self.freelancer.email}"
+
+class ArchivedCommissionLog(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    job = models.OneToOneField(ArchivedJob, on_delete=models.CASCADE, related_name='commission')
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    commission_percentage = models.DecimalField(max_digits=5, decimal_places=2)
+    commission_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    freelancer_earning = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=10, choices=CommissionLog.STATUS_CHOICES)
+    due_date = models.DateField(blank=True, null=True)
+    completion_date = models.DateField()
+    created_at = models.DateTimeField()
+    has_excuse = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"Archived commission for {self.job.title}"
+
 
 class Notification(models.Model):
     NOTIFICATION_TYPES = [
@@ -253,6 +398,7 @@ class Notification(models.Model):
         ("review", "Review"),
         ("badge_unlock", "Badge Unlock"),
         ("level_up", "Level Up"),
+        ("job_alert", "Job Alert"),
     ]
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
@@ -271,11 +417,40 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read']),
+            # Serves the per-user inbox (newest first) and retention scans by age
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
         return f"Notification for {self.user.email}: {self.title}"
 
+    def is_read_for(self, read_until):
+        """Effective read state given the owner's mark-all-read watermark."""
+        return self.is_read or (read_until is not None and self.created_at <= read_until)
+
+class NotificationDigestEntry(models.Model):
+    """A low-priority notification buffered until the user's digest window is flushed."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="pending_digest_entries")
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    type = models.CharField(max_length=50, choices=Notification.NOTIFICATION_TYPES, default='system')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
+    object_id = models.CharField(max_length=36, null=True, blank=True)
+    related_object = GenericForeignKey('content_type', 'object_id')
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Pending digest entry for {self.user.email}: {self.title}"
+
 
 class Badge(models.Model):
     BADGE_TYPES = (('level', 'Level'), ('achievement', 'Achievement'))
@@ -285,6 +460,11 @@ class Badge(models.Model):
     icon = models.CharField(max_length=10, blank=True, null=True)
     badge_type = models.CharField(max_length=20, choices=BADGE_TYPES, default='achievement')
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'badge_type'], name='unique_badge_name_type'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -305,11 +485,56 @@ class XPLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='xp_logs')
     points = models.IntegerField()
     source_job = models.ForeignKey(Job, on_delete=models.SET_NULL, null=True, blank=True)
+    # Copied from source_job so county leaderboards survive the job being archived
+    county = models.ForeignKey('County', on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        if self.county_id is None and self.source_job is not None:
+            self.county_id = self.source_job.county_id
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.email} - {self.points} XP"
 
+class XPRollup(models.Model):
+    """
+    XP earned per user per period, kept current as XP is awarded so time-windowed
+    leaderboards never sum the raw XPLog. Rows with a county count only XP from jobs
+    in that county; rows without one count all XP.
+    """
+    PERIOD_CHOICES = (('week', 'Week'), ('month', 'Month'), ('all_time', 'All Time'))
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='xp_rollups')
+    period_type = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    county = models.ForeignKey('County', on_delete=models.CASCADE, null=True, blank=True)
+    xp = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period_type', 'period_start', 'county'], name='unique_xp_rollup_per_county'),
+            models.UniqueConstraint(fields=['user', 'period_type', 'period_start'], condition=models.Q(county__isnull=True), name='unique_xp_rollup_overall'),
+        ]
+        indexes = [
+            models.Index(fields=['period_type', 'period_start', 'county', '-xp']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} - {self.xp} XP ({self.period_type} from {self.period_start})"
+
+class AchievementCounter(models.Model):
+    """Running per-user tally an achievement rule is evaluated against (e.g. jobs won, 5-star streak)."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='achievement_counters')
+    counter = models.CharField(max_length=50)
+    value = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'counter')
+
+    def __str__(self):
+        return f"{self.user.email} - {self.counter}: {self.value}"
+
 class Referral(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     referrer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='referrals_made')
@@ -324,7 +549,7 @@ class Referral(models.Model):
         return f"{self.referrer.email} referred {self.referred_user_email or 'an unknown user'} (pending)"
 
 class LoyaltyPointLog(models.Model):
-    SOURCE_CHOICES = (('job', 'Job Completion'), ('referral', 'Successful Referral'))
+    SOURCE_CHOICES = (('job', 'Job Completion'), ('referral', 'Successful Referral'), ('admin_credit', 'Admin Credit'), ('redemption', 'Redemption'))
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='loyalty_logs')
     points = models.IntegerField()
@@ -334,6 +559,60 @@ class LoyaltyPointLog(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.points} Loyalty Points ({self.source})"
 
+class SavedSearch(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    county = models.ForeignKey('County', on_delete=models.CASCADE, null=True, blank=True)
+    sub_county = models.ForeignKey('SubCounty', on_delete=models.CASCADE, null=True, blank=True)
+    ward = models.ForeignKey('Ward', on_delete=models.CASCADE, null=True, blank=True)
+    job_type = models.CharField(max_length=10, choices=Job.JOB_TYPE_CHOICES, blank=True)
+    min_budget = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    max_budget = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    # Number of distinct indexed dimensions a job has to match (see SavedSearchTerm)
+    criteria_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def index_terms(self):
+        """(dimension, value) pairs this search is indexed under."""
+        terms = {('skill', str(skill).strip().lower()) for skill in self.skills if str(skill).strip()}
+        for dimension in ('county', 'sub_county', 'ward'):
+            area_id = getattr(self, f'{dimension}_id')
+            if area_id:
+                terms.add((dimension, str(area_id)))
+        if self.job_type:
+            terms.add(('job_type', self.job_type))
+        return terms
+
+    def save(self, *args, **kwargs):
+        terms = self.index_terms()
+        self.criteria_count = len({dimension for dimension, _ in terms})
+        super().save(*args, **kwargs)
+        # Keep the inverted index in step with the filters
+        self.terms.all().delete()
+        SavedSearchTerm.objects.bulk_create(
+            SavedSearchTerm(saved_search=self, dimension=dimension, value=value) for dimension, value in terms
+        )
+
+    def __str__(self):
+        return f"Saved search {self.name or self.id} for {self.user.email}"
+
+class SavedSearchTerm(models.Model):
+    """Inverted index entry: a saved search is listed under each of its filter values."""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='terms')
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['dimension', 'value']),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.value}"
+
 class NotificationSettings(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='notification_settings')
     job_alerts = models.BooleanField(default=True)
@@ -382,9 +661,15 @@ class SubCounty(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
     county = models.ForeignKey(County, on_delete=models.CASCADE, related_name='sub_counties')
+    # Centroid coordinates used for radius search
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
 
     class Meta:
         unique_together = ('name', 'county')
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+        ]
 
     def __str__(self):
         return f"{self.name}, {self.county.name}"
@@ -393,13 +678,39 @@ class Ward(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
     sub_county = models.ForeignKey(SubCounty, on_delete=models.CASCADE, related_name='wards')
+    # Centroid coordinates used for radius search
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
 
     class Meta:
         unique_together = ('name', 'sub_county')
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+        ]
 
     def __str__(self):
         return f"{self.name}, {self.sub_county.name}"
 
+class UserServiceArea(models.Model):
+    """
+    A ward or sub-county that an entry of User.service_areas resolves to. The centroid is
+    copied in so that radius search can use the coordinate index instead of matching
+    free text. Kept in step by signals; `rebuild_service_areas` recomputes every row.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='service_area_links')
+    ward = models.ForeignKey(Ward, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    sub_county = models.ForeignKey(SubCounty, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.ward or self.sub_county}"
+
 class NeighborhoodTag(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100, unique=True)
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .models import AccountStanding
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -47,3 +48,20 @@ class IsFreelancerOrAdmin(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         return request.user and (request.user.role == 'freelancer' or request.user.is_staff)
+
+class IsAdmin(permissions.BasePermission):
+    """
+    Custom permission to only allow admins to access.
+    """
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and (request.user.role == 'admin' or request.user.is_staff)
+
+class IsInGoodStanding(permissions.BasePermission):
+    """
+    Custom permission to block users suspended for overdue commission,
+    as recorded on their AccountStanding.
+    """
+    message = "Your account is suspended until your overdue commission is paid or an excuse is submitted."
+
+    def has_permission(self, request, view):
+        return not AccountStanding.objects.filter(user_id=request.user.pk, is_suspended=True).exists()
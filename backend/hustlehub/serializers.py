@@ -4,7 +4,8 @@ from .models import (
     SkillBarterApplication, SkillBarterOffer, PortfolioItem, CommissionLog,
     CommissionExcuse, Notification, Badge, UserBadge, XPLog, Referral,
     LoyaltyPointLog, NotificationSettings, Review, AboutUs, County,
-    SubCounty, Ward, NeighborhoodTag
+    SubCounty, Ward, NeighborhoodTag, SavedSearch, ArchivedJob, ArchivedJobApplication,
+    ArchivedCommissionLog
 )
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
@@ -14,15 +15,20 @@ from django.db.models import Avg
 
 class UserSerializer(serializers.ModelSerializer):
     average_rating = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ['id', 'email', 'full_name', 'role', 'date_joined', 'last_login', 'username', 'referral_code', 'xp_points', 'bio', 'skills', 'service_areas', 'is_remote_available', 'avatar', 'average_rating']
-        read_only_fields = ['id', 'full_name', 'role', 'date_joined', 'last_login', 'referral_code', 'xp_points', 'average_rating']
+        fields = ['id', 'email', 'full_name', 'role', 'date_joined', 'last_login', 'username', 'referral_code', 'xp_points', 'loyalty_points', 'bio', 'skills', 'service_areas', 'is_remote_available', 'avatar', 'average_rating', 'distance_km']
+        read_only_fields = ['id', 'full_name', 'role', 'date_joined', 'last_login', 'referral_code', 'xp_points', 'loyalty_points', 'average_rating', 'distance_km']
 
     def get_average_rating(self, obj):
         return obj.received_reviews.aggregate(Avg('rating'))['rating__avg']
 
+    def get_distance_km(self, obj):
+        # Only present when the list was filtered with ?near=
+        return getattr(obj, 'distance_km', None)
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -49,16 +55,23 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         )
 
         if referral_code:
+            # Imported here: the service layer imports these serializers
+            from .services.loyalty_service import credit_loyalty_points
             try:
                 referrer = User.objects.get(referral_code=referral_code)
                 Referral.objects.create(referrer=referrer, referred_user=user, is_successful=True)
-                LoyaltyPointLog.objects.create(user=referrer, points=100, source='referral')
+                credit_loyalty_points(referrer, 100, 'referral')
             except User.DoesNotExist:
                 print(f"Warning: Invalid referral code '{referral_code}' provided during signup.")
         return user
 
 
 class RelatedObjectSerializer(serializers.RelatedField):
+    @staticmethod
+    def prefetch_querysets():
+        """Per-type querysets for GenericPrefetch, carrying the joins to_representation needs."""
+        return [Review.objects.select_related('job')]
+
     def to_representation(self, value):
         if isinstance(value, Job):
             return {'type': 'Job', 'id': value.pk, 'title': value.title}
@@ -86,8 +99,22 @@ class NotificationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Fold in the owner's mark-all-read watermark
+        request = self.context.get('request')
+        if request is not None and request.user.pk == instance.user_id:
+            data['is_read'] = instance.is_read_for(request.user.notifications_read_until)
+        return data
+
 class MarkNotificationsAsReadSerializer(serializers.Serializer):
-    ids = serializers.ListField(child=serializers.IntegerField())
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+    all = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if not data['all'] and not data.get('ids'):
+            raise serializers.ValidationError("Provide notification ids, or all=true to mark every notification as read.")
+        return data
 
 class JobCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -96,11 +123,16 @@ class JobCategorySerializer(serializers.ModelSerializer):
 
 class JobSerializer(serializers.ModelSerializer):
     employer = UserSerializer(read_only=True)
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Job
         fields = '__all__'
 
+    def get_distance_km(self, obj):
+        # Only present when the list was filtered with ?near=
+        return getattr(obj, 'distance_km', None)
+
 class JobApplicationSerializer(serializers.ModelSerializer):
     freelancer = UserSerializer(read_only=True)
     job = JobSerializer(read_only=True)
@@ -151,7 +183,7 @@ class CommissionLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = CommissionLog
         fields = (
-            'id', 'job', 'total_amount', 'commission_percentage', 
+            'id', 'job', 'freelancer', 'total_amount', 'commission_percentage', 
             'commission_amount', 'freelancer_earning', 'status', 
             'due_date', 'completion_date', 'created_at', 'has_excuse',
             'job_title'
@@ -160,6 +192,67 @@ class CommissionLogSerializer(serializers.ModelSerializer):
     def get_job_title(self, obj):
         return obj.job.title if obj.job else None
 
+class CommissionExportQuerySerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(choices=['csv', 'jsonl'], default='csv')
+    status = serializers.ChoiceField(choices=CommissionLog.STATUS_CHOICES, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return data
+
+class FinanceAnalyticsQuerySerializer(serializers.Serializer):
+    group_by = serializers.ChoiceField(choices=['day', 'county', 'category'], default='day')
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    county = serializers.UUIDField(required=False)
+    category = serializers.UUIDField(required=False)
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return data
+
+class ArchivedJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedJob
+        fields = '__all__'
+
+class ArchivedJobApplicationSerializer(serializers.ModelSerializer):
+    job = ArchivedJobSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedJobApplication
+        fields = '__all__'
+
+class ArchivedCommissionLogSerializer(serializers.ModelSerializer):
+    job_title = serializers.CharField(source='job.title', read_only=True)
+
+    class Meta:
+        model = ArchivedCommissionLog
+        fields = (
+            'id', 'job', 'total_amount', 'commission_percentage',
+            'commission_amount', 'freelancer_earning', 'status',
+            'due_date', 'completion_date', 'created_at', 'has_excuse',
+            'job_title'
+        )
+
+class JobApplicationHistorySerializer(serializers.BaseSerializer):
+    """Serializes live and archived applications side by side, flagging which is which."""
+    def to_representation(self, instance):
+        if isinstance(instance, ArchivedJobApplication):
+            return {**ArchivedJobApplicationSerializer(instance, context=self.context).data, 'archived': True}
+        return {**JobApplicationSerializer(instance, context=self.context).data, 'archived': False}
+
+class CommissionHistorySerializer(serializers.BaseSerializer):
+    """Serializes live and archived commission logs side by side, flagging which is which."""
+    def to_representation(self, instance):
+        if isinstance(instance, ArchivedCommissionLog):
+            return {**ArchivedCommissionLogSerializer(instance, context=self.context).data, 'archived': True}
+        return {**CommissionLogSerializer(instance, context=self.context).data, 'archived': False}
+
 class CommissionExcuseSerializer(serializers.ModelSerializer):
     class Meta:
         model = CommissionExcuse
@@ -191,6 +284,9 @@ class ReferralSerializer(serializers.ModelSerializer):
         fields = ['id', 'referrer', 'referred_user', 'is_successful', 'created_at']
         read_only_fields = ['id', 'referrer', 'referred_user', 'is_successful', 'created_.at']
 
+class RedeemLoyaltyPointsSerializer(serializers.Serializer):
+    points = serializers.IntegerField(min_value=1)
+
 class LoyaltyPointLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = LoyaltyPointLog
@@ -201,6 +297,29 @@ class NotificationSettingsSerializer(serializers.ModelSerializer):
         model = NotificationSettings
         fields = '__all__'
 
+class SavedSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedSearch
+        fields = [
+            'id', 'user', 'name', 'skills', 'county', 'sub_county', 'ward', 'job_type',
+            'min_budget', 'max_budget', 'is_active', 'created_at'
+        ]
+        read_only_fields = ['id', 'user', 'created_at']
+
+    def validate(self, attrs):
+        instance = SavedSearch(**{**self._current_values(), **attrs})
+        if not instance.index_terms():
+            raise serializers.ValidationError("A saved search needs at least one skill, location or job type.")
+        min_budget, max_budget = instance.min_budget, instance.max_budget
+        if min_budget is not None and max_budget is not None and min_budget > max_budget:
+            raise serializers.ValidationError("min_budget cannot be greater than max_budget.")
+        return attrs
+
+    def _current_values(self):
+        if self.instance is None:
+            return {}
+        return {field: getattr(self.instance, field) for field in ['skills', 'county', 'sub_county', 'ward', 'job_type', 'min_budget', 'max_budget']}
+
 class ReviewSerializer(serializers.ModelSerializer):
     reviewer = UserSerializer(read_only=True)
     reviewee = UserSerializer(read_only=True)
@@ -266,7 +385,20 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
 class DashboardStatsBadgeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Badge
-        fields = ['title', 'icon']
+        fields = ['name', 'icon']
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['rank', 'id', 'full_name', 'username', 'avatar', 'level', 'xp_points']
+
+class PeriodLeaderboardEntrySerializer(LeaderboardEntrySerializer):
+    period_xp = serializers.IntegerField(read_only=True)
+
+    class Meta(LeaderboardEntrySerializer.Meta):
+        fields = LeaderboardEntrySerializer.Meta.fields + ['period_xp']
 
 class DashboardStatsSerializer(serializers.Serializer):
     recommended_jobs_count = serializers.IntegerField()
@@ -282,3 +414,11 @@ class DashboardStatsSerializer(serializers.Serializer):
     commission_is_suspended = serializers.BooleanField()
     can_submit_excuse = serializers.BooleanField()
     has_portfolio = serializers.BooleanField()
+
+class BulkDashboardStatsSerializer(DashboardStatsSerializer):
+    user_id = serializers.UUIDField()
+    # Only known when the user's own dashboard is cached; AI matching is not run in bulk
+    recommended_jobs_count = serializers.IntegerField(allow_null=True)
+
+class BulkDashboardStatsRequestSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=200)
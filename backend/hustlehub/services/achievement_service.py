@@ -0,0 +1,107 @@
+import logging
+from django.db import transaction
+from django.db.models import F
+from ..models import AchievementCounter, Badge, UserBadge
+from .badge_registry import badge_registry
+
+logger = logging.getLogger(__name__)
+
+RESET = 'reset'
+
+
+class Counter:
+    """
+    A per-user tally kept in AchievementCounter. `events` maps an event name to a function
+    of the event payload returning an increment, RESET, or None to leave the tally alone.
+    """
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+
+
+class AchievementRule:
+    """Awards `badge` once the user's `counter` reaches `threshold`."""
+    def __init__(self, badge, counter, threshold, description, icon=None):
+        self.badge = badge
+        self.counter = counter
+        self.threshold = threshold
+        self.description = description
+        self.icon = icon
+
+
+COUNTERS = [
+    Counter('five_star_streak', {'review_received': lambda event: 1 if event['rating'] == 5 else RESET}),
+    Counter('five_star_reviews', {'review_received': lambda event: 1 if event['rating'] == 5 else None}),
+    Counter('jobs_won', {'application_accepted': lambda event: 1}),
+    Counter('barters_accepted', {'barter_accepted': lambda event: 1}),
+    Counter('successful_referrals', {'referral_succeeded': lambda event: 1}),
+]
+
+RULES = [
+    AchievementRule('5-Star Streak', 'five_star_streak', 5, 'Received five 5-star reviews in a row.', '💎'),
+    AchievementRule('Top Rated Freelancer', 'five_star_reviews', 10, 'Received 10 five-star reviews.', '⭐'),
+    AchievementRule('Client Magnet', 'jobs_won', 10, 'Hired for 10 jobs.', '🧲'),
+    AchievementRule('Job Completionist', 'jobs_won', 25, 'Hired for 25 jobs.', '✅'),
+    AchievementRule('Skill Barter Champ', 'barters_accepted', 5, 'Had 5 skill barter proposals accepted.', '🧠'),
+    AchievementRule('Community Builder', 'successful_referrals', 5, 'Referred 5 people who joined HustleHub.', '🤝'),
+]
+
+COUNTERS_BY_EVENT = {}
+for _counter in COUNTERS:
+    for _event in _counter.events:
+        COUNTERS_BY_EVENT.setdefault(_event, []).append(_counter)
+RULES_BY_COUNTER = {}
+for _rule in RULES:
+    RULES_BY_COUNTER.setdefault(_rule.counter, []).append(_rule)
+
+
+def _apply(user_id, counter, change):
+    """Applies an increment or reset atomically and returns (previous value, new value)."""
+    rows = AchievementCounter.objects.filter(user_id=user_id, counter=counter)
+    AchievementCounter.objects.bulk_create([AchievementCounter(user_id=user_id, counter=counter)], ignore_conflicts=True)
+    previous = rows.select_for_update().values_list('value', flat=True).get()
+    if change == RESET:
+        rows.update(value=0)
+        return previous, 0
+    rows.update(value=F('value') + change)
+    return previous, previous + change
+
+
+def achievement_badge(rule):
+    """
+    The achievement badge a rule awards. Rules named after a level badge, such as
+    '5-Star Streak', get their own achievement row so the award is notified and is not
+    mistaken for reaching that level.
+    """
+    badge = badge_registry.get_by_name(rule.badge, badge_type='achievement')
+    if badge is None:
+        # The registry may be stale; get_or_create re-checks against the (name, badge_type) constraint
+        badge, _ = Badge.objects.get_or_create(
+            name=rule.badge, badge_type='achievement',
+            defaults={'description': rule.description, 'icon': rule.icon},
+        )
+    return badge
+
+
+def record_event(event, user_id, **payload):
+    """
+    Feeds a domain event to the rules: updates only the counters that listen to it and
+    checks only the rules on those counters, so cost does not grow with the user's history.
+    A badge is awarded when a counter crosses its rule's threshold. Returns the badges awarded.
+    """
+    awarded = []
+    with transaction.atomic():
+        for counter in COUNTERS_BY_EVENT.get(event, ()):
+            change = counter.events[event](payload)
+            if change is None:
+                continue
+            previous, value = _apply(user_id, counter.name, change)
+            for rule in RULES_BY_COUNTER.get(counter.name, ()):
+                if previous < rule.threshold <= value:
+                    badge = achievement_badge(rule)
+                    _, created = UserBadge.objects.get_or_create(user_id=user_id, badge=badge)
+                    if created:
+                        awarded.append(badge)
+    if awarded:
+        logger.info(f"record_event: User {user_id} earned {[badge.name for badge in awarded]} on '{event}'")
+    return awarded
@@ -0,0 +1,104 @@
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from ..models import (
+    Job, JobApplication, CommissionLog, CommissionExcuse, Review,
+    ArchivedJob, ArchivedJobApplication, ArchivedCommissionLog
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_JOB_STATUSES = ('closed', 'filled', 'expired')
+
+JOB_FIELDS = [
+    'id', 'employer_id', 'title', 'description', 'category_id', 'skills', 'job_type', 'location',
+    'county_id', 'sub_county_id', 'ward_id', 'budget', 'deadline', 'created_at', 'status',
+    'latitude', 'longitude',
+]
+APPLICATION_FIELDS = ['id', 'job_id', 'freelancer_id', 'status', 'applied_at']
+COMMISSION_FIELDS = [
+    'id', 'job_id', 'total_amount', 'commission_percentage', 'commission_amount',
+    'freelancer_earning', 'status', 'due_date', 'completion_date', 'created_at', 'has_excuse',
+]
+
+
+def archivable_jobs(older_than_days):
+    """
+    Closed jobs older than the cutoff that can leave the hot tables without losing data.
+    Jobs with reviews, commission excuses or unpaid commission stay put, since those rows
+    cascade from the job and are still read by live features.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return (
+        Job.objects.filter(status__in=ARCHIVABLE_JOB_STATUSES, created_at__lt=cutoff)
+        .exclude(Exists(Review.objects.filter(job=OuterRef('pk'))))
+        .exclude(Exists(CommissionExcuse.objects.filter(commission__job=OuterRef('pk'))))
+        .exclude(Exists(CommissionLog.objects.filter(job=OuterRef('pk'), status='due')))
+    )
+
+
+def _copy_rows(source_qs, target_model, fields):
+    rows = list(source_qs.values(*fields))
+    target_model.objects.bulk_create([target_model(**row) for row in rows], batch_size=500)
+    return len(rows)
+
+
+def archive_job_batch(job_ids):
+    """Moves one batch of jobs with their applications and commission rows into the archive tables."""
+    with transaction.atomic():
+        jobs = Job.objects.select_for_update().filter(id__in=job_ids, status__in=ARCHIVABLE_JOB_STATUSES)
+        job_ids = list(jobs.values_list('id', flat=True))
+        if not job_ids:
+            return {'jobs': 0, 'applications': 0, 'commissions': 0}
+
+        counts = {
+            'jobs': _copy_rows(Job.objects.filter(id__in=job_ids), ArchivedJob, JOB_FIELDS),
+            'applications': _copy_rows(JobApplication.objects.filter(job_id__in=job_ids), ArchivedJobApplication, APPLICATION_FIELDS),
+            'commissions': _copy_rows(CommissionLog.objects.filter(job_id__in=job_ids), ArchivedCommissionLog, COMMISSION_FIELDS),
+        }
+        # Applications and commission logs cascade from the job
+        Job.objects.filter(id__in=job_ids).delete()
+    return counts
+
+
+def archive_old_jobs(older_than_days, batch_size=200, dry_run=False):
+    """Archives eligible jobs in batches, each in its own transaction. Returns per-table totals."""
+    candidates = archivable_jobs(older_than_days)
+    if dry_run:
+        return {'jobs': candidates.count(), 'applications': 0, 'commissions': 0}
+
+    totals = {'jobs': 0, 'applications': 0, 'commissions': 0}
+    while True:
+        batch_ids = list(candidates.order_by('created_at').values_list('id', flat=True)[:batch_size])
+        if not batch_ids:
+            break
+        counts = archive_job_batch(batch_ids)
+        if not counts['jobs']:
+            break
+        for key, value in counts.items():
+            totals[key] += value
+    logger.info(f"archive_old_jobs: Archived {totals}")
+    return totals
+
+
+def application_history(user):
+    """A freelancer's applications across the hot and archive tables, newest first."""
+    hot = JobApplication.objects.filter(freelancer=user).select_related('job')
+    archived = ArchivedJobApplication.objects.filter(freelancer=user).select_related('job')
+    return sorted([*hot, *archived], key=lambda application: application.applied_at, reverse=True)
+
+
+def commission_history(user):
+    """Commission logs visible to a freelancer or employer across hot and archive tables, newest first."""
+    if user.role == 'freelancer':
+        hot = CommissionLog.objects.filter(freelancer=user)
+        archived = ArchivedCommissionLog.objects.filter(job__applications__freelancer=user, job__applications__status='accepted')
+    elif user.role == 'employer':
+        hot = CommissionLog.objects.filter(job__employer=user)
+        archived = ArchivedCommissionLog.objects.filter(job__employer=user)
+    else:
+        return []
+    rows = [*hot.select_related('job'), *archived.select_related('job')]
+    return sorted(rows, key=lambda log: log.completion_date, reverse=True)
@@ -0,0 +1,33 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2), thread_name_prefix='hustlehub-bg')
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Background task {func.__name__} failed: {e}", exc_info=True)
+    finally:
+        # Worker threads open their own connections; don't leak them
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Runs `func` on a worker thread once the current transaction commits, so request
+    threads return immediately. With BACKGROUND_TASKS_EAGER the task runs inline at
+    commit time instead (used by tests and management commands).
+    """
+    def submit():
+        if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+            func(*args, **kwargs)
+        else:
+            _executor.submit(_run, func, args, kwargs)
+
+    transaction.on_commit(submit)
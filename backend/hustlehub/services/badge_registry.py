@@ -0,0 +1,91 @@
+import threading
+import time
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+from ..models import Badge, BADGE_NAMES
+
+VERSION_KEY = 'badges:catalogue-version'
+# Version tokens only reach other processes through a shared cache; with a per-process
+# cache (the local-memory default) copies are refreshed after this long instead
+MAX_AGE_SECONDS = 300
+
+
+class BadgeRegistry:
+    """
+    Process-local copy of the badge catalogue. Badges are a small, nearly static table,
+    so lookups are served from memory. Any Badge write replaces a version token in the
+    shared cache; every process reloads its copy on its next lookup after the token changes,
+    or once the copy is MAX_AGE_SECONDS old. A stale copy is never used to decide writes:
+    level badges are inserted conflict-free against the (name, badge_type) constraint.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0
+        self._by_id = {}
+        self._by_name = {}
+
+    def _current_version(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    def _is_current(self, version):
+        return version == self._version and time.monotonic() - self._loaded_at < MAX_AGE_SECONDS
+
+    def _ensure_loaded(self):
+        version = self._current_version()
+        if self._is_current(version):
+            return
+        with self._lock:
+            if self._is_current(version):
+                return
+            # The version is read before the rows, so a write racing the load triggers another reload
+            badges = list(Badge.objects.all())
+            self._by_id = {badge.pk: badge for badge in badges}
+            self._by_name = {(badge.badge_type, badge.name): badge for badge in badges}
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+    def all(self):
+        self._ensure_loaded()
+        return list(self._by_id.values())
+
+    def get(self, badge_id):
+        self._ensure_loaded()
+        return self._by_id.get(badge_id)
+
+    def get_many(self, badge_ids):
+        """{badge_id: Badge} for many IDs with a single version check; unknown IDs are skipped."""
+        self._ensure_loaded()
+        return {badge_id: self._by_id[badge_id] for badge_id in badge_ids if badge_id in self._by_id}
+
+    def get_by_name(self, name, badge_type='achievement'):
+        self._ensure_loaded()
+        return self._by_name.get((badge_type, name))
+
+    def level_badges(self, levels):
+        """
+        {level: Badge} for the given levels. Missing level badges are inserted with one
+        conflict-ignoring INSERT, so concurrent first level-ups or a stale copy cannot
+        create duplicates, then read back from the database.
+        """
+        names = {level: BADGE_NAMES[level - 1] for level in levels}
+        self._ensure_loaded()
+        found = {name: self._by_name[('level', name)] for name in names.values() if ('level', name) in self._by_name}
+        missing = set(names.values()) - set(found)
+        if missing:
+            Badge.objects.bulk_create([Badge(name=name, badge_type='level') for name in missing], ignore_conflicts=True)
+            found.update((badge.name, badge) for badge in Badge.objects.filter(badge_type='level', name__in=missing))
+            # bulk_create skips the Badge post_save hook. Reloading only after commit keeps
+            # rows from a rolled-back transaction out of the catalogue.
+            transaction.on_commit(self.invalidate)
+        return {level: found[name] for level, name in names.items()}
+
+badge_registry = BadgeRegistry()
@@ -0,0 +1,142 @@
+import logging
+from datetime import date
+from itertools import islice
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+from ..models import AccountStanding, CommissionExcuse, CommissionLog
+from .notification_service import fan_out_notifications
+from .dashboard_service import bump_dashboard_generations
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_EXCUSE_STATUSES = ('pending', 'approved')
+SWEEP_CHUNK_SIZE = 500
+STANDING_FIELDS = ['amount_overdue', 'overdue_count', 'oldest_due_date', 'excuse_status', 'is_suspended', 'updated_at']
+
+
+def overdue_commissions(today=None):
+    """Unpaid commissions whose due date has arrived."""
+    return CommissionLog.objects.filter(status='due', due_date__lte=today or date.today())
+
+
+def _overdue_totals(today):
+    """(freelancer_id, total, count, oldest due date) per freelancer with overdue commission, in one grouped query."""
+    return (
+        overdue_commissions(today).exclude(freelancer=None).order_by('freelancer')
+        .values_list('freelancer').annotate(total=Sum('commission_amount'), count=Count('pk'), oldest=Min('due_date'))
+    )
+
+
+def _excuse_statuses(user_ids):
+    """{user_id: 'pending' | 'approved'} for users with an active excuse; an approved one wins."""
+    statuses = {}
+    active = CommissionExcuse.objects.filter(user_id__in=user_ids, status__in=ACTIVE_EXCUSE_STATUSES)
+    for user_id, excuse_status in active.values_list('user_id', 'status').distinct():
+        if statuses.get(user_id) != 'approved':
+            statuses[user_id] = excuse_status
+    return statuses
+
+
+def _build_standings(rows):
+    excuses = _excuse_statuses([row[0] for row in rows])
+    standings = []
+    for user_id, total, count, oldest in rows:
+        excuse_status = excuses.get(user_id, 'none')
+        standings.append(AccountStanding(
+            user_id=user_id, amount_overdue=total or 0, overdue_count=count, oldest_due_date=oldest,
+            excuse_status=excuse_status, is_suspended=bool(total) and excuse_status == 'none',
+        ))
+    return standings
+
+
+def _write_standings(standings):
+    """Upserts the standings in one statement. Returns (newly suspended, reinstated) user IDs."""
+    user_ids = [standing.user_id for standing in standings]
+    was_suspended = set(AccountStanding.objects.filter(user_id__in=user_ids, is_suspended=True).values_list('user_id', flat=True))
+    AccountStanding.objects.bulk_create(standings, update_conflicts=True, unique_fields=['user'], update_fields=STANDING_FIELDS)
+    bump_dashboard_generations(user_ids)
+    suspended = [standing.user_id for standing in standings if standing.is_suspended and standing.user_id not in was_suspended]
+    reinstated = [standing.user_id for standing in standings if not standing.is_suspended and standing.user_id in was_suspended]
+    return suspended, reinstated
+
+
+def _notify_standing_changes(suspended, reinstated):
+    if suspended:
+        fan_out_notifications(
+            suspended,
+            title="Account Suspended",
+            message="You have overdue commission. Pay it or submit an excuse to apply for jobs again.",
+            type='commission',
+        )
+    if reinstated:
+        fan_out_notifications(
+            reinstated,
+            title="Account Reinstated",
+            message="Your account is back in good standing.",
+            type='commission',
+        )
+
+
+def sweep_overdue_commissions(today=None, chunk_size=SWEEP_CHUNK_SIZE):
+    """
+    Rebuilds every freelancer's AccountStanding. Overdue commissions are grouped per
+    freelancer in one pass over the (status, due_date) index; standings are upserted a
+    chunk at a time, with one bulk notification per chunk for users whose suspension
+    changed. Standings not touched by the sweep have nothing overdue any more and are
+    cleared in one UPDATE. Returns (standings written, suspended, reinstated).
+    """
+    today = today or date.today()
+    sweep_started = timezone.now()
+    written = suspended_total = reinstated_total = 0
+
+    rows = _overdue_totals(today).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        with transaction.atomic():
+            suspended, reinstated = _write_standings(_build_standings(chunk))
+            _notify_standing_changes(suspended, reinstated)
+        written += len(chunk)
+        suspended_total += len(suspended)
+        reinstated_total += len(reinstated)
+
+    with transaction.atomic():
+        stale = AccountStanding.objects.filter(updated_at__lt=sweep_started).filter(Q(overdue_count__gt=0) | Q(is_suspended=True))
+        reinstated = list(stale.filter(is_suspended=True).values_list('user_id', flat=True))
+        bump_dashboard_generations(stale.values_list('user_id', flat=True))
+        written += stale.update(amount_overdue=0, overdue_count=0, oldest_due_date=None, is_suspended=False, updated_at=timezone.now())
+        _notify_standing_changes([], reinstated)
+    reinstated_total += len(reinstated)
+
+    logger.info(f"sweep_overdue_commissions: Wrote {written} standings, {suspended_total} suspended, {reinstated_total} reinstated")
+    return written, suspended_total, reinstated_total
+
+
+def refresh_account_standings(user_ids, today=None):
+    """
+    Recomputes several users' standings straight away, e.g. after an excuse is filed, a
+    commission paid or a batch of excuses reviewed, with one upsert for all of them.
+    """
+    user_ids = set(user_ids)
+    rows = list(_overdue_totals(today or date.today()).filter(freelancer_id__in=user_ids))
+    # Users with nothing overdue only need writing if a standing exists to clear
+    clear = user_ids - {row[0] for row in rows}
+    if clear:
+        rows += [(user_id, 0, 0, None) for user_id in AccountStanding.objects.filter(user_id__in=clear).values_list('user_id', flat=True)]
+    if not rows:
+        return
+    with transaction.atomic():
+        suspended, reinstated = _write_standings(_build_standings(rows))
+        _notify_standing_changes(suspended, reinstated)
+
+
+def refresh_account_standing(user_id, today=None):
+    """Recomputes one user's standing straight away."""
+    refresh_account_standings([user_id], today=today)
+
+
+def get_account_standing(user):
+    """The user's standing row, or an unsaved clean one if they have never had anything overdue."""
+    try:
+        return AccountStanding.objects.get(user_id=user.pk)
+    except AccountStanding.DoesNotExist:
+        return AccountStanding(user_id=user.pk)
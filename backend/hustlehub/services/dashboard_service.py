@@ -0,0 +1,157 @@
+import uuid
+from collections import defaultdict
+from datetime import date
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from ..models import AccountStanding, ArchivedJobApplication, JobApplication, PortfolioItem, User, UserBadge, LEVEL_THRESHOLDS
+from .badge_registry import badge_registry
+from .leaderboard_service import get_ranks
+
+LATEST_BADGES = 3
+
+# Rank and recommendations also move with other users' activity, which bumps nothing,
+# so snapshots expire after a while regardless
+DASHBOARD_CACHE_TIMEOUT = 300  # seconds
+
+
+def _generation_key(user_id):
+    return f'dashboard:generation:{user_id}'
+
+
+def _snapshot_key(user_id):
+    return f'dashboard:snapshot:{user_id}'
+
+
+def bump_dashboard_generations(user_ids):
+    """
+    Invalidates the cached dashboards of the given users by giving each a new generation
+    token once the current transaction commits, so a rebuild never caches rows that are
+    about to change. One cache write for any number of users.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        transaction.on_commit(
+            lambda: cache.set_many({_generation_key(user_id): uuid.uuid4().hex for user_id in user_ids}, None)
+        )
+
+
+def bump_dashboard_generation(user_id):
+    bump_dashboard_generations([user_id])
+
+
+def get_cached_dashboard(user_id, build):
+    """
+    Returns the user's dashboard payload, calling `build()` only when the cached snapshot
+    is missing or was built under an older generation. A hit is one get_many round trip
+    for both the generation token and the snapshot.
+    """
+    generation_key, snapshot_key = _generation_key(user_id), _snapshot_key(user_id)
+    cached = cache.get_many([generation_key, snapshot_key])
+    generation, snapshot = cached.get(generation_key), cached.get(snapshot_key)
+    if generation is not None and snapshot is not None and snapshot['generation'] == generation:
+        return snapshot['data']
+
+    if generation is None:
+        cache.add(generation_key, uuid.uuid4().hex, None)
+        generation = cache.get(generation_key)
+    # The generation is read before building, so a write racing the build leaves the snapshot stale
+    data = build()
+    cache.set(snapshot_key, {'generation': generation, 'data': data}, DASHBOARD_CACHE_TIMEOUT)
+    return data
+
+
+def xp_needed_for_next_level(level):
+    return LEVEL_THRESHOLDS[level] if level < len(LEVEL_THRESHOLDS) else 0
+
+
+def commission_stats(standing, today=None):
+    """The dashboard's commission fields, read from a user's AccountStanding."""
+    overdue = standing.amount_overdue > 0
+    return {
+        'commission_due_amount': standing.amount_overdue,
+        # Negative once overdue
+        'commission_days_left': (standing.oldest_due_date - (today or date.today())).days if overdue else None,
+        'commission_is_suspended': standing.is_suspended,
+        # A pending or approved excuse holds off suspension
+        'can_submit_excuse': overdue and standing.excuse_status == 'none',
+    }
+
+
+def _latest_badges(user_ids):
+    """{user_id: [Badge, ...]} with each user's most recent badges, in one windowed query."""
+    ranked = UserBadge.objects.filter(user_id__in=user_ids).annotate(
+        position=Window(RowNumber(), partition_by=F('user_id'), order_by=F('awarded_at').desc()),
+    ).filter(position__lte=LATEST_BADGES).order_by('user_id', 'position')
+    rows = list(ranked.values_list('user_id', 'badge_id'))
+    # One catalogue version check for the whole batch rather than one per row
+    catalogue = badge_registry.get_many({badge_id for _, badge_id in rows})
+    badges = defaultdict(list)
+    for user_id, badge_id in rows:
+        if badge_id in catalogue:
+            badges[user_id].append(catalogue[badge_id])
+    return badges
+
+
+def completed_job_counts(user_ids):
+    """
+    {user_id: completed jobs} -- accepted applications on closed jobs, including those
+    that archive_jobs has moved to the archive tables.
+    """
+    counts = defaultdict(int)
+    for model in (JobApplication, ArchivedJobApplication):
+        rows = (
+            model.objects.filter(freelancer_id__in=user_ids, status='accepted', job__status='closed')
+            .order_by().values('freelancer').annotate(total=Count('pk'))
+        )
+        for row in rows:
+            counts[row['freelancer']] += row['total']
+    return counts
+
+
+def bulk_dashboard_stats(user_ids):
+    """
+    Dashboard fields for many users with a fixed number of grouped queries, whatever
+    the number of users. AI job matching is too slow to run per user here, so
+    recommended_jobs_count comes from the user's cached dashboard snapshot when it is
+    still current (built under the user's generation), and is None otherwise.
+    Returns {user_id: stats}; unknown IDs are skipped.
+    """
+    users = {
+        pk: (level, xp_points)
+        for pk, level, xp_points in User.objects.filter(pk__in=user_ids).values_list('pk', 'level', 'xp_points')
+    }
+    if not users:
+        return {}
+
+    active_applications = dict(
+        JobApplication.objects.filter(freelancer_id__in=users, status='pending')
+        .order_by().values('freelancer').annotate(total=Count('pk')).values_list('freelancer', 'total')
+    )
+    completed_jobs = completed_job_counts(list(users))
+    with_portfolio = set(PortfolioItem.objects.filter(user_id__in=users).values_list('user_id', flat=True).distinct())
+    standings = AccountStanding.objects.in_bulk(list(users))
+    latest_badges = _latest_badges(users)
+    ranks = get_ranks(xp_points for _, xp_points in users.values())
+    # Snapshots and generation tokens in one round trip, as in get_cached_dashboard
+    cached = cache.get_many([key for user_id in users for key in (_generation_key(user_id), _snapshot_key(user_id))])
+
+    today = date.today()
+    stats = {}
+    for user_id, (level, xp_points) in users.items():
+        snapshot, generation = cached.get(_snapshot_key(user_id)), cached.get(_generation_key(user_id))
+        current = snapshot is not None and generation is not None and snapshot['generation'] == generation
+        stats[user_id] = {
+            'recommended_jobs_count': snapshot['data']['recommended_jobs_count'] if current else None,
+            'active_applications_count': active_applications.get(user_id, 0),
+            'completed_jobs_count': completed_jobs[user_id],
+            'level': level,
+            'current_xp': xp_points,
+            'xp_needed_for_next_level': xp_needed_for_next_level(level),
+            'latest_badges': latest_badges.get(user_id, []),
+            'leaderboard_rank': ranks[xp_points],
+            **commission_stats(standings.get(user_id) or AccountStanding(user_id=user_id), today),
+            'has_portfolio': user_id in with_portfolio,
+        }
+    return stats
@@ -0,0 +1,79 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+# Leading characters that make spreadsheet apps treat a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+# (column name, queryset lookup)
+COMMISSION_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('job', 'job_id'),
+    ('job_title', 'job__title'),
+    ('freelancer', 'freelancer_id'),
+    ('total_amount', 'total_amount'),
+    ('commission_percentage', 'commission_percentage'),
+    ('commission_amount', 'commission_amount'),
+    ('freelancer_earning', 'freelancer_earning'),
+    ('status', 'status'),
+    ('due_date', 'due_date'),
+    ('completion_date', 'completion_date'),
+    ('created_at', 'created_at'),
+    ('has_excuse', 'has_excuse'),
+]
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer: write() hands the formatted line back instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def filter_commissions(queryset, status=None, date_from=None, date_to=None):
+    """Narrows commission logs by status and an inclusive completion_date range, in completion order."""
+    if status:
+        queryset = queryset.filter(status=status)
+    if date_from:
+        queryset = queryset.filter(completion_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(completion_date__lte=date_to)
+    return queryset.order_by('completion_date', 'pk')
+
+
+def iter_export_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """Streams plain value tuples for `columns` from the database, chunk_size rows at a time."""
+    lookups = [lookup for _, lookup in columns]
+    return queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def escape_csv_cell(value):
+    """Quotes user-supplied text that a spreadsheet would otherwise run as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in columns])
+    for row in rows:
+        yield writer.writerow([escape_csv_cell(value) for value in row])
+
+
+def stream_jsonl(rows, columns):
+    names = [name for name, _ in columns]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_export(queryset, columns, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Generator of CSV or JSON Lines chunks for the queryset; memory use does not grow with the row count."""
+    rows = iter_export_rows(queryset, columns, chunk_size)
+    if export_format == 'csv':
+        return stream_csv(rows, columns)
+    return stream_jsonl(rows, columns)
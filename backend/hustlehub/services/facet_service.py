@@ -0,0 +1,83 @@
+import hashlib
+from collections import defaultdict
+from django.core.cache import cache
+from django.db.models import Case, When, Value, CharField, Count, Q
+from ..models import Job
+
+FACET_CACHE_TIMEOUT = 60  # seconds
+
+# (key, label, lower bound inclusive, upper bound exclusive)
+BUDGET_BANDS = [
+    ('under_1000', 'Under 1,000', None, 1000),
+    ('1000_5000', '1,000 - 5,000', 1000, 5000),
+    ('5000_20000', '5,000 - 20,000', 5000, 20000),
+    ('20000_plus', '20,000+', 20000, None),
+]
+UNSPECIFIED_BUDGET = 'unspecified'
+
+
+def budget_band_expression():
+    whens = []
+    for key, _, low, high in BUDGET_BANDS:
+        condition = Q()
+        if low is not None:
+            condition &= Q(budget__gte=low)
+        if high is not None:
+            condition &= Q(budget__lt=high)
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, default=Value(UNSPECIFIED_BUDGET), output_field=CharField())
+
+
+def compute_job_facets(queryset):
+    """
+    Computes per-category, county, job type and budget band counts for a filtered
+    job queryset in a single grouped query, rolling the combinations up in Python.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(budget_band=budget_band_expression())
+        .values('category__id', 'category__name', 'county__id', 'county__name', 'job_type', 'budget_band')
+        .annotate(count=Count('id'))
+    )
+
+    total = 0
+    categories, counties = {}, {}
+    job_types, bands = defaultdict(int), defaultdict(int)
+    for row in rows:
+        count = row['count']
+        total += count
+        if row['category__id'] is not None:
+            entry = categories.setdefault(row['category__id'], {'id': row['category__id'], 'name': row['category__name'], 'count': 0})
+            entry['count'] += count
+        if row['county__id'] is not None:
+            entry = counties.setdefault(row['county__id'], {'id': row['county__id'], 'name': row['county__name'], 'count': 0})
+            entry['count'] += count
+        job_types[row['job_type']] += count
+        bands[row['budget_band']] += count
+
+    by_count = lambda entry: (-entry['count'], entry['name'])
+    band_labels = [(key, label) for key, label, _, _ in BUDGET_BANDS] + [(UNSPECIFIED_BUDGET, 'Not specified')]
+    return {
+        'total': total,
+        'category': sorted(categories.values(), key=by_count),
+        'county': sorted(counties.values(), key=by_count),
+        'job_type': [
+            {'value': value, 'label': label, 'count': job_types.get(value, 0)}
+            for value, label in Job.JOB_TYPE_CHOICES
+        ],
+        'budget': [
+            {'band': key, 'label': label, 'count': bands.get(key, 0)}
+            for key, label in band_labels
+        ],
+    }
+
+
+def get_cached_job_facets(queryset, query_params):
+    """Returns facets for the filter set, cached briefly per distinct set of query parameters."""
+    params = '&'.join(f'{key}={",".join(sorted(query_params.getlist(key)))}' for key in sorted(query_params))
+    cache_key = 'job-facets:' + hashlib.md5(params.encode()).hexdigest()
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = compute_job_facets(queryset)
+        cache.set(cache_key, facets, FACET_CACHE_TIMEOUT)
+    return facets
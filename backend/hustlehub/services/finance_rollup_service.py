@@ -0,0 +1,148 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+from ..models import ArchivedCommissionLog, CommissionLog, DailyFinanceRollup, Job
+
+logger = logging.getLogger(__name__)
+
+MEASURES = ('commission_count', 'gross_amount', 'commission_due', 'commission_paid', 'freelancer_earnings')
+# Fields a commission's rollup contribution depends on, remembered when it is loaded
+TRACKED_FIELDS = ('job_id', 'completion_date', 'status', 'total_amount', 'commission_amount', 'freelancer_earning')
+GROUP_BY_FIELDS = {
+    'day': ('day',),
+    'county': ('county', 'county__name'),
+    'category': ('category', 'category__name'),
+}
+
+
+def contribution(status, total_amount, commission_amount, freelancer_earning):
+    """What one commission adds to its rollup row."""
+    return {
+        'commission_count': 1,
+        'gross_amount': Decimal(total_amount),
+        'commission_due': Decimal(commission_amount) if status == 'due' else Decimal(0),
+        'commission_paid': Decimal(commission_amount) if status == 'paid' else Decimal(0),
+        'freelancer_earnings': Decimal(freelancer_earning),
+    }
+
+
+def record_finance(changes):
+    """
+    Applies signed changes to the rollups. `changes` is an iterable of ((day, county_id,
+    category_id), measures, sign). Changes to the same row are netted first; missing rows
+    are inserted with one conflict-ignoring bulk INSERT, then each row gets one F() UPDATE.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+    for key, measures, sign in changes:
+        for measure, value in measures.items():
+            deltas[key][measure] += sign * value
+    deltas = {key: {m: v for m, v in measures.items() if v} for key, measures in deltas.items()}
+    deltas = {key: measures for key, measures in deltas.items() if measures}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        DailyFinanceRollup.objects.bulk_create(
+            [DailyFinanceRollup(day=day, county_id=county_id, category_id=category_id) for day, county_id, category_id in deltas],
+            ignore_conflicts=True,
+        )
+        for (day, county_id, category_id), measures in deltas.items():
+            DailyFinanceRollup.objects.filter(day=day, county_id=county_id, category_id=category_id).update(
+                **{measure: F(measure) + value for measure, value in measures.items()}
+            )
+
+
+def _state(values):
+    job_id, completion_date, *rest = values
+    # completion_date defaults to timezone.now, so a fresh instance may still hold a datetime
+    return (job_id, CommissionLog._meta.get_field('completion_date').to_python(completion_date), *rest)
+
+
+def remember_commission_state(commission):
+    # __dict__ avoids loading deferred fields; a partially loaded row is treated as unknown
+    values = [commission.__dict__.get(field) for field in TRACKED_FIELDS]
+    commission._finance_state = _state(values) if None not in values else None
+
+
+def _changes_for(job_id, states):
+    """Rollup changes for (state, sign) pairs of one job's commission."""
+    county_id, category_id = Job.objects.filter(pk=job_id).values_list('county_id', 'category_id').first() or (None, None)
+    return [
+        ((completion_date, county_id, category_id), contribution(status, total, commission, earning), sign)
+        for (_, completion_date, status, total, commission, earning), sign in states
+    ]
+
+
+def record_commission_saved(commission, created):
+    """Moves a saved commission's contribution from its loaded state to its new one."""
+    new_state = _state(getattr(commission, field) for field in TRACKED_FIELDS)
+    old_state = None if created else getattr(commission, '_finance_state', None)
+    if old_state == new_state:
+        return
+    if old_state is None and not created:
+        logger.warning(f"record_commission_saved: Unknown previous state for commission {commission.pk}; run rebuild_finance_rollups")
+    by_job = defaultdict(list)
+    for state, sign in [(new_state, 1)] + ([(old_state, -1)] if old_state is not None else []):
+        by_job[state[0]].append((state, sign))
+    record_finance([change for job_id, states in by_job.items() for change in _changes_for(job_id, states)])
+    commission._finance_state = new_state
+
+
+def record_commission_deleted(commission):
+    # Archiving moves a commission rather than removing it, so it stays counted
+    if ArchivedCommissionLog.objects.filter(pk=commission.pk).exists():
+        return
+    state = _state(getattr(commission, field) for field in TRACKED_FIELDS)
+    record_finance(_changes_for(commission.job_id, [(state, -1)]))
+
+
+def _grouped_totals(queryset):
+    """Per (completion day, county, category) measure totals for a commission table."""
+    return queryset.order_by().values('completion_date', 'job__county', 'job__category').annotate(
+        commission_count=Count('pk'),
+        gross_amount=Sum('total_amount'),
+        commission_due=Sum(Case(When(status='due', then=F('commission_amount')), default=Value(0), output_field=DecimalField())),
+        commission_paid=Sum(Case(When(status='paid', then=F('commission_amount')), default=Value(0), output_field=DecimalField())),
+        freelancer_earnings=Sum('freelancer_earning'),
+    )
+
+
+def rebuild_finance_rollups():
+    """Recomputes every rollup from the live and archived commission tables with grouped queries."""
+    totals = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+    for table in (CommissionLog, ArchivedCommissionLog):
+        for row in _grouped_totals(table.objects.all()):
+            key = (row['completion_date'], row['job__county'], row['job__category'])
+            for measure in MEASURES:
+                totals[key][measure] += row[measure] or 0
+
+    with transaction.atomic():
+        DailyFinanceRollup.objects.all().delete()
+        DailyFinanceRollup.objects.bulk_create(
+            [
+                DailyFinanceRollup(day=day, county_id=county_id, category_id=category_id, **measures)
+                for (day, county_id, category_id), measures in totals.items()
+            ],
+            batch_size=1000,
+        )
+    logger.info(f"rebuild_finance_rollups: Rebuilt {len(totals)} rollup rows")
+    return len(totals)
+
+
+def finance_summary(group_by='day', date_from=None, date_to=None, county_id=None, category_id=None):
+    """Measure totals over the rollups in the date range, one row per `group_by` value."""
+    rollups = DailyFinanceRollup.objects.all()
+    if date_from:
+        rollups = rollups.filter(day__gte=date_from)
+    if date_to:
+        rollups = rollups.filter(day__lte=date_to)
+    if county_id:
+        rollups = rollups.filter(county_id=county_id)
+    if category_id:
+        rollups = rollups.filter(category_id=category_id)
+    fields = GROUP_BY_FIELDS[group_by]
+    return list(
+        rollups.order_by(fields[0]).values(*fields).annotate(**{measure: Sum(measure) for measure in MEASURES})
+    )
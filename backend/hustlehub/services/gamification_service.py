@@ -0,0 +1,133 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections, transaction
+from django.db.models import Sum
+from ..models import LoyaltyPointLog, User, UserBadge, XPLog, BADGE_NAMES
+from .badge_registry import badge_registry
+from .dashboard_service import bump_dashboard_generations
+from .leaderboard_service import sync_user_xp
+from .xp_service import level_for_xp
+
+logger = logging.getLogger(__name__)
+
+RECOMPUTE_CHUNK_SIZE = 1000
+
+
+def user_id_ranges(workers):
+    """
+    Splits the user table into `workers` contiguous primary-key ranges of similar size,
+    as (lower inclusive, upper exclusive) pairs; None means unbounded.
+    """
+    count = User.objects.count()
+    if workers <= 1 or count < workers:
+        return [(None, None)]
+    step = count // workers
+    ordered = User.objects.order_by('pk').values_list('pk', flat=True)
+    bounds = [ordered[index * step] for index in range(1, workers)]
+    return list(zip([None, *bounds], [*bounds, None]))
+
+
+def _iter_user_chunks(lower, upper, chunk_size):
+    """Keyset-paginates (pk, xp_points, level, loyalty_points) rows of the range in primary-key order."""
+    users = User.objects.order_by('pk')
+    if lower is not None:
+        users = users.filter(pk__gte=lower)
+    if upper is not None:
+        users = users.filter(pk__lt=upper)
+    last = None
+    while True:
+        page = users.filter(pk__gt=last) if last is not None else users
+        rows = list(page.values_list('pk', 'xp_points', 'level', 'loyalty_points')[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def _sync_leaderboard(users):
+    for user in users:
+        sync_user_xp(user.pk, user.xp_points)
+
+
+def _recompute_chunk(rows, dry_run):
+    """Compares one chunk against the XPLog and LoyaltyPointLog ledgers and, unless dry_run, writes the fixes."""
+    user_ids = [row[0] for row in rows]
+    xp_totals = dict(
+        XPLog.objects.filter(user_id__in=user_ids).order_by().values_list('user').annotate(total=Sum('points'))
+    )
+    loyalty_totals = dict(
+        LoyaltyPointLog.objects.filter(user_id__in=user_ids).order_by().values_list('user').annotate(total=Sum('points'))
+    )
+    owned = set(
+        UserBadge.objects.filter(user_id__in=user_ids, badge__badge_type='level').values_list('user_id', 'badge__name')
+    )
+
+    diffs, fixed_users, missing_levels = [], [], {}
+    for user_id, xp_points, level, loyalty_points in rows:
+        expected_xp = xp_totals.get(user_id, 0)
+        expected_level = level_for_xp(expected_xp)
+        expected_loyalty = loyalty_totals.get(user_id, 0)
+        # Level 1 has never come with a badge; every level reached after it does
+        missing = [lvl for lvl in range(2, expected_level + 1) if (user_id, BADGE_NAMES[lvl - 1]) not in owned]
+        stored, expected = (xp_points, level, loyalty_points), (expected_xp, expected_level, expected_loyalty)
+        if stored == expected and not missing:
+            continue
+
+        diffs.append({
+            'user_id': user_id,
+            'xp_points': (xp_points, expected_xp),
+            'level': (level, expected_level),
+            'loyalty_points': (loyalty_points, expected_loyalty),
+            'missing_badges': [BADGE_NAMES[lvl - 1] for lvl in missing],
+        })
+        if stored != expected:
+            fixed_users.append(User(pk=user_id, xp_points=expected_xp, level=expected_level, loyalty_points=expected_loyalty))
+        if missing:
+            missing_levels[user_id] = missing
+
+    if not dry_run and diffs:
+        with transaction.atomic():
+            User.objects.bulk_update(fixed_users, ['xp_points', 'level', 'loyalty_points'])
+            badges = badge_registry.level_badges({lvl for levels in missing_levels.values() for lvl in levels})
+            UserBadge.objects.bulk_create(
+                [UserBadge(user_id=user_id, badge=badges[lvl]) for user_id, levels in missing_levels.items() for lvl in levels],
+                ignore_conflicts=True,
+            )
+            # bulk_update skips the leaderboard's post_save hook
+            transaction.on_commit(lambda: _sync_leaderboard(fixed_users))
+            bump_dashboard_generations(diff['user_id'] for diff in diffs)
+    return diffs
+
+
+def recompute_range(lower=None, upper=None, dry_run=False, chunk_size=RECOMPUTE_CHUNK_SIZE):
+    """Recomputes every user in [lower, upper) chunk by chunk. Returns the list of diffs found."""
+    diffs = []
+    for rows in _iter_user_chunks(lower, upper, chunk_size):
+        diffs.extend(_recompute_chunk(rows, dry_run))
+    return diffs
+
+
+def _recompute_range_worker(*args):
+    try:
+        return recompute_range(*args)
+    finally:
+        # Worker threads open their own connections; don't leak them
+        connections.close_all()
+
+
+def recompute_gamification(workers=1, dry_run=False, chunk_size=RECOMPUTE_CHUNK_SIZE):
+    """
+    Rebuilds xp_points, level, level badges and loyalty_points for all users from the
+    XPLog and LoyaltyPointLog ledgers with grouped SUM queries and bulk writes, spreading
+    primary-key ranges across `workers` threads. With dry_run nothing is written.
+    Returns the diffs found.
+    """
+    ranges = user_id_ranges(workers)
+    if len(ranges) == 1:
+        diffs = recompute_range(dry_run=dry_run, chunk_size=chunk_size)
+    else:
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix='hustlehub-recompute') as executor:
+            futures = [executor.submit(_recompute_range_worker, lower, upper, dry_run, chunk_size) for lower, upper in ranges]
+            diffs = [diff for future in futures for diff in future.result()]
+    logger.info(f"recompute_gamification: {len(diffs)} users {'differ' if dry_run else 'fixed'}")
+    return diffs
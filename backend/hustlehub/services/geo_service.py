@@ -0,0 +1,169 @@
+import math
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Q, F, Value, FloatField, OuterRef, Subquery
+from django.db.models.functions import ASin, Cos, Lower, Power, Radians, Sin, Sqrt
+from ..models import SubCounty, User, UserServiceArea, Ward
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+MAX_RADIUS_KM = 500
+
+
+def parse_near(near, radius_km):
+    """
+    Parses the `near=lat,lng` and `radius_km` query parameters.
+    Raises ValueError if either value is malformed or out of range.
+    """
+    try:
+        lat_str, lng_str = near.split(',')
+        lat, lng = float(lat_str), float(lng_str)
+        radius = float(radius_km) if radius_km not in (None, '') else 10.0
+    except (AttributeError, ValueError):
+        raise ValueError("Use near=<lat>,<lng> and a numeric radius_km.")
+
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordinates are out of range.")
+    if not (0 < radius <= MAX_RADIUS_KM):
+        raise ValueError(f"radius_km must be between 0 and {MAX_RADIUS_KM}.")
+    return lat, lng, radius
+
+
+def bounding_box(lat, lng, radius_km):
+    """Returns (min_lat, max_lat, min_lng, max_lng) enclosing the search circle."""
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    # Near the poles every longitude is within range
+    lng_delta = 180.0 if cos_lat < 1e-6 else radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    return (
+        max(lat - lat_delta, -90.0),
+        min(lat + lat_delta, 90.0),
+        lng - lng_delta,
+        lng + lng_delta,
+    )
+
+
+def bounding_box_q(lat, lng, radius_km, lat_field='latitude', lng_field='longitude'):
+    """Index-friendly range predicate on the (latitude, longitude) columns."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    q = Q(**{f'{lat_field}__gte': min_lat, f'{lat_field}__lte': max_lat})
+    if min_lng >= -180 and max_lng <= 180:
+        q &= Q(**{f'{lng_field}__gte': min_lng, f'{lng_field}__lte': max_lng})
+    return q
+
+
+def haversine_distance(lat, lng, lat_field='latitude', lng_field='longitude'):
+    """Great-circle distance in km as a database expression (works without PostGIS)."""
+    lat_rad = math.radians(lat)
+    d_lat = (Radians(F(lat_field)) - Value(lat_rad)) / 2
+    d_lng = (Radians(F(lng_field)) - Value(math.radians(lng))) / 2
+    a = Power(Sin(d_lat), 2) + Value(math.cos(lat_rad)) * Cos(Radians(F(lat_field))) * Power(Sin(d_lng), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
+
+
+def filter_within_radius(queryset, lat, lng, radius_km, lat_field='latitude', lng_field='longitude'):
+    """
+    Restricts a queryset to rows within `radius_km` of (lat, lng).
+    A bounding-box prefilter narrows rows via the coordinate index before the exact
+    haversine distance is computed; results are annotated with `distance_km` and ordered by it.
+    """
+    return (
+        queryset
+        .filter(bounding_box_q(lat, lng, radius_km, lat_field, lng_field))
+        .annotate(distance_km=haversine_distance(lat, lng, lat_field, lng_field))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km')
+    )
+
+
+def service_area_tokens(service_areas):
+    """Lower-cased entries of a comma-separated service_areas value."""
+    return {token.strip(' \'"[]').lower() for token in (service_areas or '').split(',')} - {''}
+
+
+def match_service_areas(tokens_by_user, areas):
+    """
+    Resolves users' service-area tokens against `areas`, an iterable of
+    (key, name, county_name, latitude, longitude). Entries must name an area whole, and a
+    name shared by areas in several counties only matches when the county is listed too.
+    Returns [(user_id, key, latitude, longitude), ...] for areas with a centroid.
+    """
+    by_name = defaultdict(list)
+    for key, name, county_name, lat, lng in areas:
+        by_name[name.lower()].append((key, county_name.lower(), lat, lng))
+
+    matches = []
+    for user_id, tokens in tokens_by_user.items():
+        for token in tokens:
+            candidates = by_name.get(token, ())
+            ambiguous = len({county for _, county, _, _ in candidates}) > 1
+            for key, county, lat, lng in candidates:
+                if lat is not None and lng is not None and (not ambiguous or county in tokens):
+                    matches.append((user_id, key, lat, lng))
+    return matches
+
+
+def _areas_named(names):
+    """(key, name, county_name, latitude, longitude) for wards and sub-counties called any of `names`."""
+    rows = []
+    for model, field, county_field in ((Ward, 'ward_id', 'sub_county__county__name'), (SubCounty, 'sub_county_id', 'county__name')):
+        named = model.objects.annotate(name_lower=Lower('name')).filter(name_lower__in=names)
+        for pk, name, county_name, lat, lng in named.values_list('pk', 'name', county_field, 'latitude', 'longitude'):
+            rows.append(((field, pk), name, county_name, lat, lng))
+    return rows
+
+
+def sync_service_areas(users):
+    """Re-resolves the UserServiceArea links of `users` (instances with pk and service_areas)."""
+    tokens_by_user = {user.pk: service_area_tokens(user.service_areas) for user in users}
+    names = set().union(*tokens_by_user.values())
+    links = [
+        UserServiceArea(user_id=user_id, latitude=lat, longitude=lng, **{field: pk})
+        for user_id, (field, pk), lat, lng in match_service_areas(tokens_by_user, _areas_named(names) if names else [])
+    ]
+    with transaction.atomic():
+        UserServiceArea.objects.filter(user_id__in=tokens_by_user).delete()
+        UserServiceArea.objects.bulk_create(links)
+    return len(links)
+
+
+def sync_service_areas_for_area(area, chunk_size=1000):
+    """
+    Re-resolves users affected by a ward or sub-county change: those listing its name
+    (a new same-named area can make a bare name ambiguous) and those already linked to it.
+    """
+    field = 'ward' if isinstance(area, Ward) else 'sub_county'
+    users = (
+        User.objects.filter(Q(service_areas__icontains=area.name) | Q(**{f'service_area_links__{field}': area}))
+        .distinct().only('pk', 'service_areas')
+    )
+    return rebuild_service_areas(users, chunk_size=chunk_size)
+
+
+def rebuild_service_areas(users=None, chunk_size=1000):
+    """Recomputes the UserServiceArea links of `users` (default: everyone). Returns the number of links."""
+    users = (User.objects.only('pk', 'service_areas') if users is None else users).order_by()
+    total, chunk = 0, []
+    for user in users.iterator(chunk_size=chunk_size):
+        chunk.append(user)
+        if len(chunk) >= chunk_size:
+            total += sync_service_areas(chunk)
+            chunk = []
+    if chunk:
+        total += sync_service_areas(chunk)
+    return total
+
+
+def filter_freelancers_near(queryset, lat, lng, radius_km):
+    """
+    Restricts freelancers to those with a service area within the radius, annotated with
+    `distance_km` to the nearest one. The radius search runs against the indexed
+    UserServiceArea centroids, so the query stays the same size however many areas match.
+    """
+    nearby = filter_within_radius(UserServiceArea.objects.all(), lat, lng, radius_km)
+    nearest = nearby.filter(user=OuterRef('pk')).values('distance_km')[:1]
+    return (
+        queryset
+        .filter(pk__in=nearby.order_by().values('user_id'))
+        .annotate(distance_km=Subquery(nearest, output_field=FloatField()))
+    )
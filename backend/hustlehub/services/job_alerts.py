@@ -0,0 +1,75 @@
+import logging
+from django.db.models import Q, F, Count
+from ..models import SavedSearch, SavedSearchTerm
+from .notification_service import fan_out_notifications
+
+logger = logging.getLogger(__name__)
+
+
+def job_index_terms(job):
+    """(dimension, value) pairs a job can match in the saved search index."""
+    terms = {('skill', str(skill).strip().lower()) for skill in job.skills if str(skill).strip()}
+    for dimension in ('county', 'sub_county', 'ward'):
+        area_id = getattr(job, f'{dimension}_id')
+        if area_id:
+            terms.add((dimension, str(area_id)))
+    if job.job_type:
+        terms.add(('job_type', job.job_type))
+    return terms
+
+
+def match_saved_searches(job):
+    """
+    Returns the IDs of users with an active saved search matching the job.
+
+    Only index entries for the job's own skills, locations and job type are read, so
+    the cost grows with the number of candidate searches rather than all searches.
+    A search matches when every dimension it filters on is hit at least once.
+    """
+    terms = job_index_terms(job)
+    if not terms:
+        return []
+
+    term_filter = Q()
+    for dimension, value in terms:
+        term_filter |= Q(dimension=dimension, value=value)
+
+    matched_search_ids = (
+        SavedSearchTerm.objects.filter(term_filter, saved_search__is_active=True)
+        .values('saved_search')
+        .annotate(matched=Count('dimension', distinct=True))
+        .filter(matched=F('saved_search__criteria_count'))
+        .values('saved_search')
+    )
+
+    searches = SavedSearch.objects.filter(id__in=matched_search_ids).exclude(user=job.employer_id)
+    if job.budget is None:
+        searches = searches.filter(min_budget__isnull=True, max_budget__isnull=True)
+    else:
+        searches = searches.filter(
+            Q(min_budget__isnull=True) | Q(min_budget__lte=job.budget),
+            Q(max_budget__isnull=True) | Q(max_budget__gte=job.budget),
+        )
+
+    # Respect NotificationSettings.job_alerts; users without settings get the default (on)
+    searches = searches.exclude(user__notification_settings__job_alerts=False)
+    return list(searches.values_list('user_id', flat=True).distinct())
+
+
+def send_job_alerts(job):
+    """
+    Queues one job alert per matching subscriber for their next notification digest,
+    using bulk inserts.
+    """
+    user_ids = match_saved_searches(job)
+    if not user_ids:
+        return 0
+
+    return fan_out_notifications(
+        user_ids,
+        title="New job matching your saved search",
+        message=f"'{job.title}' was just posted and matches one of your saved searches.",
+        type='job_alert',
+        related_object=job,
+        digest=True,
+    )
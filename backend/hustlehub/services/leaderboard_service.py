@@ -0,0 +1,203 @@
+import logging
+import threading
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count, Q
+from django.utils.module_loading import import_string
+from ..models import User
+
+logger = logging.getLogger(__name__)
+
+MAX_LEADERBOARD_LIMIT = 100
+MAX_AROUND_RADIUS = 25
+
+
+class DatabaseLeaderboard:
+    """
+    Leaderboard read straight from the indexed User.xp_points column. Needs no upkeep,
+    but a rank lookup is an index range count over everyone ranked above, so it grows
+    with the user base; it is the fallback when Redis is not configured.
+    """
+    def update(self, user_id, xp_points):
+        pass
+
+    def remove(self, user_id):
+        pass
+
+    def rebuild(self, chunk_size=1000):
+        return User.objects.count()
+
+    def rank(self, xp_points):
+        """Competition rank: users on the same XP share a rank."""
+        return User.objects.filter(xp_points__gt=xp_points).count() + 1
+
+    def ranks(self, xp_values):
+        """{xp: rank} for many XP totals, counted in one aggregate query."""
+        xp_values = sorted(set(xp_values))
+        if not xp_values:
+            return {}
+        counts = User.objects.filter(xp_points__gt=xp_values[0]).aggregate(
+            **{f'above_{index}': Count('pk', filter=Q(xp_points__gt=xp)) for index, xp in enumerate(xp_values)}
+        )
+        return {xp: counts[f'above_{index}'] + 1 for index, xp in enumerate(xp_values)}
+
+    def top(self, limit):
+        """Returns (position of the first row, [(user_id, xp_points), ...]) for the top `limit` users."""
+        return 0, list(User.objects.order_by('-xp_points', 'pk').values_list('pk', 'xp_points')[:limit])
+
+    def around(self, user_id, xp_points, radius):
+        """Returns (position of the first row, rows) for up to `radius` users either side of the user."""
+        ahead = User.objects.filter(Q(xp_points__gt=xp_points) | Q(xp_points=xp_points, pk__lt=user_id))
+        behind = User.objects.filter(Q(xp_points__lt=xp_points) | Q(xp_points=xp_points, pk__gt=user_id))
+        above = list(ahead.order_by('xp_points', '-pk').values_list('pk', 'xp_points')[:radius])[::-1]
+        below = list(behind.order_by('-xp_points', 'pk').values_list('pk', 'xp_points')[:radius])
+        return ahead.count() - len(above), [*above, (user_id, xp_points), *below]
+
+
+class RedisLeaderboard:
+    """
+    Leaderboard kept in a Redis sorted set, so rank and window lookups are O(log n).
+    Updated incrementally as XP changes. The first process to read an unbuilt board fills
+    it from the database; `rebuild_leaderboard` repopulates it on demand. Requires the
+    `redis` package and REDIS_URL; the default backend whenever REDIS_URL is set.
+    """
+    key = 'hustlehub:leaderboard:xp'
+    built_key = f'{key}:built'
+    build_lock_key = f'{key}:building'
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisLeaderboard requires the 'redis' package.")
+        if not getattr(settings, 'REDIS_URL', None):
+            raise ImproperlyConfigured("RedisLeaderboard requires REDIS_URL to be set.")
+        self.client = redis.Redis.from_url(settings.REDIS_URL)
+        self._built = False
+
+    def _ensure_built(self):
+        # Incremental updates create the key on their own, so a separate marker records a full build
+        if self._built:
+            return
+        if not self.client.exists(self.built_key) and self.client.set(self.build_lock_key, 1, nx=True, ex=300):
+            try:
+                self.rebuild()
+            finally:
+                self.client.delete(self.build_lock_key)
+        self._built = bool(self.client.exists(self.built_key))
+
+    def update(self, user_id, xp_points):
+        self.client.zadd(self.key, {str(user_id): xp_points})
+
+    def remove(self, user_id):
+        self.client.zrem(self.key, str(user_id))
+
+    def rebuild(self, chunk_size=1000):
+        # Fill a scratch key and swap it in so readers never see a partial board
+        scratch_key = f'{self.key}:rebuild'
+        self.client.delete(scratch_key)
+        total = 0
+        rows = User.objects.order_by().values_list('pk', 'xp_points').iterator(chunk_size=chunk_size)
+        chunk = {}
+        for user_id, xp_points in rows:
+            chunk[str(user_id)] = xp_points
+            if len(chunk) >= chunk_size:
+                self.client.zadd(scratch_key, chunk)
+                total += len(chunk)
+                chunk = {}
+        if chunk:
+            self.client.zadd(scratch_key, chunk)
+            total += len(chunk)
+        if total:
+            self.client.rename(scratch_key, self.key)
+        else:
+            self.client.delete(self.key)
+        self.client.set(self.built_key, 1)
+        return total
+
+    def rank(self, xp_points):
+        self._ensure_built()
+        return self.client.zcount(self.key, f'({xp_points}', '+inf') + 1
+
+    def ranks(self, xp_values):
+        self._ensure_built()
+        xp_values = sorted(set(xp_values))
+        pipeline = self.client.pipeline(transaction=False)
+        for xp in xp_values:
+            pipeline.zcount(self.key, f'({xp}', '+inf')
+        return {xp: above + 1 for xp, above in zip(xp_values, pipeline.execute())}
+
+    def _rows(self, start, stop):
+        to_pk = User._meta.pk.to_python
+        return [(to_pk(member.decode()), int(score)) for member, score in self.client.zrevrange(self.key, start, stop, withscores=True)]
+
+    def top(self, limit):
+        self._ensure_built()
+        return 0, self._rows(0, limit - 1)
+
+    def around(self, user_id, xp_points, radius):
+        self._ensure_built()
+        position = self.client.zrevrank(self.key, str(user_id))
+        if position is None:
+            self.update(user_id, xp_points)
+            position = self.client.zrevrank(self.key, str(user_id))
+        start = max(position - radius, 0)
+        return start, self._rows(start, position + radius)
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard():
+    global _leaderboard
+    with _leaderboard_lock:
+        if _leaderboard is None:
+            backend_path = getattr(settings, 'LEADERBOARD_BACKEND', None)
+            _leaderboard = import_string(backend_path)() if backend_path else DatabaseLeaderboard()
+    return _leaderboard
+
+
+def sync_user_xp(user_id, xp_points):
+    """Pushes a user's new XP total to the leaderboard; failures are logged, not raised."""
+    try:
+        get_leaderboard().update(user_id, xp_points)
+    except Exception as e:
+        logger.error(f"sync_user_xp: Could not update leaderboard for user {user_id}: {e}")
+
+
+def get_rank(user):
+    return get_leaderboard().rank(user.xp_points)
+
+
+def get_ranks(xp_values):
+    return get_leaderboard().ranks(xp_values)
+
+
+def _ranked_users(first_position, rows):
+    """
+    Loads the users for ordered (user_id, xp) rows and sets `rank` on each. Only the
+    first row needs a rank lookup; later ranks follow from their position.
+    """
+    board = get_leaderboard()
+    users = User.objects.in_bulk([user_id for user_id, _ in rows])
+    ranked, rank, previous_xp = [], None, None
+    for index, (user_id, xp_points) in enumerate(rows):
+        if xp_points != previous_xp:
+            rank = board.rank(xp_points) if index == 0 else first_position + index + 1
+            previous_xp = xp_points
+        user = users.get(user_id)
+        if user is not None:
+            user.rank = rank
+            ranked.append(user)
+    return ranked
+
+
+def top_users(limit=10):
+    limit = max(1, min(limit, MAX_LEADERBOARD_LIMIT))
+    return _ranked_users(*get_leaderboard().top(limit))
+
+
+def users_around(user, radius=5):
+    radius = max(0, min(radius, MAX_AROUND_RADIUS))
+    return _ranked_users(*get_leaderboard().around(user.pk, user.xp_points, radius))
@@ -0,0 +1,75 @@
+import logging
+from itertools import islice
+from django.db import transaction
+from django.db.models import F, Sum
+from ..models import LoyaltyPointLog, User
+from .notification_service import FANOUT_CHUNK_SIZE, chunked, iter_user_ids
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientLoyaltyPoints(Exception):
+    pass
+
+
+def adjust_loyalty_balance(user_ids, points):
+    """Moves the denormalized User.loyalty_points balance of the given users by `points` atomically."""
+    User.objects.filter(pk__in=user_ids).update(loyalty_points=F('loyalty_points') + points)
+
+
+def credit_loyalty_points(user, points, source):
+    """Adds a ledger entry; the balance moves in the same transaction (see the LoyaltyPointLog post_save hook)."""
+    with transaction.atomic():
+        return LoyaltyPointLog.objects.create(user=user, points=points, source=source)
+
+
+def bulk_credit_loyalty_points(recipients, points, source, chunk_size=FANOUT_CHUNK_SIZE):
+    """Credits the same number of loyalty points to many users with one INSERT and one UPDATE per chunk."""
+    total = 0
+    for user_ids in chunked(iter_user_ids(recipients, chunk_size), chunk_size):
+        with transaction.atomic():
+            LoyaltyPointLog.objects.bulk_create([
+                LoyaltyPointLog(user_id=user_id, points=points, source=source) for user_id in user_ids
+            ])
+            # bulk_create skips the post_save hook that keeps balances in step
+            adjust_loyalty_balance(user_ids, points)
+        total += len(user_ids)
+    logger.info(f"bulk_credit_loyalty_points: Credited {points} points to {total} users")
+    return total
+
+
+def redeem_loyalty_points(user, points):
+    """
+    Spends `points` from the user's balance. The user row is locked while the balance is
+    checked and the negative ledger entry written, so concurrent redemptions cannot
+    overdraw it. Raises InsufficientLoyaltyPoints. Returns the new balance.
+    """
+    if points <= 0:
+        raise ValueError("Points to redeem must be positive.")
+    with transaction.atomic():
+        balance = User.objects.select_for_update().values_list('loyalty_points', flat=True).get(pk=user.pk)
+        if balance < points:
+            raise InsufficientLoyaltyPoints(f"Balance of {balance} points is less than {points}.")
+        LoyaltyPointLog.objects.create(user=user, points=-points, source='redemption')
+    user.loyalty_points = balance - points
+    return user.loyalty_points
+
+
+def verify_loyalty_balances(fix=False, chunk_size=1000):
+    """
+    Compares every stored balance with its ledger sum using one grouped SUM per chunk of
+    users. Returns [(user_id, stored, ledger)] for mismatches; with `fix`, rewrites them in bulk.
+    """
+    mismatches = []
+    user_rows = User.objects.order_by('pk').values_list('pk', 'loyalty_points').iterator(chunk_size=chunk_size)
+    while chunk := list(islice(user_rows, chunk_size)):
+        stored = dict(chunk)
+        ledger = dict(
+            LoyaltyPointLog.objects.filter(user_id__in=stored).order_by()
+            .values_list('user').annotate(total=Sum('points'))
+        )
+        drifted = [(user_id, balance, ledger.get(user_id, 0)) for user_id, balance in stored.items() if balance != ledger.get(user_id, 0)]
+        if fix and drifted:
+            User.objects.bulk_update([User(pk=user_id, loyalty_points=total) for user_id, _, total in drifted], ['loyalty_points'])
+        mismatches.extend(drifted)
+    return mismatches
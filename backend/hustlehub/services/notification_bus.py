@@ -0,0 +1,262 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+from ..models import Notification
+from ..serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+REPLAY_LIMIT = 100
+
+
+class BaseNotificationBackend(ABC):
+    """
+    Cross-process transport for the notification bus. `publish` sends an event to every
+    process; `start` begins delivering events from other processes to `deliver(user_id, event)`.
+    Backends also track which users have a stream open in any process, so publishers can
+    skip serializing notifications nobody is listening for.
+    """
+    @abstractmethod
+    def publish(self, user_id, event):
+        ...
+
+    @abstractmethod
+    def start(self, deliver):
+        ...
+
+    @abstractmethod
+    def touch_listener(self, user_id):
+        """Marks this process as holding a stream for the user; repeated on every heartbeat."""
+
+    @abstractmethod
+    def remove_listener(self, user_id):
+        """Called when this process closes its last stream for the user."""
+
+    @abstractmethod
+    def listening(self, user_ids):
+        """The subset of `user_ids` with a live stream in any process."""
+
+
+class RedisNotificationBackend(BaseNotificationBackend):
+    """
+    Redis pub/sub transport. Requires the `redis` package and REDIS_URL. Each user's
+    listeners are a sorted set of process tokens scored by expiry; streams refresh their
+    entry on every heartbeat, so a crashed process drops out once its entries lapse.
+    """
+    channel = 'hustlehub:notifications'
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisNotificationBackend requires the 'redis' package.")
+        if not getattr(settings, 'REDIS_URL', None):
+            raise ImproperlyConfigured("RedisNotificationBackend requires REDIS_URL to be set.")
+        self.client = redis.Redis.from_url(settings.REDIS_URL)
+        self.token = uuid.uuid4().hex
+        # Outlives a missed heartbeat or two
+        self.listener_ttl = 3 * getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 15)
+
+    def _listeners_key(self, user_id):
+        return f'{self.channel}:listeners:{user_id}'
+
+    def publish(self, user_id, event):
+        self.client.publish(self.channel, json.dumps({'user_id': str(user_id), **event}))
+
+    def start(self, deliver):
+        def listen():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+            for message in pubsub.listen():
+                try:
+                    event = json.loads(message['data'])
+                    deliver(event.pop('user_id'), event)
+                except (ValueError, KeyError) as e:
+                    logger.error(f"RedisNotificationBackend: Dropped malformed message: {e}")
+
+        threading.Thread(target=listen, name='hustlehub-notification-bus', daemon=True).start()
+
+    def touch_listener(self, user_id):
+        key = self._listeners_key(user_id)
+        pipe = self.client.pipeline()
+        pipe.zadd(key, {self.token: time.time() + self.listener_ttl})
+        pipe.expire(key, self.listener_ttl)
+        pipe.execute()
+
+    def remove_listener(self, user_id):
+        self.client.zrem(self._listeners_key(user_id), self.token)
+
+    def listening(self, user_ids):
+        user_ids = list(user_ids)
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.zcount(self._listeners_key(user_id), now, '+inf')
+        return {user_id for user_id, count in zip(user_ids, pipe.execute()) if count}
+
+
+class NotificationBus:
+    """
+    In-process pub/sub of notification events keyed by user. Stream consumers subscribe
+    with an asyncio queue; publishers may call from any thread. With a backend configured,
+    publishes go through it so streams held by other processes receive them too.
+    """
+    def __init__(self, backend=None):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self.backend = backend
+        if backend is not None:
+            backend.start(self.deliver)
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(str(user_id), set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(str(user_id), set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            last = not subscribers
+            if last:
+                self._subscribers.pop(str(user_id), None)
+        if last and self.backend is not None:
+            self.backend.remove_listener(user_id)
+
+    def keepalive(self, user_id):
+        """Keeps this process registered as a listener for the user while a stream is open."""
+        if self.backend is not None:
+            self.backend.touch_listener(user_id)
+
+    def listening(self, user_ids):
+        """The subset of `user_ids` with an open stream here or, with a backend, in any process."""
+        user_ids = set(user_ids)
+        if self.backend is not None:
+            return self.backend.listening(user_ids)
+        with self._lock:
+            return {user_id for user_id in user_ids if str(user_id) in self._subscribers}
+
+    def has_listeners(self, user_id):
+        return bool(self.listening([user_id]))
+
+    def publish(self, user_id, event):
+        if self.backend is not None:
+            self.backend.publish(user_id, event)
+        else:
+            self.deliver(user_id, event)
+
+    def deliver(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(user_id), ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._enqueue, queue, event)
+
+    @staticmethod
+    def _enqueue(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stalled client; it can catch up with Last-Event-ID after reconnecting
+            logger.warning("NotificationBus: Subscriber queue full, dropping event.")
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_notification_bus():
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            backend_path = getattr(settings, 'NOTIFICATION_BUS_BACKEND', None)
+            _bus = NotificationBus(import_string(backend_path)() if backend_path else None)
+    return _bus
+
+
+def notification_event(notification):
+    """SSE event for a notification: its ID (used for Last-Event-ID) and the serialized row."""
+    return {
+        'id': str(notification.pk),
+        'data': json.dumps(NotificationSerializer(notification).data, cls=JSONEncoder),
+    }
+
+
+def publish_notification(notification):
+    """Pushes a newly created notification to the owner's open streams, if any."""
+    publish_notifications([notification])
+
+
+def publish_notifications(notifications):
+    """
+    Pushes new notifications to their owners' open streams. Listeners are looked up
+    once for the whole batch; notifications for users without a stream are not serialized.
+    """
+    bus = get_notification_bus()
+    listening = bus.listening({notification.user_id for notification in notifications})
+    for notification in notifications:
+        if notification.user_id in listening:
+            bus.publish(notification.user_id, notification_event(notification))
+
+
+def missed_events(user_id, last_event_id):
+    """Events for notifications created after `last_event_id`, oldest first, for stream resume."""
+    try:
+        last_seen = Notification.objects.get(pk=last_event_id, user_id=user_id)
+    except (Notification.DoesNotExist, ValidationError, ValueError):
+        return []
+    missed = Notification.objects.filter(user_id=user_id, created_at__gt=last_seen.created_at).order_by('created_at')
+    return [notification_event(notification) for notification in missed[:REPLAY_LIMIT]]
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: notification\ndata: {event['data']}\n\n"
+
+
+async def notification_stream(user_id, last_event_id=None):
+    """
+    Async generator of SSE frames for a user's new notifications. Subscribes before
+    replaying missed events so nothing published in between is lost, and sends a
+    comment frame as a heartbeat when the stream is idle. The stream is held open
+    indefinitely, so it needs an ASGI server; see NotificationStreamView.
+    """
+    bus = get_notification_bus()
+    queue = bus.subscribe(user_id)
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 15)
+    keepalive = sync_to_async(bus.keepalive, thread_sensitive=False)
+    loop = asyncio.get_running_loop()
+    try:
+        await keepalive(user_id)
+        last_keepalive = loop.time()
+        yield "retry: 3000\n\n"
+        replayed = set()
+        if last_event_id:
+            for event in await sync_to_async(missed_events)(user_id, last_event_id):
+                replayed.add(event['id'])
+                yield format_sse(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                event = None
+            # A busy stream never idles, so listener registration is refreshed on a clock
+            if loop.time() - last_keepalive >= heartbeat:
+                await keepalive(user_id)
+                last_keepalive = loop.time()
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event['id'] not in replayed:
+                yield format_sse(event)
+    finally:
+        await sync_to_async(bus.unsubscribe, thread_sensitive=False)(user_id, queue)
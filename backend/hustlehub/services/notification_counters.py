@@ -0,0 +1,83 @@
+from itertools import islice
+from django.core.cache import cache
+from django.db.models import Count, Q, F
+from ..models import Notification, User
+
+UNREAD_COUNT_TIMEOUT = 60 * 60 * 24  # recomputed at least daily even if nothing reconciles it
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_q(read_until):
+    """Notifications still unread for a user whose mark-all-read watermark is `read_until`."""
+    q = Q(is_read=False)
+    if read_until is not None:
+        q &= Q(created_at__gt=read_until)
+    return q
+
+
+# unread_q() for queries spanning many users, reading each owner's watermark through a join
+UNREAD_FOR_OWNER_Q = Q(is_read=False) & (
+    Q(user__notifications_read_until__isnull=True) | Q(created_at__gt=F('user__notifications_read_until'))
+)
+
+
+def get_unread_count(user):
+    """Unread notification count from the cache, falling back to one COUNT on a miss."""
+    count = cache.get(_unread_key(user.pk))
+    if count is None or count < 0:
+        count = Notification.objects.filter(unread_q(user.notifications_read_until), user=user).count()
+        # add() rather than set() so an increment that raced with the COUNT is not clobbered
+        cache.add(_unread_key(user.pk), count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """Atomically moves a cached counter; a missing counter is left to be recomputed on read."""
+    if not delta:
+        return
+    try:
+        cache.incr(_unread_key(user_id), delta)
+    except ValueError:
+        pass
+
+
+def reset_unread_count(user_id):
+    """Sets a user's counter to zero after they mark everything read."""
+    cache.set(_unread_key(user_id), 0, UNREAD_COUNT_TIMEOUT)
+
+
+def invalidate_unread_counts(user_ids):
+    """Drops cached counters after bulk changes; they are recomputed on the next read."""
+    cache.delete_many([_unread_key(user_id) for user_id in user_ids])
+
+
+def reconcile_unread_counts(chunk_size=1000):
+    """
+    Recomputes every user's counter with one grouped COUNT per chunk of users and
+    overwrites the cache. Returns (users checked, counters that had drifted).
+    """
+    checked = drifted = 0
+    user_ids = User.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(user_ids, chunk_size)):
+        drifted += _reconcile_chunk(chunk)
+        checked += len(chunk)
+    return checked, drifted
+
+
+def _reconcile_chunk(user_ids):
+    actual = dict.fromkeys(user_ids, 0)
+    actual.update(
+        Notification.objects.filter(UNREAD_FOR_OWNER_Q, user_id__in=user_ids)
+        .values_list('user_id')
+        .annotate(unread=Count('id'))
+    )
+    cached = cache.get_many([_unread_key(user_id) for user_id in user_ids])
+    drifted = sum(
+        1 for user_id, count in actual.items()
+        if _unread_key(user_id) in cached and cached[_unread_key(user_id)] != count
+    )
+    cache.set_many({_unread_key(user_id): count for user_id, count in actual.items()}, UNREAD_COUNT_TIMEOUT)
+    return drifted
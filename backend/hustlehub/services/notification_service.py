@@ -0,0 +1,226 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from itertools import islice
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import QuerySet, Min, Q, F
+from django.utils import timezone
+from ..models import Notification, NotificationDigestEntry, NotificationSettings, User
+from .notification_counters import invalidate_unread_counts, reset_unread_count
+from .notification_bus import publish_notifications
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CHUNK_SIZE = 1000
+DIGEST_SAMPLE_SIZE = 5
+
+# NotificationSettings field that mutes each notification type; unlisted types always send
+SETTING_FOR_TYPE = {
+    'job_alert': 'job_alerts',
+    'job_update': 'application_updates',
+    'skill_barter': 'application_updates',
+}
+
+
+def iter_user_ids(recipients, chunk_size=FANOUT_CHUNK_SIZE):
+    """Streams user IDs from a User queryset (server-side, in chunks) or any iterable of IDs."""
+    if isinstance(recipients, QuerySet):
+        return recipients.order_by().values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+    return iter(recipients)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def notifications_enabled(user, type):
+    """Whether the user's NotificationSettings allow this notification type (on by default)."""
+    setting = SETTING_FOR_TYPE.get(type)
+    if setting is None:
+        return True
+    try:
+        return getattr(user.notification_settings, setting)
+    except NotificationSettings.DoesNotExist:
+        return True
+
+
+def notify(user, title, message, type='system', related_object=None, low_priority=False):
+    """
+    Notifies a user unless their settings mute this type. Low-priority events are buffered
+    as digest entries and delivered with the user's next digest instead of immediately.
+    """
+    if not notifications_enabled(user, type):
+        return None
+    model = NotificationDigestEntry if low_priority else Notification
+    return model.objects.create(user=user, title=title, message=message, type=type, related_object=related_object)
+
+
+def _deliver_created(user_ids, notifications):
+    """What post_save would do for bulk-created notifications: drop unread counters, push to streams."""
+    invalidate_unread_counts(user_ids)
+    publish_notifications(notifications)
+
+
+def fan_out_notifications(recipients, title, message, type='system', related_object=None, chunk_size=FANOUT_CHUNK_SIZE, digest=False):
+    """
+    Creates the same notification for many users with one INSERT per chunk.
+
+    `recipients` is a User queryset or an iterable of user IDs; querysets are streamed,
+    so memory stays flat for broadcasts to every user. The related object's content type
+    is resolved once for the whole fan-out. With `digest=True` the rows are buffered as
+    digest entries instead. Returns the number of rows created.
+    """
+    content_type = ContentType.objects.get_for_model(related_object) if related_object is not None else None
+    object_id = str(related_object.pk) if related_object is not None else None
+
+    total = 0
+    for user_ids in chunked(iter_user_ids(recipients, chunk_size), chunk_size):
+        if digest:
+            NotificationDigestEntry.objects.bulk_create([
+                NotificationDigestEntry(
+                    user_id=user_id, title=title, message=message, type=type,
+                    content_type=content_type, object_id=object_id,
+                )
+                for user_id in user_ids
+            ])
+            total += len(user_ids)
+            continue
+
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                user_id=user_id, title=title, message=message, type=type,
+                content_type=content_type, object_id=object_id,
+            )
+            for user_id in user_ids
+        ])
+        # bulk_create skips post_save, so drop the recipients' cached unread counters and
+        # push to any open streams here, once the rows are committed (or never, on rollback)
+        transaction.on_commit(partial(_deliver_created, user_ids, notifications))
+        total += len(user_ids)
+    logger.info(f"fan_out_notifications: Created {total} '{type}' {'digest entries' if digest else 'notifications'}")
+    return total
+
+
+def build_digest_notification(user_id, entries):
+    """A single pending entry is delivered as-is; several are coalesced into one summary."""
+    if len(entries) == 1:
+        entry = entries[0]
+        return Notification(
+            user_id=user_id, title=entry.title, message=entry.message, type=entry.type,
+            content_type_id=entry.content_type_id, object_id=entry.object_id,
+        )
+
+    types = {entry.type for entry in entries}
+    lines = [f"- {entry.title}" for entry in entries[:DIGEST_SAMPLE_SIZE]]
+    if len(entries) > DIGEST_SAMPLE_SIZE:
+        lines.append(f"...and {len(entries) - DIGEST_SAMPLE_SIZE} more.")
+    return Notification(
+        user_id=user_id,
+        title=f"You have {len(entries)} new updates",
+        message="\n".join(lines),
+        type=types.pop() if len(types) == 1 else 'system',
+    )
+
+
+def flush_notification_digests(window_minutes=None, flush_all=False, chunk_size=500):
+    """
+    Delivers buffered digest entries as one notification per user.
+
+    Only users whose oldest pending entry is older than the digest window are flushed,
+    so each user gets at most one digest per window; `flush_all` ignores the window.
+    Each chunk of users is written with one bulk INSERT and one DELETE.
+    Returns (notifications created, entries flushed).
+    """
+    if window_minutes is None:
+        window_minutes = settings.NOTIFICATION_DIGEST_WINDOW_MINUTES
+    flushed_until = timezone.now()
+
+    pending = NotificationDigestEntry.objects.order_by().values('user').annotate(oldest=Min('created_at'))
+    if not flush_all:
+        pending = pending.filter(oldest__lte=flushed_until - timedelta(minutes=window_minutes))
+    user_ids = list(pending.values_list('user', flat=True))
+
+    created = flushed = 0
+    for chunk in chunked(user_ids, chunk_size):
+        entries = NotificationDigestEntry.objects.filter(user_id__in=chunk, created_at__lte=flushed_until)
+        grouped = defaultdict(list)
+        with transaction.atomic():
+            for entry in entries.order_by('created_at'):
+                grouped[entry.user_id].append(entry)
+            notifications = Notification.objects.bulk_create([
+                build_digest_notification(user_id, user_entries) for user_id, user_entries in grouped.items()
+            ])
+            entries.delete()
+
+        # bulk_create skips post_save, as in fan_out_notifications
+        transaction.on_commit(partial(_deliver_created, chunk, notifications))
+        created += len(notifications)
+        flushed += sum(len(user_entries) for user_entries in grouped.values())
+    logger.info(f"flush_notification_digests: Delivered {flushed} entries as {created} notifications")
+    return created, flushed
+
+
+def mark_all_notifications_read(user):
+    """
+    Marks every current notification read by moving the user's read watermark, a
+    single-row UPDATE however large the backlog. Notifications created later stay unread.
+    """
+    read_until = timezone.now()
+    User.objects.filter(pk=user.pk).update(notifications_read_until=read_until)
+    user.notifications_read_until = read_until
+    reset_unread_count(user.pk)
+    return read_until
+
+
+def materialize_read_watermark(user):
+    """
+    Copies the watermark into is_read on the rows it covers and clears it, so that
+    notifications under it can be marked unread again individually.
+    """
+    if user.notifications_read_until is None:
+        return 0
+    count = Notification.objects.filter(user=user, is_read=False, created_at__lte=user.notifications_read_until).update(is_read=True)
+    User.objects.filter(pk=user.pk).update(notifications_read_until=None)
+    user.notifications_read_until = None
+    return count
+
+
+def prunable_notifications(read_older_than_days, unread_older_than_days=None):
+    """
+    Notifications past retention: read ones (including those under the owner's read
+    watermark) older than `read_older_than_days`, and, if given, any notification at
+    all older than `unread_older_than_days`.
+    """
+    now = timezone.now()
+    read = Q(is_read=True) | Q(created_at__lte=F('user__notifications_read_until'))
+    expired = read & Q(created_at__lt=now - timedelta(days=read_older_than_days))
+    if unread_older_than_days is not None:
+        expired |= Q(created_at__lt=now - timedelta(days=unread_older_than_days))
+    return Notification.objects.filter(expired)
+
+
+def prune_notifications(read_older_than_days=90, unread_older_than_days=None, batch_size=1000, dry_run=False):
+    """
+    Deletes notifications past retention in primary-key batches, each its own short
+    transaction, so the inbox table stays bounded without long locks. Returns the number deleted.
+    """
+    candidates = prunable_notifications(read_older_than_days, unread_older_than_days)
+    if dry_run:
+        return candidates.count()
+
+    total = 0
+    while batch := list(candidates.order_by().values_list('pk', 'user_id')[:batch_size]):
+        user_ids = {user_id for _, user_id in batch}
+        with transaction.atomic():
+            # A plain delete() would load every row to send post_delete, whose only job is
+            # to drop unread counters; nothing references notifications, so delete raw and
+            # drop the batch's counters once instead
+            total += Notification.objects.filter(pk__in=[pk for pk, _ in batch])._raw_delete(Notification.objects.db)
+            transaction.on_commit(lambda user_ids=user_ids: invalidate_unread_counts(user_ids))
+    logger.info(f"prune_notifications: Deleted {total} notifications")
+    return total
@@ -0,0 +1,111 @@
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from ..models import XPLog, XPRollup
+
+logger = logging.getLogger(__name__)
+
+PERIOD_TYPES = ('week', 'month', 'all_time')
+ALL_TIME_START = date(2000, 1, 1)
+
+
+def period_start(period_type, day):
+    if period_type == 'week':
+        return day - timedelta(days=day.weekday())
+    if period_type == 'month':
+        return day.replace(day=1)
+    return ALL_TIME_START
+
+
+def rollup_keys(user_id, county_id, awarded_at):
+    """(user, period_type, period_start, county) rows an award at `awarded_at` counts towards."""
+    day = timezone.localdate(awarded_at)
+    counties = (None, county_id) if county_id else (None,)
+    return [
+        (user_id, period_type, period_start(period_type, day), county)
+        for period_type in PERIOD_TYPES
+        for county in counties
+    ]
+
+
+def record_xp(awards):
+    """
+    Adds awards to the rollups. `awards` is an iterable of (user_id, county_id, points,
+    awarded_at). Missing rows are inserted with one conflict-ignoring bulk INSERT, then
+    increments are applied atomically with F(), one UPDATE per period/county/points group,
+    so awarding the same points to many users costs a handful of queries.
+    """
+    increments = defaultdict(int)
+    for user_id, county_id, points, awarded_at in awards:
+        for key in rollup_keys(user_id, county_id, awarded_at):
+            increments[key] += points
+    if not increments:
+        return
+
+    groups = defaultdict(list)
+    for (user_id, period_type, start, county_id), points in increments.items():
+        groups[(period_type, start, county_id, points)].append(user_id)
+
+    with transaction.atomic():
+        XPRollup.objects.bulk_create(
+            [
+                XPRollup(user_id=user_id, period_type=period_type, period_start=start, county_id=county_id)
+                for user_id, period_type, start, county_id in increments
+            ],
+            ignore_conflicts=True,
+        )
+        for (period_type, start, county_id, points), user_ids in groups.items():
+            XPRollup.objects.filter(
+                user_id__in=user_ids, period_type=period_type, period_start=start, county_id=county_id,
+            ).update(xp=F('xp') + points)
+
+
+def record_xp_log(log):
+    record_xp([(log.user_id, log.county_id, log.points, log.created_at)])
+
+
+def period_leaderboard(period_type, county_id=None, limit=10, day=None):
+    """Top users for the current (or `day`'s) period, as rollup rows with a competition `rank`."""
+    start = period_start(period_type, day or timezone.localdate())
+    rows = list(
+        XPRollup.objects.filter(period_type=period_type, period_start=start, county_id=county_id, xp__gt=0)
+        .select_related('user')
+        .order_by('-xp', 'user_id')[:limit]
+    )
+    rank, previous_xp = None, None
+    for index, row in enumerate(rows):
+        if row.xp != previous_xp:
+            rank, previous_xp = index + 1, row.xp
+        row.rank = rank
+    return rows
+
+
+def rebuild_xp_rollups():
+    """Recomputes every rollup from the XPLog ledger with grouped queries (for backfills and repair)."""
+    truncs = {'week': TruncWeek('created_at'), 'month': TruncMonth('created_at')}
+    rollups = []
+    for period_type in PERIOD_TYPES:
+        for county_field in (None, 'county'):
+            fields = ['user'] + ([county_field] if county_field else [])
+            logs = XPLog.objects.order_by()
+            if county_field:
+                logs = logs.filter(county__isnull=False)
+            if period_type in truncs:
+                logs = logs.annotate(period=truncs[period_type])
+                fields.append('period')
+            for row in logs.values(*fields).annotate(xp=Sum('points')):
+                start = timezone.localdate(row['period']) if 'period' in row else ALL_TIME_START
+                rollups.append(XPRollup(
+                    user_id=row['user'], period_type=period_type, period_start=start,
+                    county_id=row.get(county_field) if county_field else None, xp=row['xp'],
+                ))
+
+    with transaction.atomic():
+        XPRollup.objects.all().delete()
+        XPRollup.objects.bulk_create(rollups, batch_size=1000)
+    logger.info(f"rebuild_xp_rollups: Rebuilt {len(rollups)} rollup rows")
+    return len(rollups)
@@ -0,0 +1,121 @@
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from ..models import User, UserBadge, XPLog, LEVEL_THRESHOLDS
+from .badge_registry import badge_registry
+from .leaderboard_service import sync_user_xp
+from .notification_service import chunked, fan_out_notifications
+from .xp_rollup_service import record_xp
+from .dashboard_service import bump_dashboard_generations
+
+logger = logging.getLogger(__name__)
+
+BULK_AWARD_CHUNK_SIZE = 500
+
+
+def level_for_xp(xp_points):
+    """Level reached with `xp_points`: one per LEVEL_THRESHOLDS entry at or below it."""
+    return max(1, bisect_right(LEVEL_THRESHOLDS, xp_points))
+
+
+def _apply_level_ups(level_ups):
+    """
+    Persists level changes for {user_id: (old_level, new_level)}: one UPDATE per new level,
+    every skipped level's badge in one bulk insert, and one "Level Up!" notification per
+    user for the level they reached.
+    """
+    if not level_ups:
+        return
+
+    by_new_level = defaultdict(list)
+    for user_id, (old_level, new_level) in level_ups.items():
+        by_new_level[new_level].append(user_id)
+    for new_level, user_ids in by_new_level.items():
+        User.objects.filter(pk__in=user_ids, level__lt=new_level).update(level=new_level)
+
+    badges = badge_registry.level_badges({level for old, new in level_ups.values() for level in range(old + 1, new + 1)})
+    UserBadge.objects.bulk_create(
+        [
+            UserBadge(user_id=user_id, badge=badges[level])
+            for user_id, (old_level, new_level) in level_ups.items()
+            for level in range(old_level + 1, new_level + 1)
+        ],
+        ignore_conflicts=True,
+    )
+
+    for new_level, user_ids in by_new_level.items():
+        badge = badges[new_level]
+        fan_out_notifications(
+            user_ids,
+            title="Level Up!",
+            message=f"Congratulations! You've reached level {new_level} and unlocked the {badge.name} badge.",
+            type='level_up',
+            related_object=badge,
+        )
+
+
+def _sync_leaderboard(totals):
+    for user_id, xp_points in totals.items():
+        sync_user_xp(user_id, xp_points)
+
+
+def award_xp(user, points, source_job=None):
+    """
+    Awards XP to one user without lost updates: the total is incremented with F() in the
+    database, the level is derived from the committed total with bisect, and every level
+    crossed gets its badge. Writes an XPLog entry and refreshes `user.xp_points`/`user.level`.
+    """
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(xp_points=F('xp_points') + points)
+        xp_points, level = User.objects.filter(pk=user.pk).values_list('xp_points', 'level').get()
+        new_level = max(level, level_for_xp(xp_points))
+        if new_level > level:
+            _apply_level_ups({user.pk: (level, new_level)})
+        XPLog.objects.create(user=user, points=points, source_job=source_job)
+        transaction.on_commit(lambda: sync_user_xp(user.pk, xp_points))
+
+    user.xp_points, user.level = xp_points, new_level
+    return xp_points
+
+
+def bulk_award_xp(awards, source_job=None, chunk_size=BULK_AWARD_CHUNK_SIZE):
+    """
+    Awards XP to many users at once. `awards` maps user ID to points. Each chunk costs
+    one UPDATE per distinct points value, one read-back, the level-up writes, and one
+    bulk XPLog insert. Returns the number of users awarded.
+    """
+    to_pk = User._meta.pk.to_python
+    awards = {to_pk(user_id): points for user_id, points in awards.items()}
+    county_id = source_job.county_id if source_job is not None else None
+    total = 0
+    for user_ids in chunked(list(awards), chunk_size):
+        with transaction.atomic():
+            by_points = defaultdict(list)
+            for user_id in user_ids:
+                by_points[awards[user_id]].append(user_id)
+            for points, ids in by_points.items():
+                User.objects.filter(pk__in=ids).update(xp_points=F('xp_points') + points)
+
+            totals = User.objects.filter(pk__in=user_ids).values_list('pk', 'xp_points', 'level')
+            level_ups = {}
+            new_totals = {}
+            for user_id, xp_points, level in totals:
+                new_totals[user_id] = xp_points
+                new_level = level_for_xp(xp_points)
+                if new_level > level:
+                    level_ups[user_id] = (level, new_level)
+            _apply_level_ups(level_ups)
+
+            logs = XPLog.objects.bulk_create([
+                XPLog(user_id=user_id, points=awards[user_id], source_job=source_job, county_id=county_id)
+                for user_id in new_totals
+            ])
+            # bulk_create skips the XPLog post_save hook, so roll up here
+            record_xp((log.user_id, county_id, log.points, log.created_at) for log in logs)
+            transaction.on_commit(lambda totals=new_totals: _sync_leaderboard(totals))
+            bump_dashboard_generations(new_totals)
+        total += len(new_totals)
+    logger.info(f"bulk_award_xp: Awarded XP to {total} users")
+    return total
@@ -1,31 +1,126 @@
-from django.db.models.signals import post_save
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, post_init
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
 from .models import (
-    JobApplication, SkillBarterApplication, CommissionExcuse, Review, UserBadge,
-    Notification, User
+    Job, JobApplication, SkillBarterApplication, CommissionExcuse, Review, UserBadge,
+    Notification, User, XPLog, Badge, Referral, LoyaltyPointLog, CommissionLog, PortfolioItem,
+    SubCounty, Ward,
 )
+from .services.background import run_in_background
+from .services.job_alerts import send_job_alerts
+from .services.notification_counters import adjust_unread_count, invalidate_unread_counts
+from .services.notification_bus import publish_notification
+from .services.notification_service import notify
+from .services.leaderboard_service import get_leaderboard, sync_user_xp
+from .services.xp_rollup_service import record_xp_log
+from .services.badge_registry import badge_registry
+from .services.achievement_service import record_event
+from .services.loyalty_service import adjust_loyalty_balance
+from .services.commission_service import refresh_account_standing
+from .services.finance_rollup_service import remember_commission_state, record_commission_saved, record_commission_deleted
+from .services.geo_service import sync_service_areas, sync_service_areas_for_area
+from .services.dashboard_service import bump_dashboard_generation, bump_dashboard_generations
+
+@receiver(post_save, sender=Notification)
+def increment_unread_count(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        # After commit, so a rolled-back insert does not leave the counter too high
+        transaction.on_commit(partial(adjust_unread_count, instance.user_id, 1))
+
+@receiver(post_save, sender=Notification)
+def push_notification_to_streams(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_notification(instance))
+
+@receiver(post_delete, sender=Notification)
+def decrement_unread_count(sender, instance, **kwargs):
+    if not instance.is_read:
+        # The row may already count as read under the owner's watermark, so recount
+        invalidate_unread_counts([instance.user_id])
+
+# Write paths that change what a user's cached dashboard shows. Bulk writes that skip
+# these hooks (XP awards, level badges, standings) bump the generation themselves.
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=XPLog)
+@receiver(post_save, sender=UserBadge)
+@receiver(post_delete, sender=UserBadge)
+@receiver(post_save, sender=PortfolioItem)
+@receiver(post_delete, sender=PortfolioItem)
+def invalidate_user_dashboard(sender, instance, **kwargs):
+    bump_dashboard_generation(instance.pk if sender is User else instance.user_id)
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_freelancer_dashboard(sender, instance, **kwargs):
+    bump_dashboard_generation(instance.freelancer_id)
+
+@receiver(post_save, sender=User)
+def update_leaderboard(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'xp_points' in update_fields:
+        xp_points = instance.xp_points
+        transaction.on_commit(lambda: sync_user_xp(instance.pk, xp_points))
+
+@receiver(post_delete, sender=User)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    transaction.on_commit(lambda: get_leaderboard().remove(instance.pk))
+
+@receiver(post_save, sender=XPLog)
+def update_xp_rollups(sender, instance, created, **kwargs):
+    if created:
+        record_xp_log(instance)
+
+@receiver(post_save, sender=LoyaltyPointLog)
+def credit_loyalty_balance(sender, instance, created, **kwargs):
+    if created:
+        adjust_loyalty_balance([instance.user_id], instance.points)
+
+@receiver(post_delete, sender=LoyaltyPointLog)
+def debit_loyalty_balance(sender, instance, **kwargs):
+    adjust_loyalty_balance([instance.user_id], -instance.points)
+
+@receiver(post_save, sender=Badge)
+@receiver(post_delete, sender=Badge)
+def invalidate_badge_registry(sender, **kwargs):
+    badge_registry.invalidate()
+
+@receiver(post_save, sender=Job)
+def create_job_alert_notifications(sender, instance, created, **kwargs):
+    if created:
+        # Match saved searches off the request thread once the job row is committed
+        run_in_background(send_job_alerts, instance)
 
 @receiver(post_save, sender=JobApplication)
 def create_job_application_notification(sender, instance, created, **kwargs):
     if instance.status in ['accepted', 'rejected']:
-        Notification.objects.create(
-            user=instance.freelancer,
+        # Rejections wait for the user's next digest; acceptances go out right away
+        notify(
+            instance.freelancer,
             title=f"Application for {instance.job.title} {instance.status}",
             message=f"Your application for the job '{instance.job.title}' has been {instance.status}.",
             type='job_update',
-            related_object=instance.job
+            related_object=instance.job,
+            low_priority=instance.status == 'rejected',
         )
 
+@receiver(post_save, sender=JobApplication)
+def assign_commission_freelancer(sender, instance, created, **kwargs):
+    if instance.status == 'accepted':
+        # A commission logged before the acceptance was saved without its freelancer
+        if CommissionLog.objects.filter(job_id=instance.job_id, freelancer__isnull=True).update(freelancer_id=instance.freelancer_id):
+            refresh_account_standing(instance.freelancer_id)
+
 @receiver(post_save, sender=SkillBarterApplication)
 def create_skill_barter_notification(sender, instance, created, **kwargs):
     if instance.status in ['accepted', 'rejected']:
-        Notification.objects.create(
-            user=instance.applicant,
+        notify(
+            instance.applicant,
             title=f"Skill Barter Proposal {instance.status.capitalize()}",
             message=f"Your proposal for '{instance.post.title}' has been {instance.status}.",
             type='skill_barter',
-            related_object=instance.post
+            related_object=instance.post,
+            low_priority=instance.status == 'rejected',
         )
 
 @receiver(post_save, sender=CommissionExcuse)
@@ -39,6 +134,30 @@ def create_commission_excuse_notification(sender, instance, created, **kwargs):
             related_object=instance
         )
 
+# Keep the freelancer's materialized standing in step between overdue sweeps
+@receiver(post_save, sender=CommissionLog)
+@receiver(post_delete, sender=CommissionLog)
+def refresh_standing_for_commission(sender, instance, **kwargs):
+    if instance.freelancer_id is not None:
+        refresh_account_standing(instance.freelancer_id)
+
+@receiver(post_init, sender=CommissionLog)
+def remember_commission_finance_state(sender, instance, **kwargs):
+    remember_commission_state(instance)
+
+@receiver(post_save, sender=CommissionLog)
+def update_finance_rollups(sender, instance, created, **kwargs):
+    record_commission_saved(instance, created)
+
+@receiver(post_delete, sender=CommissionLog)
+def remove_from_finance_rollups(sender, instance, **kwargs):
+    record_commission_deleted(instance)
+
+@receiver(post_save, sender=CommissionExcuse)
+@receiver(post_delete, sender=CommissionExcuse)
+def refresh_standing_for_excuse(sender, instance, **kwargs):
+    refresh_account_standing(instance.user_id)
+
 @receiver(post_save, sender=Review)
 def create_review_notification(sender, instance, created, **kwargs):
     if created:
@@ -53,12 +172,73 @@ def create_review_notification(sender, instance, created, **kwargs):
 @receiver(post_save, sender=UserBadge)
 def create_badge_unlock_notification(sender, instance, created, **kwargs):
     if created:
+        badge = badge_registry.get(instance.badge_id) or instance.badge
         # Avoid creating a duplicate notification for level-up badges
-        if instance.badge.badge_type != 'level':
+        if badge.badge_type != 'level':
             Notification.objects.create(
-                user=instance.user,
+                user_id=instance.user_id,
                 title="New Badge Unlocked!",
-                message=f"You've unlocked the '{instance.badge.name}' badge. Congratulations!",
+                message=f"You've unlocked the '{badge.name}' badge. Congratulations!",
                 type='badge_unlock',
-                related_object=instance.badge
+                related_object=badge
             )
+
+
+# Achievement events, job status and service-area changes. post_init remembers the loaded state
+# so that hooks fire on the transition only, not on every later save of an already changed row.
+TRACKED_FIELDS = {
+    JobApplication: 'status', SkillBarterApplication: 'status', Referral: 'is_successful', Job: 'status',
+    User: 'service_areas',
+}
+
+def remember_loaded_state(sender, instance, **kwargs):
+    # __dict__ avoids loading a deferred field
+    instance._loaded_state = instance.__dict__.get(TRACKED_FIELDS[sender])
+
+def became(instance, field, value, created):
+    changed = created or instance._loaded_state != value
+    instance._loaded_state = getattr(instance, field)
+    return getattr(instance, field) == value and changed
+
+for _model in TRACKED_FIELDS:
+    post_init.connect(remember_loaded_state, sender=_model, dispatch_uid=f'remember_loaded_state_{_model.__name__}')
+
+@receiver(post_save, sender=Job)
+def invalidate_dashboards_on_job_status(sender, instance, created, **kwargs):
+    # Dashboards count accepted applications on closed jobs as completed
+    if not created and instance._loaded_state != instance.status:
+        bump_dashboard_generations(instance.applications.filter(status='accepted').values_list('freelancer_id', flat=True))
+    instance._loaded_state = instance.status
+
+@receiver(post_save, sender=User)
+def sync_user_service_areas(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'service_areas' not in update_fields:
+        return
+    if created or instance._loaded_state != instance.service_areas:
+        sync_service_areas([instance])
+    instance._loaded_state = instance.service_areas
+
+@receiver(post_save, sender=Ward)
+@receiver(post_save, sender=SubCounty)
+def sync_area_service_areas(sender, instance, **kwargs):
+    sync_service_areas_for_area(instance)
+
+@receiver(post_save, sender=Review)
+def review_achievements(sender, instance, created, **kwargs):
+    if created and instance.reviewee_id:
+        record_event('review_received', instance.reviewee_id, rating=instance.rating)
+
+@receiver(post_save, sender=JobApplication)
+def application_achievements(sender, instance, created, **kwargs):
+    if became(instance, 'status', 'accepted', created):
+        record_event('application_accepted', instance.freelancer_id)
+
+@receiver(post_save, sender=SkillBarterApplication)
+def barter_achievements(sender, instance, created, **kwargs):
+    if became(instance, 'status', 'accepted', created):
+        record_event('barter_accepted', instance.applicant_id)
+
+@receiver(post_save, sender=Referral)
+def referral_achievements(sender, instance, created, **kwargs):
+    if became(instance, 'is_successful', True, created):
+        record_event('referral_succeeded', instance.referrer_id)
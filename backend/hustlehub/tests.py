@@ -1,11 +1,20 @@
 
+import csv
 import json
 from decimal import Decimal
 from datetime import date, timedelta
 
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 from django.utils import timezone
+from django.test import override_settings
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+from unittest.mock import patch
 
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
@@ -13,10 +22,23 @@ from model_bakery import baker
 
 from hustlehub.models import (
     Job, JobApplication, CommissionLog, XPLog, LoyaltyPointLog, Referral, Badge, 
-    UserBadge, NotificationSettings, County, SubCounty, Ward, NeighborhoodTag,
+    UserBadge, NotificationSettings, County, SubCounty, Ward, NeighborhoodTag, JobCategory,
     CommissionExcuse, SkillBarterPost, SkillBarterOffer, Notification, Review, AboutUs,
-    PortfolioItem, SkillBarterApplication
+    PortfolioItem, SkillBarterApplication, SavedSearch, ArchivedJob, ArchivedJobApplication, ArchivedCommissionLog,
+    NotificationDigestEntry, XPRollup, AchievementCounter, AccountStanding, DailyFinanceRollup
 )
+from hustlehub.services.notification_service import fan_out_notifications, flush_notification_digests, prune_notifications
+from hustlehub.services.notification_counters import get_unread_count
+from hustlehub.services.notification_bus import publish_notification
+from hustlehub.services.xp_service import award_xp, bulk_award_xp, level_for_xp
+from hustlehub.services.badge_registry import badge_registry
+from hustlehub.services.dashboard_service import bulk_dashboard_stats
+from hustlehub.services.gamification_service import user_id_ranges
+from hustlehub.services.loyalty_service import (
+    bulk_credit_loyalty_points, credit_loyalty_points, redeem_loyalty_points, InsufficientLoyaltyPoints
+)
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.tokens import AccessToken
 
 User = get_user_model()
 
@@ -219,3 +241,1236 @@ class ComprehensiveAPITests(APITestCase):
         }
         self.client.post(url, data, format='json')
         self.assertTrue(UserBadge.objects.filter(user=self.employer_user, badge__name='First Job Posted').exists())
+
+
+class GeoRadiusSearchTests(APITestCase):
+    def setUp(self):
+        self.employer = baker.make(User, role='employer')
+        county = baker.make(County, name='Nairobi')
+        sub_county = baker.make(SubCounty, county=county, name='Starehe', latitude=-1.2833, longitude=36.8333)
+        self.cbd = baker.make(Ward, sub_county=sub_county, name='Nairobi Central', latitude=-1.2864, longitude=36.8172)
+        self.karen = baker.make(Ward, sub_county=sub_county, name='Karen', latitude=-1.3197, longitude=36.7073)
+        self.mombasa = baker.make(Ward, sub_county=sub_county, name='Tudor', latitude=-4.0435, longitude=39.6682)
+
+    def test_job_inherits_ward_centroid(self):
+        job = baker.make(Job, employer=self.employer, ward=self.karen)
+        self.assertEqual((job.latitude, job.longitude), (self.karen.latitude, self.karen.longitude))
+
+    def test_jobs_near_are_filtered_and_ordered_by_distance(self):
+        far = baker.make(Job, employer=self.employer, ward=self.karen, title='Karen job')
+        near = baker.make(Job, employer=self.employer, ward=self.cbd, title='CBD job')
+        baker.make(Job, employer=self.employer, ward=self.mombasa, title='Mombasa job')
+        response = self.client.get(reverse('job-list'), {'near': '-1.2860,36.8170', 'radius_km': 20})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([j['id'] for j in response.data], [str(near.id), str(far.id)])
+        self.assertLess(response.data[0]['distance_km'], 1)
+
+    def test_freelancers_near_match_service_areas(self):
+        karen_freelancer = baker.make(User, role='freelancer', service_areas='Karen, Langata')
+        cbd_freelancer = baker.make(User, role='freelancer', service_areas='Nairobi Central')
+        baker.make(User, role='freelancer', service_areas='Tudor')
+        response = self.client.get(reverse('user-list'), {'near': '-1.2860,36.8170', 'radius_km': 20})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([u['id'] for u in response.data], [str(cbd_freelancer.id), str(karen_freelancer.id)])
+
+    def test_freelancers_near_match_whole_areas_scoped_by_county(self):
+        kiambu = baker.make(SubCounty, county=baker.make(County, name='Kiambu'), name='Limuru')
+        baker.make(Ward, sub_county=kiambu, name='Karen', latitude=-1.1, longitude=36.6)
+        baker.make(User, role='freelancer', service_areas='Karen Rd Estates')
+        baker.make(User, role='freelancer', service_areas='Karen')
+        nairobi_karen = baker.make(User, role='freelancer', service_areas='Karen, Nairobi')
+        response = self.client.get(reverse('user-list'), {'near': '-1.3197,36.7073', 'radius_km': 5})
+        self.assertEqual([u['id'] for u in response.data], [str(nairobi_karen.id)])
+        self.assertLess(response.data[0]['distance_km'], 1)
+
+    def test_freelancers_near_with_many_areas_in_range(self):
+        sub_county = self.cbd.sub_county
+        Ward.objects.bulk_create([
+            Ward(sub_county=sub_county, name=f'Block {i}', latitude=-1.2 - i / 10000, longitude=36.8)
+            for i in range(1200)
+        ])
+        far = baker.make(User, role='freelancer', service_areas='Block 1100')
+        near = baker.make(User, role='freelancer', service_areas='Block 3, Block 900')
+        response = self.client.get(reverse('user-list'), {'near': '-1.2,36.8', 'radius_km': 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([u['id'] for u in response.data], [str(near.id), str(far.id)])
+        self.assertLess(response.data[0]['distance_km'], 0.1)
+
+    def test_service_area_links_follow_user_and_area_changes(self):
+        freelancer = baker.make(User, role='freelancer', service_areas='Tudor')
+        freelancer = User.objects.get(pk=freelancer.pk)
+        freelancer.service_areas = 'Karen'
+        freelancer.save()
+        self.assertEqual(list(freelancer.service_area_links.values_list('ward', flat=True)), [self.karen.pk])
+
+        # A same-named ward elsewhere makes the bare name ambiguous
+        kiambu = baker.make(SubCounty, county=baker.make(County, name='Kiambu'), name='Limuru')
+        baker.make(Ward, sub_county=kiambu, name='Karen', latitude=-1.1, longitude=36.6)
+        self.assertFalse(freelancer.service_area_links.exists())
+
+        self.karen.latitude = -1.2864
+        self.karen.name = 'Karen South'
+        self.karen.save()
+        freelancer.service_areas = 'Karen South'
+        freelancer.save()
+        self.assertEqual(freelancer.service_area_links.get().latitude, -1.2864)
+
+    def test_job_follows_ward_change(self):
+        job = baker.make(Job, employer=self.employer, ward=self.karen)
+        job = Job.objects.get(pk=job.pk)
+        job.ward = self.cbd
+        job.save()
+        self.assertEqual((job.latitude, job.longitude), (self.cbd.latitude, self.cbd.longitude))
+
+        job.ward, job.latitude, job.longitude = self.karen, -1.0, 36.0
+        job.save()
+        self.assertEqual((job.latitude, job.longitude), (-1.0, 36.0))
+
+    def test_malformed_near_is_rejected(self):
+        response = self.client.get(reverse('job-list'), {'near': 'nairobi'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class JobFacetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        employer = baker.make(User, role='employer')
+        self.tech = baker.make(JobCategory, name='Tech')
+        self.design = baker.make(JobCategory, name='Design')
+        self.nairobi = baker.make(County, name='Nairobi')
+        baker.make(Job, employer=employer, category=self.tech, county=self.nairobi, job_type='local', budget=500)
+        baker.make(Job, employer=employer, category=self.tech, job_type='remote', budget=2500)
+        baker.make(Job, employer=employer, category=self.design, county=self.nairobi, job_type='local', budget=None)
+        baker.make(Job, employer=employer, category=self.design, job_type='remote', status='closed')
+
+    def test_facets_count_open_jobs_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('job-facets'), {'search': 'zz-unique'})
+        self.assertEqual(response.data['total'], 0)
+
+        response = self.client.get(reverse('job-facets'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual([(c['name'], c['count']) for c in response.data['category']], [('Tech', 2), ('Design', 1)])
+        self.assertEqual([(c['name'], c['count']) for c in response.data['county']], [('Nairobi', 2)])
+        self.assertEqual({t['value']: t['count'] for t in response.data['job_type']}, {'remote': 1, 'local': 2})
+        bands = {b['band']: b['count'] for b in response.data['budget']}
+        self.assertEqual((bands['under_1000'], bands['1000_5000'], bands['unspecified']), (1, 1, 1))
+
+    def test_facets_follow_list_filters(self):
+        response = self.client.get(reverse('job-facets'), {'county': str(self.nairobi.id)})
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual([(c['name'], c['count']) for c in response.data['category']], [('Design', 1), ('Tech', 1)])
+
+        response = self.client.get(reverse('job-facets'), {'near': '-1.2860,36.8170', 'radius_km': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 0)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class JobAlertTests(APITestCase):
+    def setUp(self):
+        self.employer = baker.make(User, role='employer')
+        self.freelancer = baker.make(User, role='freelancer')
+        self.nairobi = baker.make(County, name='Nairobi')
+
+    def post_job(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = baker.make(Job, employer=self.employer, title='Build a site', **kwargs)
+        # Job alerts are buffered for the next digest
+        flush_notification_digests(flush_all=True)
+        return job
+
+    def test_saved_search_is_indexed_by_its_filters(self):
+        search = SavedSearch.objects.create(user=self.freelancer, skills=['Django', ' React'], county=self.nairobi)
+        self.assertEqual(search.criteria_count, 2)
+        self.assertEqual(
+            set(search.terms.values_list('dimension', 'value')),
+            {('skill', 'django'), ('skill', 'react'), ('county', str(self.nairobi.id))},
+        )
+
+    def test_job_alert_requires_every_filtered_dimension(self):
+        SavedSearch.objects.create(user=self.freelancer, skills=['django'], county=self.nairobi, max_budget=5000)
+        self.post_job(skills=['Django'], job_type='remote', budget=1000)
+        self.assertFalse(Notification.objects.filter(type='job_alert').exists())
+
+        job = self.post_job(skills=['Python', 'Django'], county=self.nairobi, job_type='local', budget=1000)
+        alert = Notification.objects.get(type='job_alert')
+        self.assertEqual((alert.user, alert.related_object), (self.freelancer, job))
+
+        self.post_job(skills=['Django'], county=self.nairobi, job_type='local', budget=9000)
+        self.assertEqual(Notification.objects.filter(type='job_alert').count(), 1)
+
+    def test_job_alerts_respect_notification_settings(self):
+        SavedSearch.objects.create(user=self.freelancer, job_type='remote')
+        NotificationSettings.objects.create(user=self.freelancer, job_alerts=False)
+        self.post_job(job_type='remote')
+        self.assertFalse(Notification.objects.filter(type='job_alert').exists())
+
+    def test_saved_search_needs_a_filter(self):
+        self.client.force_authenticate(self.freelancer)
+        response = self.client.post(reverse('savedsearch-list'), {'name': 'Anything', 'min_budget': '100'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('savedsearch-list'), {'skills': ['design']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SavedSearch.objects.get().user, self.freelancer)
+
+
+class ExpireJobsCommandTests(APITestCase):
+    def test_expires_open_jobs_past_deadline_idempotently(self):
+        employer = baker.make(User, role='employer')
+        today = timezone.localdate()
+        baker.make(Job, employer=employer, status='open', deadline=today - timedelta(days=1), _quantity=3)
+        current = baker.make(Job, employer=employer, status='open', deadline=today)
+        no_deadline = baker.make(Job, employer=employer, status='open', deadline=None)
+        closed = baker.make(Job, employer=employer, status='closed', deadline=today - timedelta(days=5))
+
+        out = StringIO()
+        call_command('expire_jobs', batch_size=2, stdout=out)
+        self.assertIn('Expired 3 jobs in 2 batches', out.getvalue())
+        self.assertEqual(Job.objects.filter(status='expired').count(), 3)
+        for job in (current, no_deadline):
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'open')
+        closed.refresh_from_db()
+        self.assertEqual(closed.status, 'closed')
+
+        out = StringIO()
+        call_command('expire_jobs', stdout=out)
+        self.assertIn('Expired 0 jobs', out.getvalue())
+
+
+class JobArchiveTests(APITestCase):
+    def setUp(self):
+        self.employer = baker.make(User, role='employer')
+        self.freelancer = baker.make(User, role='freelancer')
+        long_ago = timezone.now() - timedelta(days=365)
+
+        self.old_job = baker.make(Job, employer=self.employer, status='closed', title='Old job')
+        self.reviewed_job = baker.make(Job, employer=self.employer, status='closed')
+        self.unpaid_job = baker.make(Job, employer=self.employer, status='closed')
+        Job.objects.filter(id__in=[self.old_job.id, self.reviewed_job.id, self.unpaid_job.id]).update(created_at=long_ago)
+        self.recent_job = baker.make(Job, employer=self.employer, status='closed')
+
+        baker.make(JobApplication, job=self.old_job, freelancer=self.freelancer, status='accepted')
+        baker.make(CommissionLog, job=self.old_job, status='paid', total_amount=1000, commission_amount=200, freelancer_earning=800)
+        baker.make(Review, job=self.reviewed_job, reviewer=self.employer, reviewee=self.freelancer, rating=5)
+        baker.make(CommissionLog, job=self.unpaid_job, status='due', total_amount=100, commission_amount=20, freelancer_earning=80)
+
+    def test_archive_moves_only_eligible_jobs(self):
+        out = StringIO()
+        call_command('archive_jobs', stdout=out)
+        self.assertIn('Archived 1 jobs, 1 applications and 1 commission logs.', out.getvalue())
+        self.assertFalse(Job.objects.filter(id=self.old_job.id).exists())
+        self.assertEqual(set(Job.objects.values_list('id', flat=True)), {self.reviewed_job.id, self.unpaid_job.id, self.recent_job.id})
+        archived = ArchivedJob.objects.get(id=self.old_job.id)
+        self.assertEqual(archived.title, 'Old job')
+        self.assertEqual(archived.commission.commission_amount, Decimal('200.00'))
+
+    def test_history_reads_across_hot_and_archive_tables(self):
+        baker.make(JobApplication, job=self.recent_job, freelancer=self.freelancer, status='pending')
+        call_command('archive_jobs', stdout=StringIO())
+
+        self.client.force_authenticate(self.freelancer)
+        response = self.client.get(reverse('jobapplication-history'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(a['archived'] for a in response.data['applications']), [False, True])
+
+        self.client.force_authenticate(self.employer)
+        response = self.client.get(reverse('commissionlog-history'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(('Old job', True), [(c['job_title'], c['archived']) for c in response.data])
+        self.assertEqual(len(response.data), 2)
+
+    def test_completed_jobs_count_includes_archived_applications(self):
+        baker.make(JobApplication, job=self.recent_job, freelancer=self.freelancer, status='accepted')
+        call_command('archive_jobs', stdout=StringIO())
+
+        self.assertEqual(bulk_dashboard_stats([self.freelancer.pk])[self.freelancer.pk]['completed_jobs_count'], 2)
+        cache.clear()
+        self.client.force_authenticate(self.freelancer)
+        response = self.client.get(reverse('dashboard-stats'))
+        self.assertEqual(response.data['completed_jobs_count'], 2)
+
+    def test_archived_job_xp_keeps_its_county(self):
+        county = baker.make(County, name='Nakuru')
+        Job.objects.filter(id=self.old_job.id).update(county=county)
+        award_xp(self.freelancer, 50, source_job=Job.objects.get(id=self.old_job.id))
+        call_command('archive_jobs', stdout=StringIO())
+
+        call_command('rebuild_xp_rollups', stdout=StringIO())
+        self.assertEqual(XPRollup.objects.get(user=self.freelancer, period_type='all_time', county=county).xp, 50)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class NotificationFanOutTests(APITestCase):
+    def test_fan_out_writes_in_chunks(self):
+        users = baker.make(User, _quantity=5)
+        badge = baker.make(Badge, name='Broadcast')
+        ContentType.objects.get_for_model(Badge)  # warm the content type cache
+        with self.assertNumQueries(3):  # one streamed SELECT, two chunked INSERTs
+            created = fan_out_notifications(User.objects.all(), 'Hello', 'Hi all', related_object=badge, chunk_size=3)
+        self.assertEqual(created, 5)
+        self.assertEqual(Notification.objects.filter(object_id=str(badge.pk)).count(), 5)
+        self.assertEqual(set(Notification.objects.values_list('user', flat=True)), {u.pk for u in users})
+
+    def test_admin_broadcast_and_credit_actions(self):
+        admin_user = User.objects.create_superuser(email='root@example.com', password='pw', full_name='Root', username='root')
+        users = baker.make(User, _quantity=3)
+        self.client.force_login(admin_user)
+        url = reverse('admin:hustlehub_user_changelist')
+        selected = [str(u.pk) for u in users]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {
+                'action': 'send_notification', '_selected_action': selected,
+                'apply': 'Send', 'title': 'Maintenance', 'message': 'Back soon',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Notification.objects.filter(title='Maintenance').count(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'action': 'credit_loyalty_points', '_selected_action': selected})
+        self.assertEqual(LoyaltyPointLog.objects.filter(source='admin_credit', points=100).count(), 3)
+
+
+class UnreadCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = baker.make(User, role='freelancer')
+        self.client.force_authenticate(self.user)
+
+    def unread_count(self):
+        return self.client.get(reverse('notification-unread-count')).data['unread_count']
+
+    def test_counter_is_cached_and_kept_in_step(self):
+        first, second, _ = baker.make(Notification, user=self.user, is_read=False, _quantity=3)
+        self.assertEqual(self.unread_count(), 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(Notification, user=self.user, is_read=False)
+        self.assertEqual(self.unread_count(), 4)
+
+        # A rolled-back insert never reaches the counter
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                baker.make(Notification, user=self.user, is_read=False)
+                raise ValueError
+        self.assertEqual(get_unread_count(self.user), 4)
+
+        self.client.patch(reverse('notification-detail', kwargs={'pk': first.pk}), {'is_read': True}, format='json')
+        self.assertEqual(self.unread_count(), 3)
+
+        second.delete()
+        self.assertEqual(self.unread_count(), 2)
+
+    def test_fan_out_and_reconcile_repair_counters(self):
+        baker.make(Notification, user=self.user, is_read=False)
+        self.assertEqual(self.unread_count(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            fan_out_notifications([self.user.pk], 'Hello', 'Hi')
+        self.assertEqual(self.unread_count(), 2)
+
+        Notification.objects.filter(user=self.user).update(is_read=True)  # bypasses the counter
+        out = StringIO()
+        call_command('reconcile_unread_counts', stdout=out)
+        self.assertIn('1 had drifted', out.getvalue())
+        self.assertEqual(self.unread_count(), 0)
+
+
+class NotificationListQueryTests(APITestCase):
+    def setUp(self):
+        self.user = baker.make(User, role='freelancer')
+        self.client.force_authenticate(self.user)
+
+    def make_notifications(self, count):
+        employer = baker.make(User, role='employer')
+        for _ in range(count):
+            job = baker.make(Job, employer=employer)
+            review = baker.make(Review, job=job, reviewer=employer, reviewee=self.user, rating=4)
+            baker.make(Notification, user=self.user, related_object=job)
+            baker.make(Notification, user=self.user, related_object=review)
+            baker.make(Notification, user=self.user, related_object=baker.make(Badge))
+            baker.make(Notification, user=self.user)
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('notification-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx.captured_queries)
+
+    def test_related_objects_are_batch_loaded(self):
+        self.make_notifications(2)
+        response, few = self.list_queries()
+        self.make_notifications(10)
+        response, many = self.list_queries()
+        self.assertEqual(few, many)
+        # Each review also triggers its own "new review" notification
+        self.assertEqual(len(response.data), 60)
+        review_items = [n['related_object'] for n in response.data if n['related_object'] and n['related_object']['type'] == 'Review']
+        self.assertEqual(len(review_items), 24)
+        self.assertTrue(all(item['job_title'] for item in review_items))
+
+
+@override_settings(NOTIFICATION_STREAM_HEARTBEAT_SECONDS=1)
+class NotificationStreamTests(APITestCase):
+    def setUp(self):
+        self.user = baker.make(User, role='freelancer')
+        self.token = str(AccessToken.for_user(self.user))
+        self.first = baker.make(Notification, user=self.user, title='First')
+        self.second = baker.make(Notification, user=self.user, title='Second')
+        self.second.created_at = self.first.created_at + timedelta(seconds=1)
+        self.second.save(update_fields=['created_at'])
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('notification-stream'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refused_under_wsgi(self):
+        response = self.client.get(reverse('notification-stream'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    def test_fan_out_skips_users_without_streams(self):
+        with patch('hustlehub.services.notification_bus.notification_event') as event:
+            fan_out_notifications([self.user.pk], 'Hello', 'Hi')
+        event.assert_not_called()
+
+    async def test_replays_missed_events_then_streams_new_ones(self):
+        response = await self.async_client.get(
+            reverse('notification-stream'),
+            headers={'Authorization': f'Bearer {self.token}', 'Last-Event-ID': str(self.first.pk)},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(frames)).startswith(b'retry:'))
+            replayed = await anext(frames)
+            self.assertIn(f'id: {self.second.pk}'.encode(), replayed)
+            self.assertIn(b'"Second"', replayed)
+
+            live = await sync_to_async(baker.make)(Notification, user=self.user, title='Live')
+            await sync_to_async(publish_notification)(live)
+            frame = await anext(frames)
+            self.assertIn(f'id: {live.pk}'.encode(), frame)
+            self.assertEqual(json.loads(frame.decode().split('data: ', 1)[1])['title'], 'Live')
+        finally:
+            await frames.aclose()
+
+
+class NotificationDigestTests(APITestCase):
+    def setUp(self):
+        self.employer = baker.make(User, role='employer')
+        self.freelancer = baker.make(User, role='freelancer')
+
+    def respond(self, status_value, count=1):
+        for _ in range(count):
+            job = baker.make(Job, employer=self.employer, title='Paint a wall')
+            baker.make(JobApplication, job=job, freelancer=self.freelancer, status=status_value)
+
+    def test_rejections_are_coalesced_per_window(self):
+        self.respond('accepted')
+        self.respond('rejected', count=3)
+        self.assertEqual(Notification.objects.filter(user=self.freelancer).count(), 1)
+        self.assertEqual(NotificationDigestEntry.objects.filter(user=self.freelancer).count(), 3)
+
+        self.assertEqual(flush_notification_digests(window_minutes=15), (0, 0))
+        NotificationDigestEntry.objects.update(created_at=timezone.now() - timedelta(minutes=20))
+        out = StringIO()
+        call_command('flush_notification_digests', stdout=out)
+        self.assertIn('Delivered 3 pending entries as 1 digest notifications', out.getvalue())
+
+        digest = Notification.objects.get(user=self.freelancer, title='You have 3 new updates')
+        self.assertEqual(digest.type, 'job_update')
+        self.assertEqual(digest.message.count('Paint a wall'), 3)
+        self.assertFalse(NotificationDigestEntry.objects.exists())
+
+    def test_application_updates_setting_mutes_notifications(self):
+        NotificationSettings.objects.create(user=self.freelancer, application_updates=False)
+        self.respond('accepted')
+        self.respond('rejected')
+        self.assertFalse(Notification.objects.filter(user=self.freelancer).exists())
+        self.assertFalse(NotificationDigestEntry.objects.exists())
+
+
+class MarkAllReadTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = baker.make(User, role='freelancer')
+        self.client.force_authenticate(self.user)
+        self.notifications = baker.make(Notification, user=self.user, is_read=False, _quantity=5)
+
+    def unread_count(self):
+        return self.client.get(reverse('notification-unread-count')).data['unread_count']
+
+    def test_mark_selected_by_uuid(self):
+        ids = [str(n.pk) for n in self.notifications[:2]]
+        response = self.client.post(reverse('notification-mark-as-read'), {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.unread_count(), 3)
+
+        response = self.client.post(reverse('notification-mark-as-read'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_mark_all_moves_watermark_without_rewriting_rows(self):
+        response = self.client.post(reverse('notification-mark-as-read'), {'all': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Notification.objects.filter(user=self.user, is_read=False).count(), 5)
+        self.assertEqual(self.unread_count(), 0)
+        cache.clear()
+        self.assertEqual(self.unread_count(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(Notification, user=self.user, title='Fresh')
+        self.assertEqual(self.unread_count(), 1)
+        listed = {n['title']: n['is_read'] for n in self.client.get(reverse('notification-list')).data}
+        self.assertFalse(listed.pop('Fresh'))
+        self.assertTrue(all(listed.values()))
+
+    def test_marking_unread_under_watermark_materializes_it(self):
+        self.client.post(reverse('notification-mark-as-read'), {'all': True}, format='json')
+        target = self.notifications[0]
+        response = self.client.patch(reverse('notification-detail', kwargs={'pk': target.pk}), {'is_read': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['is_read'])
+        self.assertEqual(self.unread_count(), 1)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.notifications_read_until)
+
+
+class NotificationRetentionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = baker.make(User, role='freelancer')
+        old = timezone.now() - timedelta(days=120)
+        self.old_read = baker.make(Notification, user=self.user, is_read=True)
+        self.old_unread = baker.make(Notification, user=self.user, is_read=False)
+        self.recent_read = baker.make(Notification, user=self.user, is_read=True)
+        Notification.objects.filter(pk__in=[self.old_read.pk, self.old_unread.pk]).update(created_at=old)
+
+    def test_prunes_only_old_read_notifications(self):
+        out = StringIO()
+        call_command('prune_notifications', '--dry-run', stdout=out)
+        self.assertIn('1 notifications are eligible', out.getvalue())
+
+        call_command('prune_notifications', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(
+            set(Notification.objects.values_list('pk', flat=True)),
+            {self.old_unread.pk, self.recent_read.pk},
+        )
+
+    def test_watermark_read_and_expired_unread_are_pruned(self):
+        User.objects.filter(pk=self.user.pk).update(notifications_read_until=timezone.now() - timedelta(days=100))
+        call_command('prune_notifications', stdout=StringIO())
+        self.assertEqual(list(Notification.objects.values_list('pk', flat=True)), [self.recent_read.pk])
+
+        baker.make(Notification, user=self.user, is_read=False)
+        Notification.objects.update(created_at=timezone.now() - timedelta(days=400))
+        call_command('prune_notifications', '--unread-older-than-days', '365', stdout=StringIO())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_prune_deletes_each_batch_in_one_statement(self):
+        baker.make(Notification, user=self.user, is_read=True, _quantity=20)
+        Notification.objects.update(created_at=timezone.now() - timedelta(days=400))
+        self.assertEqual(get_unread_count(self.user), 1)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            prune_notifications(unread_older_than_days=365)
+        # Two candidate reads (the batch, then the empty one that ends the loop) and one
+        # DELETE; deleting through the ORM would also load the rows for post_delete
+        table_queries = [q['sql'] for q in queries.captured_queries if 'hustlehub_notification' in q['sql']]
+        self.assertEqual([sql.split()[0] for sql in table_queries], ['SELECT', 'DELETE', 'SELECT'])
+        self.assertEqual(get_unread_count(self.user), 0)
+
+
+class LeaderboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = {
+            xp: baker.make(User, role='freelancer', xp_points=xp)
+            for xp in (900, 700, 500, 300, 100)
+        }
+        self.tied = baker.make(User, role='freelancer', xp_points=500)
+
+    def test_top_users_share_rank_on_ties(self):
+        response = self.client.get(reverse('leaderboard'), {'limit': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ranks = [(entry['xp_points'], entry['rank']) for entry in response.data['results']]
+        self.assertEqual(ranks, [(900, 1), (700, 2), (500, 3), (500, 3)])
+
+    def test_around_me_window(self):
+        me = self.users[300]
+        self.client.force_authenticate(me)
+        response = self.client.get(reverse('leaderboard-me'), {'radius': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rank'], 5)
+        self.assertEqual(
+            [(entry['xp_points'], entry['rank']) for entry in response.data['results']],
+            [(500, 3), (300, 5), (100, 6)],
+        )
+
+        me.add_xp(1000)
+        response = self.client.get(reverse('leaderboard-me'), {'radius': 1})
+        self.assertEqual(response.data['rank'], 1)
+        self.assertEqual(response.data['results'][0]['id'], str(me.pk))
+
+
+class PeriodLeaderboardTests(APITestCase):
+    def setUp(self):
+        self.nairobi = baker.make(County, name='Nairobi')
+        self.mombasa = baker.make(County, name='Mombasa')
+        self.alice = baker.make(User, role='freelancer')
+        self.bob = baker.make(User, role='freelancer')
+
+    def award(self, user, points, county=None):
+        job = baker.make(Job, county=county) if county else None
+        return XPLog.objects.create(user=user, points=points, source_job=job)
+
+    def board(self, **params):
+        response = self.client.get(reverse('leaderboard'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(entry['id'], entry['period_xp'], entry['rank']) for entry in response.data['results']]
+
+    def test_rollups_track_each_award(self):
+        self.award(self.alice, 50, self.nairobi)
+        self.award(self.alice, 30, self.mombasa)
+        self.award(self.bob, 60, self.nairobi)
+        old = self.award(self.bob, 500)
+        XPLog.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+
+        alice, bob = str(self.alice.pk), str(self.bob.pk)
+        self.assertEqual(self.board(period='week'), [(bob, 560, 1), (alice, 80, 2)])
+        self.assertEqual(self.board(period='week', county=str(self.nairobi.pk)), [(bob, 60, 1), (alice, 50, 2)])
+        self.assertEqual(self.board(county=str(self.mombasa.pk)), [(alice, 30, 1)])
+
+        # The backdated award only moves out of the current week after a rebuild from the ledger
+        call_command('rebuild_xp_rollups', stdout=StringIO())
+        self.assertEqual(self.board(period='month'), [(alice, 80, 1), (bob, 60, 2)])
+        self.assertEqual(self.board(period='all_time', county=str(self.nairobi.pk)), [(bob, 60, 1), (alice, 50, 2)])
+        self.assertEqual(XPRollup.objects.get(user=self.bob, period_type='all_time', county=None).xp, 560)
+
+    def test_rejects_unknown_period_or_county(self):
+        self.assertEqual(self.client.get(reverse('leaderboard'), {'period': 'year'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('leaderboard'), {'county': 'nope'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class XPAwardTests(APITestCase):
+    def setUp(self):
+        # Rows from earlier tests are rolled back without Badge signals, so drop the registry's version
+        cache.clear()
+
+    def test_level_for_xp_matches_thresholds(self):
+        self.assertEqual([level_for_xp(xp) for xp in (0, 99, 100, 249, 250, 9500, 100000)], [1, 1, 2, 2, 3, 20, 20])
+
+    def test_award_uses_database_total_and_awards_skipped_badges(self):
+        user = baker.make(User, role='freelancer')
+        stale = User.objects.get(pk=user.pk)
+        award_xp(user, 80)
+        award_xp(stale, 200)  # an out-of-date copy must not lose the first award
+
+        user.refresh_from_db()
+        self.assertEqual((user.xp_points, user.level), (280, 3))
+        self.assertEqual((stale.xp_points, stale.level), (280, 3))
+        self.assertEqual(
+            set(UserBadge.objects.filter(user=user).values_list('badge__name', flat=True)),
+            {'Hustle Initiate', 'Skill Sprinter'},
+        )
+        self.assertEqual(Notification.objects.filter(user=user, type='level_up').count(), 1)
+        self.assertEqual(XPLog.objects.filter(user=user).count(), 2)
+
+    def test_bulk_award(self):
+        users = baker.make(User, role='freelancer', _quantity=3)
+        with CaptureQueriesContext(connection) as few:
+            bulk_award_xp({users[0].pk: 50, str(users[1].pk): 50, users[2].pk: 500})
+        crowd = baker.make(User, role='freelancer', _quantity=30)
+        with CaptureQueriesContext(connection) as many:
+            bulk_award_xp({user.pk: 500 if index == 0 else 50 for index, user in enumerate(crowd)})
+        self.assertLessEqual(len(many.captured_queries), len(few.captured_queries))
+        self.assertEqual(
+            sorted(User.objects.filter(pk__in=[u.pk for u in users]).values_list('xp_points', 'level')),
+            [(50, 1), (50, 1), (500, 4)],
+        )
+        self.assertEqual(UserBadge.objects.filter(user=users[2]).count(), 3)
+        self.assertEqual(XPLog.objects.count(), 33)
+        self.assertEqual(XPRollup.objects.get(user=users[2], period_type='week', county=None).xp, 500)
+
+    def test_profile_save_with_stale_user_keeps_awarded_xp(self):
+        user = baker.make(User, role='freelancer')
+        stale = User.objects.get(pk=user.pk)
+        award_xp(User.objects.get(pk=user.pk), 150)
+        credit_loyalty_points(user, 30, 'job')
+
+        self.client.force_authenticate(stale)
+        response = self.client.patch(reverse('user-me'), {'bio': 'Painter'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertEqual((user.bio, user.xp_points, user.level, user.loyalty_points), ('Painter', 150, 2, 30))
+
+    def test_level_up_notifications_wait_for_commit(self):
+        user = baker.make(User, role='freelancer')
+        with patch('hustlehub.services.notification_service.publish_notifications') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    award_xp(user, 150)
+                    raise RuntimeError
+            publish.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                award_xp(user, 150)
+            publish.assert_called_once()
+
+    @override_settings(BACKGROUND_TASKS_EAGER=True)
+    def test_admin_award_action_uses_bulk_award(self):
+        admin_user = User.objects.create_superuser(email='root@example.com', password='pw', full_name='Root', username='root')
+        users = baker.make(User, role='freelancer', _quantity=2)
+        self.client.force_login(admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:hustlehub_user_changelist'), {'action': 'award_xp', '_selected_action': [str(u.pk) for u in users]})
+        self.assertEqual(list(User.objects.filter(pk__in=[u.pk for u in users]).values_list('xp_points', flat=True)), [50, 50])
+
+
+class BadgeRegistryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = baker.make(User, role='freelancer')
+
+    def test_gamification_paths_skip_the_badge_table(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            badge_registry.level_badges(range(1, 6))
+        achievement = Badge.objects.create(name='Job Completionist', description='25 jobs', badge_type='achievement')
+        self.assertEqual(badge_registry.get_by_name('Job Completionist'), achievement)
+
+        with CaptureQueriesContext(connection) as ctx:
+            award_xp(self.user, 450)
+            UserBadge.objects.create(user=self.user, badge=achievement)
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "hustlehub_badge"' in q['sql']])
+        self.assertEqual(self.user.level, 4)
+        self.assertTrue(Notification.objects.filter(user=self.user, type='badge_unlock', title='New Badge Unlocked!').exists())
+
+    def test_badge_writes_refresh_the_registry(self):
+        badge = Badge.objects.create(name='Community Helper', description='Helpful', badge_type='achievement')
+        self.assertEqual(badge_registry.get(badge.pk).description, 'Helpful')
+        badge.description = 'Very helpful'
+        badge.save()
+        self.assertEqual(badge_registry.get(badge.pk).description, 'Very helpful')
+        badge.delete()
+        self.assertIsNone(badge_registry.get_by_name('Community Helper'))
+
+    def test_stale_registry_does_not_duplicate_level_badges(self):
+        badge_registry.all()  # load a copy with no level badges
+        # Written without signals, as by another process whose invalidation never arrived
+        Badge.objects.bulk_create([Badge(name='Hustle Initiate', badge_type='level')])
+        existing = Badge.objects.get(name='Hustle Initiate')
+        self.assertEqual(badge_registry.level_badges({2}), {2: existing})
+        self.assertEqual(Badge.objects.filter(name='Hustle Initiate').count(), 1)
+
+        award_xp(self.user, 150)
+        self.assertEqual(Badge.objects.filter(name='Hustle Initiate').count(), 1)
+        self.assertTrue(UserBadge.objects.filter(user=self.user, badge=existing).exists())
+
+
+class AchievementRuleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = baker.make(User, role='employer')
+        self.freelancer = baker.make(User, role='freelancer')
+
+    def counter(self, name):
+        return AchievementCounter.objects.get(user=self.freelancer, counter=name).value
+
+    def review(self, rating):
+        baker.make(Review, job=baker.make(Job, employer=self.employer), reviewer=self.employer, reviewee=self.freelancer, rating=rating)
+
+    def test_five_star_streak_resets_and_awards_on_crossing(self):
+        for rating in (5, 5, 5, 4, 5, 5, 5, 5):
+            self.review(rating)
+        self.assertEqual(self.counter('five_star_streak'), 4)
+        self.assertFalse(UserBadge.objects.filter(user=self.freelancer, badge__name='5-Star Streak').exists())
+
+        self.review(5)
+        badge = UserBadge.objects.get(user=self.freelancer, badge__name='5-Star Streak').badge
+        self.assertEqual(badge.badge_type, 'achievement')
+        self.assertTrue(Notification.objects.filter(user=self.freelancer, type='badge_unlock').exists())
+        self.assertEqual(self.counter('five_star_reviews'), 8)
+
+    def test_seed_badges_after_achievement_award(self):
+        call_command('seed_badges', stdout=StringIO())
+        level_badge = Badge.objects.get(name='5-Star Streak', badge_type='level')
+        for _ in range(5):
+            self.review(5)
+        # The rule awards its own achievement badge, which seed_badges leaves alone
+        call_command('seed_badges', stdout=StringIO())
+        achievement = Badge.objects.get(name='5-Star Streak', badge_type='achievement')
+        self.assertEqual(Badge.objects.filter(name='5-Star Streak').count(), 2)
+        self.assertTrue(UserBadge.objects.filter(user=self.freelancer, badge=achievement).exists())
+        self.assertFalse(UserBadge.objects.filter(user=self.freelancer, badge=level_badge).exists())
+        self.assertTrue(Notification.objects.filter(user=self.freelancer, type='badge_unlock', object_id=str(achievement.pk)).exists())
+
+    def test_acceptance_counts_once_per_transition(self):
+        applications = [baker.make(JobApplication, freelancer=self.freelancer, job=baker.make(Job, employer=self.employer)) for _ in range(10)]
+        for application in applications[:9]:
+            application.status = 'accepted'
+            application.save()
+            application.save()
+        self.assertEqual(self.counter('jobs_won'), 9)
+
+        reloaded = JobApplication.objects.get(pk=applications[0].pk)
+        reloaded.save()
+        applications[9].status = 'accepted'
+        applications[9].save()
+        self.assertEqual(self.counter('jobs_won'), 10)
+        self.assertTrue(UserBadge.objects.filter(user=self.freelancer, badge__name='Client Magnet').exists())
+
+
+class RecomputeGamificationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.drifted = baker.make(User, role='freelancer', email='drift@example.com', xp_points=999, level=5)
+        self.correct = baker.make(User, role='freelancer')
+        award_xp(self.correct, 120)
+        XPLog.objects.create(user=self.drifted, points=260)
+
+    def test_dry_run_reports_then_fix_applies(self):
+        out = StringIO()
+        call_command('recompute_gamification', '--dry-run', stdout=out)
+        self.assertIn('drift@example.com: xp_points 999 -> 260; level 5 -> 3; missing badges: Hustle Initiate, Skill Sprinter', out.getvalue())
+        self.assertIn('1 users would change', out.getvalue())
+        self.drifted.refresh_from_db()
+        self.assertEqual(self.drifted.xp_points, 999)
+
+        call_command('recompute_gamification', '--chunk-size', '1', stdout=StringIO())
+        self.drifted.refresh_from_db()
+        self.assertEqual((self.drifted.xp_points, self.drifted.level), (260, 3))
+        self.assertEqual(UserBadge.objects.filter(user=self.drifted, badge__badge_type='level').count(), 2)
+        out = StringIO()
+        call_command('recompute_gamification', '--dry-run', stdout=out)
+        self.assertIn('0 users would change', out.getvalue())
+
+    def test_user_id_ranges_cover_every_user_once(self):
+        baker.make(User, _quantity=7)
+        ranges = user_id_ranges(3)
+        self.assertEqual(len(ranges), 3)
+        covered = []
+        for lower, upper in ranges:
+            users = User.objects.all()
+            if lower is not None:
+                users = users.filter(pk__gte=lower)
+            if upper is not None:
+                users = users.filter(pk__lt=upper)
+            covered.extend(users.values_list('pk', flat=True))
+        self.assertEqual(sorted(covered), sorted(User.objects.values_list('pk', flat=True)))
+
+
+class LoyaltyBalanceTests(APITestCase):
+    def setUp(self):
+        self.user = baker.make(User, role='freelancer')
+        self.client.force_authenticate(user=self.user)
+
+    def test_ledger_writes_move_the_balance(self):
+        credit_loyalty_points(self.user, 100, 'referral')
+        others = baker.make(User, _quantity=3)
+        bulk_credit_loyalty_points(User.objects.filter(pk__in=[u.pk for u in others]), 50, 'admin_credit', chunk_size=2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.loyalty_points, 100)
+        self.assertEqual(sorted(User.objects.filter(pk__in=[u.pk for u in others]).values_list('loyalty_points', flat=True)), [50, 50, 50])
+
+        LoyaltyPointLog.objects.filter(user=self.user).delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.loyalty_points, 0)
+
+    def test_redeem_cannot_overdraw(self):
+        credit_loyalty_points(self.user, 80, 'job')
+        self.assertEqual(redeem_loyalty_points(self.user, 30), 50)
+        with self.assertRaises(InsufficientLoyaltyPoints):
+            redeem_loyalty_points(self.user, 51)
+
+        response = self.client.post(reverse('loyaltypointlog-redeem'), {'points': 60})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('loyaltypointlog-redeem'), {'points': 50})
+        self.assertEqual(response.data['balance'], 0)
+        response = self.client.get(reverse('loyaltypointlog-balance'))
+        self.assertEqual(response.data['balance'], 0)
+        self.assertEqual(LoyaltyPointLog.objects.filter(user=self.user, source='redemption').count(), 2)
+
+    def test_verify_reports_and_fixes_drift(self):
+        credit_loyalty_points(self.user, 40, 'job')
+        User.objects.filter(pk=self.user.pk).update(loyalty_points=999)
+        out = StringIO()
+        call_command('verify_loyalty_balances', stdout=out)
+        self.assertIn(f'{self.user.pk}: stored 999, ledger 40', out.getvalue())
+
+        call_command('verify_loyalty_balances', '--fix', stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.loyalty_points, 40)
+        out = StringIO()
+        call_command('recompute_gamification', '--dry-run', stdout=out)
+        self.assertIn('0 users would change', out.getvalue())
+
+        User.objects.filter(pk=self.user.pk).update(loyalty_points=5)
+        call_command('recompute_gamification', stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.loyalty_points, 40)
+
+
+class CommissionSummaryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.freelancer = baker.make(User, role='freelancer')
+        self.employer = baker.make(User, role='employer')
+        today = date.today()
+        for days, amount in [(-10, 30), (-2, 20), (5, 50)]:
+            job = baker.make(Job, employer=self.employer)
+            baker.make(JobApplication, job=job, freelancer=self.freelancer, status='accepted')
+            baker.make(CommissionLog, job=job, status='due', due_date=today + timedelta(days=days),
+                       total_amount=amount * 5, commission_amount=amount, freelancer_earning=amount * 4)
+        self.client.force_authenticate(self.freelancer)
+
+    def test_freelancer_is_stored_on_the_commission(self):
+        self.assertEqual(CommissionLog.objects.filter(freelancer=self.freelancer).count(), 3)
+
+        job = baker.make(Job, employer=self.employer)
+        commission = baker.make(CommissionLog, job=job, total_amount=10, commission_amount=2, freelancer_earning=8)
+        self.assertIsNone(commission.freelancer_id)
+        baker.make(JobApplication, job=job, freelancer=self.freelancer, status='accepted')
+        commission.refresh_from_db()
+        self.assertEqual(commission.freelancer_id, self.freelancer.id)
+
+    def test_dashboard_reports_overdue_commissions(self):
+        response = self.client.get(reverse('dashboard-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['commission_due_amount']), Decimal('50'))
+        self.assertEqual(response.data['commission_days_left'], -10)
+        self.assertTrue(response.data['commission_is_suspended'])
+        self.assertTrue(response.data['can_submit_excuse'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(CommissionExcuse, user=self.freelancer, status='pending')
+        response = self.client.get(reverse('dashboard-stats'))
+        self.assertFalse(response.data['commission_is_suspended'])
+        self.assertFalse(response.data['can_submit_excuse'])
+
+
+
+class OverdueSweepTests(APITestCase):
+    def setUp(self):
+        self.freelancer = baker.make(User, role='freelancer')
+        self.employer = baker.make(User, role='employer')
+        job = baker.make(Job, employer=self.employer)
+        baker.make(JobApplication, job=job, freelancer=self.freelancer, status='accepted')
+        # Not overdue yet when logged, so only the sweep can notice it falling due
+        self.commission = baker.make(CommissionLog, job=job, status='due', due_date=date.today() + timedelta(days=3),
+                                     total_amount=100, commission_amount=20, freelancer_earning=80)
+        self.open_job = baker.make(Job, employer=self.employer, status='open')
+        self.client.force_authenticate(self.freelancer)
+
+    def apply(self):
+        return self.client.post(reverse('jobapplication-list'), {'job': self.open_job.id, 'cover_letter': 'Hi'})
+
+    def test_sweep_suspends_and_blocks_applications(self):
+        CommissionLog.objects.filter(pk=self.commission.pk).update(due_date=date.today() - timedelta(days=1))
+        out = StringIO()
+        call_command('sweep_overdue_commissions', stdout=out)
+        self.assertIn('Updated 1 account standings; 1 suspended, 0 reinstated.', out.getvalue())
+        standing = AccountStanding.objects.get(user=self.freelancer)
+        self.assertEqual((standing.amount_overdue, standing.overdue_count, standing.is_suspended), (Decimal('20'), 1, True))
+        self.assertTrue(Notification.objects.filter(user=self.freelancer, title='Account Suspended').exists())
+
+        self.assertEqual(self.apply().status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse('dashboard-stats'))
+        self.assertTrue(response.data['commission_is_suspended'])
+        self.assertEqual(response.data['commission_days_left'], -1)
+
+        # A second sweep changes nothing and sends nothing
+        call_command('sweep_overdue_commissions', stdout=StringIO())
+        self.assertEqual(Notification.objects.filter(user=self.freelancer, title='Account Suspended').count(), 1)
+
+    def test_excuse_and_payment_lift_the_suspension(self):
+        CommissionLog.objects.filter(pk=self.commission.pk).update(due_date=date.today() - timedelta(days=1))
+        call_command('sweep_overdue_commissions', stdout=StringIO())
+
+        excuse = baker.make(CommissionExcuse, user=self.freelancer, commission=self.commission, status='pending')
+        standing = AccountStanding.objects.get(user=self.freelancer)
+        self.assertEqual((standing.excuse_status, standing.is_suspended), ('pending', False))
+
+        excuse.delete()
+        self.assertTrue(AccountStanding.objects.get(user=self.freelancer).is_suspended)
+        self.commission.refresh_from_db()
+        self.commission.status = 'paid'
+        self.commission.save()
+        standing = AccountStanding.objects.get(user=self.freelancer)
+        self.assertEqual((standing.amount_overdue, standing.is_suspended), (Decimal('0'), False))
+        self.assertTrue(Notification.objects.filter(user=self.freelancer, title='Account Reinstated').exists())
+
+    def test_admin_excuse_review_updates_standing(self):
+        CommissionLog.objects.filter(pk=self.commission.pk).update(due_date=date.today() - timedelta(days=1))
+        call_command('sweep_overdue_commissions', stdout=StringIO())
+        excuse = baker.make(CommissionExcuse, user=self.freelancer, commission=self.commission, status='pending')
+        self.assertFalse(AccountStanding.objects.get(user=self.freelancer).is_suspended)
+
+        admin_user = User.objects.create_superuser(email='root@example.com', password='pw', full_name='Root', username='root')
+        self.client.force_login(admin_user)
+        url = reverse('admin:hustlehub_commissionexcuse_changelist')
+        # Filtered on status, as an admin working through the pending queue would be
+        response = self.client.post(f'{url}?status__exact=pending', {'action': 'reject_excuses', '_selected_action': [str(excuse.pk)]})
+        self.assertEqual(response.status_code, 302)
+        standing = AccountStanding.objects.get(user=self.freelancer)
+        self.assertEqual((standing.excuse_status, standing.is_suspended), ('none', True))
+        self.assertTrue(Notification.objects.filter(user=self.freelancer, title='Commission Excuse Rejected').exists())
+        self.client.force_authenticate(self.freelancer)
+        self.assertEqual(self.apply().status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(admin_user)
+        self.client.post(url, {'action': 'approve_excuses', '_selected_action': [str(excuse.pk)]})
+        standing = AccountStanding.objects.get(user=self.freelancer)
+        self.assertEqual((standing.excuse_status, standing.is_suspended), ('approved', False))
+
+    def test_sweep_clears_standings_with_nothing_overdue(self):
+        AccountStanding.objects.create(user=self.freelancer, amount_overdue=20, overdue_count=1, is_suspended=True)
+        AccountStanding.objects.filter(user=self.freelancer).update(updated_at=timezone.now() - timedelta(days=1))
+        out = StringIO()
+        call_command('sweep_overdue_commissions', stdout=out)
+        self.assertIn('0 suspended, 1 reinstated', out.getvalue())
+        self.assertFalse(AccountStanding.objects.get(user=self.freelancer).is_suspended)
+
+
+class CommissionExportTests(APITestCase):
+    def setUp(self):
+        self.admin = baker.make(User, role='admin')
+        self.freelancer = baker.make(User, role='freelancer')
+        employer = baker.make(User, role='employer')
+        for index, (commission_status, days_ago) in enumerate([('paid', 40), ('due', 10), ('due', 2)]):
+            job = baker.make(Job, employer=employer, title=f'Job, number {index}')
+            baker.make(JobApplication, job=job, freelancer=self.freelancer, status='accepted')
+            baker.make(CommissionLog, job=job, status=commission_status, completion_date=date.today() - timedelta(days=days_ago),
+                       total_amount=100, commission_amount=20, freelancer_earning=80)
+        other_job = baker.make(Job, employer=employer, title='Someone else')
+        baker.make(CommissionLog, job=other_job, status='paid', total_amount=50, commission_amount=10, freelancer_earning=40)
+
+    def export(self, **params):
+        response = self.client.get(reverse('commissionlog-export'), params)
+        return response, b''.join(response.streaming_content).decode() if response.status_code == 200 else None
+
+    def test_admin_exports_every_commission_as_csv(self):
+        self.client.force_authenticate(self.admin)
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('commissions.csv', response['Content-Disposition'])
+        lines = body.splitlines()
+        self.assertTrue(lines[0].startswith('id,job,job_title,freelancer,'))
+        self.assertEqual(len(lines), 5)
+        self.assertIn('"Job, number 0"', body)
+
+    def test_csv_neutralizes_formula_titles(self):
+        Job.objects.filter(title='Someone else').update(title='=HYPERLINK("http://x","y")')
+        Job.objects.filter(title='Job, number 1').update(title='-2+3')
+        self.client.force_authenticate(self.admin)
+        _, body = self.export()
+        titles = {row['job_title'] for row in csv.DictReader(StringIO(body))}
+        self.assertEqual(titles, {'Job, number 0', 'Job, number 2', '\'=HYPERLINK("http://x","y")', "'-2+3"})
+        # JSON Lines is not opened by spreadsheets and keeps the raw value
+        _, body = self.export(export_format='jsonl')
+        self.assertIn('-2+3', [json.loads(line)['job_title'] for line in body.splitlines()])
+
+    def test_freelancer_exports_filtered_jsonl(self):
+        self.client.force_authenticate(self.freelancer)
+        response, body = self.export(export_format='jsonl', status='due', date_from=(date.today() - timedelta(days=5)).isoformat())
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['job_title'] for row in rows], ['Job, number 2'])
+        self.assertEqual(rows[0]['commission_amount'], '20.00')
+
+        response, _ = self.export(date_from='2024-02-01', date_to='2024-01-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response, _ = self.export(export_format='xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FinanceRollupTests(APITestCase):
+    def setUp(self):
+        self.admin = baker.make(User, role='admin')
+        self.nairobi = baker.make(County, name='Nairobi')
+        self.mombasa = baker.make(County, name='Mombasa')
+        self.design = baker.make(JobCategory, name='Design')
+        self.today = date.today()
+        self.first = self.log_commission(self.nairobi, self.design, 'due', 1000, 200)
+        self.log_commission(self.nairobi, None, 'paid', 500, 100)
+        self.log_commission(self.mombasa, self.design, 'paid', 300, 60, days_ago=3)
+
+    def log_commission(self, county, category, commission_status, total, commission, days_ago=0):
+        job = baker.make(Job, county=county, category=category, status='closed')
+        return CommissionLog.objects.create(
+            job=job, status=commission_status, total_amount=total, commission_amount=commission,
+            freelancer_earning=total - commission, completion_date=self.today - timedelta(days=days_ago),
+        )
+
+    def rollup_snapshot(self):
+        return sorted(
+            DailyFinanceRollup.objects.filter(commission_count__gt=0).values_list(
+                'day', 'county', 'category', 'commission_count', 'gross_amount', 'commission_due', 'commission_paid', 'freelancer_earnings'
+            ),
+            key=str,
+        )
+
+    def test_writes_keep_rollups_in_step_with_a_rebuild(self):
+        row = DailyFinanceRollup.objects.get(day=self.today, county=self.nairobi, category=self.design)
+        self.assertEqual((row.commission_count, row.commission_due, row.commission_paid), (1, Decimal('200'), Decimal('0')))
+
+        commission = CommissionLog.objects.get(pk=self.first.pk)
+        commission.status = 'paid'
+        commission.save()
+        row.refresh_from_db()
+        self.assertEqual((row.commission_count, row.commission_due, row.commission_paid), (1, Decimal('0'), Decimal('200')))
+
+        CommissionLog.objects.filter(job__county=self.mombasa).delete()
+        incremental = self.rollup_snapshot()
+        call_command('rebuild_finance_rollups', stdout=StringIO())
+        self.assertEqual(self.rollup_snapshot(), incremental)
+
+    def test_archived_commissions_stay_counted(self):
+        Job.objects.update(created_at=timezone.now() - timedelta(days=365))
+        CommissionLog.objects.filter(pk=self.first.pk).update(status='paid')
+        call_command('rebuild_finance_rollups', stdout=StringIO())
+        before = self.rollup_snapshot()
+        call_command('archive_jobs', stdout=StringIO())
+        self.assertFalse(CommissionLog.objects.exists())
+        self.assertEqual(self.rollup_snapshot(), before)
+        call_command('rebuild_finance_rollups', stdout=StringIO())
+        self.assertEqual(self.rollup_snapshot(), before)
+
+    def test_analytics_endpoint_groups_rollups(self):
+        url = reverse('finance-analytics')
+        self.client.force_authenticate(baker.make(User, role='freelancer'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(url, {'group_by': 'county'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_county = {row['county__name']: row for row in response.data['results']}
+        self.assertEqual(by_county['Nairobi']['commission_count'], 2)
+        self.assertEqual(by_county['Nairobi']['commission_due'], Decimal('200'))
+        self.assertEqual(by_county['Nairobi']['commission_paid'], Decimal('100'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'date_from': self.today.isoformat(), 'category': str(self.design.pk)})
+        self.assertEqual([(row['day'], row['gross_amount']) for row in response.data['results']], [(self.today, Decimal('1000'))])
+
+
+class DashboardCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.freelancer = baker.make(User, role='freelancer')
+        self.client.force_authenticate(self.freelancer)
+        self.url = reverse('dashboard-stats')
+
+    def test_unchanged_dashboard_is_served_from_cache(self):
+        self.assertFalse(self.client.get(self.url).data['has_portfolio'])
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertFalse(response.data['has_portfolio'])
+
+    def test_write_paths_bump_the_generation(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(PortfolioItem, user=self.freelancer)
+        self.assertTrue(self.client.get(self.url).data['has_portfolio'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(JobApplication, freelancer=self.freelancer, status='pending')
+        self.assertEqual(self.client.get(self.url).data['active_applications_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_award_xp({self.freelancer.pk: 150})
+        self.freelancer.refresh_from_db()
+        self.client.force_authenticate(self.freelancer)
+        self.assertEqual(self.client.get(self.url).data['current_xp'], 150)
+
+    def test_closing_a_job_bumps_its_freelancers(self):
+        job = baker.make(Job, status='open')
+        baker.make(JobApplication, job=job, freelancer=self.freelancer, status='accepted')
+        self.assertEqual(self.client.get(self.url).data['completed_jobs_count'], 0)
+
+        job = Job.objects.get(pk=job.pk)
+        job.status = 'closed'
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(self.client.get(self.url).data['completed_jobs_count'], 1)
+
+    def test_other_users_writes_leave_the_snapshot_alone(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(PortfolioItem, user=baker.make(User))
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+class BulkDashboardStatsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = baker.make(User, role='admin')
+        self.url = reverse('dashboard-stats-bulk')
+
+    def make_freelancer(self, xp):
+        freelancer = baker.make(User, role='freelancer')
+        award_xp(freelancer, xp)
+        baker.make(JobApplication, freelancer=freelancer, status='pending')
+        baker.make(JobApplication, freelancer=freelancer, job__status='closed', status='accepted')
+        baker.make(PortfolioItem, user=freelancer)
+        return freelancer
+
+    def test_matches_the_single_user_dashboard(self):
+        freelancers = [self.make_freelancer(xp) for xp in (50, 150, 150)]
+        self.client.force_authenticate(freelancers[1])
+        single = self.client.get(reverse('dashboard-stats')).data
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(self.url, {'user_ids': [str(f.pk) for f in freelancers]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {row['user_id']: row for row in response.data['results']}
+        bulk = dict(results[str(freelancers[1].pk)])
+        bulk.pop('user_id')
+        self.assertEqual(bulk, dict(single))
+        self.assertIsNone(results[str(freelancers[0].pk)]['recommended_jobs_count'])
+        self.assertEqual(results[str(freelancers[0].pk)]['leaderboard_rank'], 3)
+        self.assertEqual(results[str(freelancers[2].pk)]['active_applications_count'], 1)
+        self.assertEqual(results[str(freelancers[2].pk)]['completed_jobs_count'], 1)
+
+    def test_stale_snapshot_is_not_reported(self):
+        freelancer = self.make_freelancer(50)
+        self.client.force_authenticate(freelancer)
+        self.client.get(reverse('dashboard-stats'))
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(PortfolioItem, user=freelancer)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(self.url, {'user_ids': [str(freelancer.pk)]}, format='json')
+        self.assertIsNone(response.data['results'][0]['recommended_jobs_count'])
+
+    def test_query_count_does_not_grow_with_users(self):
+        self.client.force_authenticate(self.admin)
+        few = [str(self.make_freelancer(xp).pk) for xp in (10, 20)]
+        many = few + [str(self.make_freelancer(xp).pk) for xp in (30, 40, 50, 60)]
+        badge_registry.all()  # load the catalogue outside the measured requests
+        with CaptureQueriesContext(connection) as few_queries:
+            self.client.post(self.url, {'user_ids': few}, format='json')
+        with CaptureQueriesContext(connection) as many_queries:
+            response = self.client.post(self.url, {'user_ids': many}, format='json')
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual(len(many_queries), len(few_queries))
+
+    def test_badge_catalogue_is_checked_once_per_batch(self):
+        freelancers = [self.make_freelancer(xp) for xp in (10, 20, 30)]
+        for freelancer in freelancers:
+            for badge in baker.make(Badge, _quantity=2):
+                baker.make(UserBadge, user=freelancer, badge=badge)
+        badge_registry.all()
+        with patch('hustlehub.services.badge_registry.cache', wraps=cache) as registry_cache:
+            stats = bulk_dashboard_stats([f.pk for f in freelancers])
+        self.assertEqual(registry_cache.get.call_count, 1)
+        self.assertEqual(len(stats[freelancers[0].pk]['latest_badges']), 2)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(baker.make(User, role='freelancer'))
+        response = self.client.post(self.url, {'user_ids': [str(self.admin.pk)]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -7,7 +7,9 @@ from .views import (
     BadgeViewSet, UserBadgeViewSet, XPLogViewSet, ReferralViewSet, LoyaltyPointLogViewSet,
     NotificationSettingsViewSet, ReviewViewSet, AboutUsViewSet, RecommendedJobsView,
     CountyViewSet, SubCountyViewSet, WardViewSet, NeighborhoodTagViewSet, LocationListView,
-    PasswordResetRequestView, PasswordResetConfirmView, DashboardStatsView
+    PasswordResetRequestView, PasswordResetConfirmView, DashboardStatsView, SavedSearchViewSet,
+    NotificationStreamView, LeaderboardView, LeaderboardAroundMeView, FinanceAnalyticsView,
+    BulkDashboardStatsView
 )
 
 router = DefaultRouter()
@@ -29,6 +31,7 @@ router.register(r'xp-logs', XPLogViewSet, basename='xplog')
 router.register(r'referrals', ReferralViewSet, basename='referral')
 router.register(r'loyalty-point-logs', LoyaltyPointLogViewSet, basename='loyaltypointlog')
 router.register(r'notification-settings', NotificationSettingsViewSet, basename='notificationsettings')
+router.register(r'saved-searches', SavedSearchViewSet, basename='savedsearch')
 router.register(r'reviews', ReviewViewSet)
 router.register(r'about-us', AboutUsViewSet)
 router.register(r'counties', CountyViewSet)
@@ -40,6 +43,8 @@ router.register(r'neighborhood-tags', NeighborhoodTagViewSet)
 urlpatterns = [
     # Explicitly define /users/me/ before including the router to ensure it takes precedence
     path('users/me/', AuthViewSet.as_view({'get': 'me', 'patch': 'me'}), name='user-me'),
+    # Likewise keep the notification stream ahead of the router's notifications/<pk>/ route
+    path('notifications/stream/', NotificationStreamView.as_view(), name='notification-stream'),
     path('', include(router.urls)),
 
     # Preserving existing non-router paths
@@ -55,4 +60,8 @@ urlpatterns = [
 
     # New dashboard stats endpoint
     path('dashboard-stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('dashboard-stats/bulk/', BulkDashboardStatsView.as_view(), name='dashboard-stats-bulk'),
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
+    path('leaderboard/me/', LeaderboardAroundMeView.as_view(), name='leaderboard-me'),
+    path('analytics/finance/', FinanceAnalyticsView.as_view(), name='finance-analytics'),
 ]
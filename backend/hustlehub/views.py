@@ -10,27 +10,55 @@ from .serializers import (
     CommissionExcuseSerializer, BadgeSerializer, UserBadgeSerializer, XPLogSerializer, ReferralSerializer,
     LoyaltyPointLogSerializer, NotificationSettingsSerializer, ReviewSerializer, AboutUsSerializer,
     CountySerializer, SubCountySerializer, WardSerializer, NeighborhoodTagSerializer, PasswordResetRequestSerializer,
-    PasswordResetConfirmSerializer, DashboardStatsSerializer, DashboardStatsBadgeSerializer, UserUpdateSerializer
+    PasswordResetConfirmSerializer, DashboardStatsSerializer, DashboardStatsBadgeSerializer, UserUpdateSerializer,
+    SavedSearchSerializer, JobApplicationHistorySerializer, CommissionHistorySerializer, RelatedObjectSerializer,
+    LeaderboardEntrySerializer, PeriodLeaderboardEntrySerializer, RedeemLoyaltyPointsSerializer,
+    CommissionExportQuerySerializer, FinanceAnalyticsQuerySerializer, BulkDashboardStatsSerializer,
+    BulkDashboardStatsRequestSerializer
 )
 from .models import (
     User, Notification, JobCategory, Job, JobApplication, SkillBarterPost,
     SkillBarterApplication, SkillBarterOffer, PortfolioItem, CommissionLog,
     CommissionExcuse, Badge, UserBadge, XPLog, Referral, LoyaltyPointLog,
-    NotificationSettings, Review, AboutUs, County, SubCounty, Ward, NeighborhoodTag, LEVEL_THRESHOLDS
+    NotificationSettings, Review, AboutUs, County, SubCounty, Ward, NeighborhoodTag, SavedSearch
 )
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import AuthenticationFailed # Import AuthenticationFailed
-from django.db.models import Q, Sum
+from rest_framework.exceptions import ValidationError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from django.shortcuts import get_object_or_404
-from .permissions import IsOwnerOrReadOnly, IsAdminUserOrReadOnly, IsEmployerOrAdmin, IsFreelancerOrAdmin
+from .permissions import IsOwnerOrReadOnly, IsAdminUserOrReadOnly, IsEmployerOrAdmin, IsFreelancerOrAdmin, IsInGoodStanding, IsAdmin
 from .services.matching_service import get_ai_job_matches # Import the matching service
+from .services.geo_service import parse_near, filter_within_radius, filter_freelancers_near
+from .services.facet_service import get_cached_job_facets
+from .services.archive_service import application_history, commission_history
+from .services.notification_counters import get_unread_count, adjust_unread_count, invalidate_unread_counts, unread_q
+from .services.notification_service import mark_all_notifications_read, materialize_read_watermark
+from .services.leaderboard_service import get_rank, top_users, users_around, MAX_LEADERBOARD_LIMIT
+from .services.xp_rollup_service import period_leaderboard, PERIOD_TYPES
+from .services.badge_registry import badge_registry
+from .services.loyalty_service import redeem_loyalty_points, InsufficientLoyaltyPoints
+from .services.commission_service import get_account_standing
+from .services.finance_rollup_service import finance_summary
+from .services.dashboard_service import (
+    get_cached_dashboard, bulk_dashboard_stats, commission_stats, completed_job_counts, xp_needed_for_next_level
+)
+from .services.export_service import filter_commissions, stream_export, EXPORT_FORMATS, COMMISSION_EXPORT_COLUMNS
 from django.core.mail import send_mail
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
-from datetime import date, timedelta
 from django.db.models import Avg
 from rest_framework import filters
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from .services.notification_bus import notification_stream
 
 
 class AuthViewSet(viewsets.ViewSet):
@@ -150,9 +178,20 @@ class UserViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_remote=is_remote)
 
         # Order by average_rating (descending) and then date_joined (descending)
-        queryset = queryset.annotate(avg_rating=Avg('received_reviews__rating')).order_by('-avg_rating', '-date_joined')
-        
-        return queryset
+        queryset = queryset.annotate(avg_rating=Avg('received_reviews__rating'))
+        ordering = ['-avg_rating', '-date_joined']
+
+        # Radius search: ?near=lat,lng&radius_km= matches service areas near the point, nearest first
+        near = self.request.query_params.get('near')
+        if near:
+            try:
+                lat, lng, radius_km = parse_near(near, self.request.query_params.get('radius_km'))
+            except ValueError as e:
+                raise ValidationError({'near': str(e)})
+            queryset = filter_freelancers_near(queryset, lat, lng, radius_km)
+            ordering.insert(0, 'distance_km')
+
+        return queryset.order_by(*ordering)
     
     def get_permissions(self):
         if self.action in ['retrieve', 'list']:
@@ -166,28 +205,89 @@ class NotificationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user).order_by('-created_at')
+        queryset = self.queryset.filter(user=self.request.user).order_by('-created_at')
+        if self.action in ['list', 'retrieve']:
+            # Load related objects with one IN query per content type rather than one per row
+            queryset = queryset.prefetch_related(
+                GenericPrefetch('related_object', RelatedObjectSerializer.prefetch_querysets())
+            )
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_update(self, serializer):
+        user = self.request.user
+        if serializer.validated_data.get('is_read') is False and serializer.instance.is_read_for(user.notifications_read_until):
+            # Marking unread beneath the mark-all-read watermark needs per-row state again
+            materialize_read_watermark(user)
+        serializer.save()
+        # is_read may have flipped either way; let the counter be recomputed
+        invalidate_unread_counts([user.pk])
+
     @action(detail=False, methods=['post'], url_path='mark-as-read')
     def mark_as_read(self, request):
         serializer = MarkNotificationsAsReadSerializer(data=request.data)
         if serializer.is_valid():
+            if serializer.validated_data['all']:
+                mark_all_notifications_read(request.user)
+                return Response({'message': 'All notifications marked as read.'}, status=status.HTTP_200_OK)
+
             notification_ids = serializer.validated_data['ids']
             # Ensure user can only mark their own notifications as read
-            notifications_to_update = self.get_queryset().filter(id__in=notification_ids)
-            count = notifications_to_update.update(is_read=True);
+            notifications_to_update = self.get_queryset().filter(
+                unread_q(request.user.notifications_read_until), id__in=notification_ids
+            )
+            count = notifications_to_update.update(is_read=True)
+            adjust_unread_count(request.user.pk, -count)
             return Response({'message': f'{count} notifications marked as read.'}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        count = self.get_queryset().filter(is_read=False).count()
+        # Served from the per-user cached counter
+        count = get_unread_count(request.user)
         return Response({'unread_count': count}, status=status.HTTP_200_OK)
 
 
+def authenticate_stream_request(request):
+    """
+    Resolves the user for a stream request from a Bearer access token, or from ?token=
+    because browsers' EventSource cannot send an Authorization header.
+    """
+    jwt_auth = JWTAuthentication()
+    header = jwt_auth.get_header(request)
+    raw_token = jwt_auth.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        return jwt_auth.get_user(jwt_auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+class NotificationStreamView(View):
+    """
+    Server-Sent Events stream of the user's new notifications, replacing polling.
+    Served asynchronously, so run the project under an ASGI server (hustlehub_project.asgi).
+    Under WSGI Django would buffer the never-ending stream and hold a worker forever, so
+    the request is refused there. Reconnecting clients send Last-Event-ID and receive
+    what they missed.
+    """
+    async def get(self, request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'detail': 'Notification streaming requires an ASGI server.'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        user = await sync_to_async(authenticate_stream_request)(request)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        response = StreamingHttpResponse(notification_stream(user.pk, last_event_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
 class JobCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = JobCategory.objects.all()
     serializer_class = JobCategorySerializer
@@ -228,7 +328,16 @@ class JobViewSet(viewsets.ModelViewSet):
         ward_id = self.request.query_params.get('area') # Map 'area' to ward for Job filtering
         if ward_id:
             queryset = queryset.filter(ward__id=ward_id)
-        
+
+        # Radius search: ?near=lat,lng&radius_km= returns jobs ordered by distance
+        near = self.request.query_params.get('near')
+        if near:
+            try:
+                lat, lng, radius_km = parse_near(near, self.request.query_params.get('radius_km'))
+            except ValueError as e:
+                raise ValidationError({'near': str(e)})
+            queryset = filter_within_radius(queryset, lat, lng, radius_km)
+
         return queryset.filter(status='open') # Only show open jobs by default, unless specific employer filter is applied
 
 
@@ -236,9 +345,15 @@ class JobViewSet(viewsets.ModelViewSet):
         serializer.save(employer=self.request.user)
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'facets']:
             return [AllowAny()]
         return [IsAuthenticated(), IsOwnerOrReadOnly()]
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        # Counts per category, county, job type and budget band for the same filters as the list
+        facets = get_cached_job_facets(self.get_queryset(), request.query_params)
+        return Response(facets, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_listings(self, request):
@@ -286,6 +401,11 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
             return self.queryset.filter(Q(freelancer=self.request.user) | Q(job__employer=self.request.user))
         return self.queryset.none() # No applications for unauthenticated users
 
+    def get_permissions(self):
+        if self.action == 'create':
+            return [IsAuthenticated(), IsInGoodStanding()]
+        return super().get_permissions()
+
     def perform_create(self, serializer):
         # Ensure the applicant is the current user
         serializer.save(freelancer=self.request.user)
@@ -299,6 +419,15 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(applications, many=True)
         return Response({"applications": serializer.data}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def history(self, request):
+        # Includes applications whose jobs have been moved to the archive tables
+        if request.user.role != 'freelancer':
+            return Response({"detail": "Only freelancers can view their application history."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = JobApplicationHistorySerializer(application_history(request.user), many=True, context=self.get_serializer_context())
+        return Response({"applications": serializer.data}, status=status.HTTP_200_OK)
+
 
 class SkillBarterPostViewSet(viewsets.ModelViewSet):
     queryset = SkillBarterPost.objects.all()
@@ -375,26 +504,35 @@ class CommissionLogViewSet(viewsets.ReadOnlyModelViewSet):
             if user.role == 'employer':
                 return self.queryset.filter(job__employer=user)
             elif user.role == 'freelancer':
-                # Freelancers can see commission logs for jobs they applied to and were accepted
-                return self.queryset.filter(job__applications__freelancer=user, job__applications__status='accepted')
+                # Freelancers can see commission logs for jobs they were accepted on
+                return self.queryset.filter(freelancer=user)
             elif user.role == 'admin':
                 return self.queryset.all()
         return self.queryset.none()
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export(self, request):
+        # Streams the commission logs visible to the user as CSV or JSON Lines, without loading them all
+        serializer = CommissionExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        queryset = filter_commissions(
+            self.get_queryset(), status=params.get('status'),
+            date_from=params.get('date_from'), date_to=params.get('date_to'),
+        )
+        content_type, extension = EXPORT_FORMATS[params['export_format']]
+        response = StreamingHttpResponse(
+            stream_export(queryset, COMMISSION_EXPORT_COLUMNS, params['export_format']),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="commissions.{extension}"'
+        return response
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def history(self, request):
-        if request.user.role == 'freelancer':
-            commission_logs = self.get_queryset().filter(
-                job__applications__freelancer=request.user,
-                job__applications__status='accepted'
-            ).order_by('-completion_date')
-            serializer = self.get_serializer(commission_logs, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        elif request.user.role == 'employer':
-            commission_logs = self.get_queryset().filter(
-                job__employer=request.user
-            ).order_by('-completion_date')
-            serializer = self.get_serializer(commission_logs, many=True)
+        # Reads live and archived commission logs through one API
+        if request.user.role in ['freelancer', 'employer']:
+            serializer = CommissionHistorySerializer(commission_history(request.user), many=True, context=self.get_serializer_context())
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response({"detail": "You do not have permission to view this."}, status=status.HTTP_403_FORBIDDEN)
 
@@ -454,6 +592,21 @@ class LoyaltyPointLogViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user).order_by('-created_at')
 
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        balance = User.objects.values_list('loyalty_points', flat=True).get(pk=request.user.pk)
+        return Response({'balance': balance}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def redeem(self, request):
+        serializer = RedeemLoyaltyPointsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            balance = redeem_loyalty_points(request.user, serializer.validated_data['points'])
+        except InsufficientLoyaltyPoints as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'balance': balance}, status=status.HTTP_200_OK)
+
 
 class NotificationSettingsViewSet(viewsets.ModelViewSet):
     queryset = NotificationSettings.objects.all()
@@ -467,6 +620,18 @@ class NotificationSettingsViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    queryset = SavedSearch.objects.all()
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
 class ReviewViewSet(viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
@@ -587,10 +752,100 @@ class LocationListView(generics.GenericAPIView):
             
         return Response(data, status=status.HTTP_200_OK)
 
+class LeaderboardView(generics.GenericAPIView):
+    """
+    Top users by XP. ?limit= sets how many (default 10, max 100). ?period=week|month and/or
+    ?county=<id> switch to XP earned in the current period / from jobs in that county,
+    read from the XP rollup table.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = LeaderboardEntrySerializer
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        period = request.query_params.get('period', 'all_time')
+        county_id = request.query_params.get('county')
+        if period not in PERIOD_TYPES:
+            return Response({'error': f"period must be one of {', '.join(PERIOD_TYPES)}."}, status=status.HTTP_400_BAD_REQUEST)
+        if period == 'all_time' and not county_id:
+            serializer = self.get_serializer(top_users(limit), many=True)
+            return Response({'results': serializer.data}, status=status.HTTP_200_OK)
+
+        try:
+            county_known = not county_id or County.objects.filter(pk=county_id).exists()
+        except DjangoValidationError:
+            county_known = False
+        if not county_known:
+            return Response({'error': 'Unknown county.'}, status=status.HTTP_400_BAD_REQUEST)
+        users = []
+        for row in period_leaderboard(period, county_id=county_id, limit=max(1, min(limit, MAX_LEADERBOARD_LIMIT))):
+            row.user.rank, row.user.period_xp = row.rank, row.xp
+            users.append(row.user)
+        serializer = PeriodLeaderboardEntrySerializer(users, many=True, context=self.get_serializer_context())
+        return Response({'period': period, 'county': county_id, 'results': serializer.data}, status=status.HTTP_200_OK)
+
+
+class BulkDashboardStatsView(generics.GenericAPIView):
+    """
+    Dashboard stats for up to 200 users in one request, for admin and support tooling. POST {"user_ids": [...]}; the cost is a fixed number of grouped queries.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    serializer_class = BulkDashboardStatsSerializer
+
+    def post(self, request, *args, **kwargs):
+        request_serializer = BulkDashboardStatsRequestSerializer(data=request.data)
+        request_serializer.is_valid(raise_exception=True)
+        stats = bulk_dashboard_stats(request_serializer.validated_data['user_ids'])
+        serializer = self.get_serializer([{'user_id': user_id, **data} for user_id, data in stats.items()], many=True)
+        return Response({'results': serializer.data}, status=status.HTTP_200_OK)
+
+
+class FinanceAnalyticsView(generics.GenericAPIView):
+    """
+    Commission and earnings totals for admins, grouped by ?group_by=day|county|category and
+    narrowed by ?date_from=, ?date_to=, ?county= and ?category=. Reads only the daily
+    finance rollups, never the commission tables.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        serializer = FinanceAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        results = finance_summary(
+            group_by=params['group_by'], date_from=params.get('date_from'), date_to=params.get('date_to'),
+            county_id=params.get('county'), category_id=params.get('category'),
+        )
+        return Response({'group_by': params['group_by'], 'results': results}, status=status.HTTP_200_OK)
+
+
+class LeaderboardAroundMeView(generics.GenericAPIView):
+    """The authenticated user's rank with up to ?radius= neighbours either side (default 5, max 25)."""
+    permission_classes = [IsAuthenticated]
+    serializer_class = LeaderboardEntrySerializer
+
+    def get(self, request, *args, **kwargs):
+        try:
+            radius = int(request.query_params.get('radius', 5))
+        except ValueError:
+            return Response({'error': 'radius must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(users_around(request.user, radius), many=True)
+        return Response({'rank': get_rank(request.user), 'results': serializer.data}, status=status.HTTP_200_OK)
+
+
 class DashboardStatsView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsFreelancerOrAdmin]
     serializer_class = DashboardStatsSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        # Served from the per-user snapshot until one of the user's write paths bumps its generation
+        data = get_cached_dashboard(request.user.pk, lambda: dict(self.get_serializer(self.get_object()).data))
+        return Response(data)
+
     def get_object(self):
         user = self.request.user
 
@@ -608,63 +863,23 @@ class DashboardStatsView(generics.RetrieveAPIView):
             status='pending'
         ).count()
 
-        # 3. Completed Jobs Count (assuming a job is completed if the application is accepted and job is closed)
-        completed_jobs_count = JobApplication.objects.filter(
-            freelancer=user,
-            status='accepted',
-            job__status='closed'
-        ).count()
+        # 3. Completed Jobs Count (accepted applications on closed jobs, archived ones included)
+        completed_jobs_count = completed_job_counts([user.pk])[user.pk]
 
         # 4. XP and Level
         level = user.level
         current_xp = user.xp_points
-        xp_needed_for_next_level = 0
-        if user.level < len(LEVEL_THRESHOLDS):
-            xp_needed_for_next_level = LEVEL_THRESHOLDS[user.level]
 
         # 5. Latest Badges
-        latest_badges_queryset = UserBadge.objects.filter(user=user).order_by('-awarded_at')[:3]
-        latest_badges_data = DashboardStatsBadgeSerializer([ub.badge for ub in latest_badges_queryset], many=True).data
-
-        # 6. Leaderboard Rank (placeholder - requires a proper ranking system)
-        # For simplicity, let's rank by XP points. This could be slow for many users.
-        higher_xp_users_count = User.objects.filter(xp_points__gt=user.xp_points).count()
-        leaderboard_rank = higher_xp_users_count + 1
-
-        # 7. Commission Details
-        commission_due = CommissionLog.objects.filter(
-            job__applications__freelancer=user, 
-            job__applications__status='accepted',
-            status='due',
-            due_date__lte=date.today() # Only consider overdue commissions
-        ).aggregate(Sum('commission_amount'))['commission_amount__sum'] or 0
-
-        commission_days_left = None
-        commission_is_suspended = False
-        can_submit_excuse = False
-
-        if commission_due > 0:
-            # Check for existing pending or approved excuse for any overdue commission
-            has_active_excuse = CommissionExcuse.objects.filter(
-                Q(user=user) & 
-                (Q(status='pending') | Q(status='approved'))
-            ).exists()
-            
-            can_submit_excuse = not has_active_excuse
-            commission_is_suspended = (commission_due > 0 and not has_active_excuse)
-
-            soonest_overdue_commission = CommissionLog.objects.filter(
-                job__applications__freelancer=user,
-                job__applications__status='accepted', 
-                status='due',
-                due_date__lte=date.today()
-            ).order_by('due_date').first()
-
-            if soonest_overdue_commission and soonest_overdue_commission.due_date:
-                days_diff = (soonest_overdue_commission.due_date - date.today()).days
-                commission_days_left = days_diff # Will be negative if overdue
-            else:
-                commission_days_left = 0 # No specific overdue commission found, but commission_due > 0 implies a general overdue status
+        latest_badge_ids = list(UserBadge.objects.filter(user=user).order_by('-awarded_at').values_list('badge_id', flat=True)[:3])
+        catalogue = badge_registry.get_many(latest_badge_ids)
+        latest_badges_data = DashboardStatsBadgeSerializer([catalogue[badge_id] for badge_id in latest_badge_ids if badge_id in catalogue], many=True).data
+
+        # 6. Leaderboard Rank, from the configured leaderboard backend
+        leaderboard_rank = get_rank(user)
+
+        # 7. Commission Details, from the materialized account standing
+        commission_details = commission_stats(get_account_standing(user))
 
         # 8. Has Portfolio
         has_portfolio = PortfolioItem.objects.filter(user=user).exists()
@@ -676,13 +891,10 @@ class DashboardStatsView(generics.RetrieveAPIView):
             'completed_jobs_count': completed_jobs_count,
             'level': level,
             'current_xp': current_xp,
-            'xp_needed_for_next_level': xp_needed_for_next_level,
+            'xp_needed_for_next_level': xp_needed_for_next_level(level),
             'latest_badges': latest_badges_data,
             'leaderboard_rank': leaderboard_rank,
-            'commission_due_amount': commission_due,
-            'commission_days_left': commission_days_left,
-            'commission_is_suspended': commission_is_suspended,
-            'can_submit_excuse': can_submit_excuse,
+            **commission_details,
             'has_portfolio': has_portfolio,
         }
         return dashboard_data
@@ -133,6 +133,21 @@ DATABASES = {
 }
 
 
+# Cache
+# Unread counters and other per-user caches must be shared by every worker process,
+# so point REDIS_URL at a Redis instance in production (requires the `redis` package).
+# Without it each process falls back to its own local-memory cache.
+
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -184,6 +199,31 @@ CORS_ALLOWED_ORIGINS = [
 # Set the frontend URL for password reset links, defaulting to your port 9002
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:9002')
 
+# Background work (notification fan-out etc.) runs on a small thread pool after commit.
+# Set BACKGROUND_TASKS_EAGER=true to run it inline instead.
+BACKGROUND_TASKS_EAGER = os.getenv('BACKGROUND_TASKS_EAGER', 'False').lower() == 'true'
+BACKGROUND_TASK_WORKERS = int(os.getenv('BACKGROUND_TASK_WORKERS', '2'))
+
+# Real-time notification push (/api/notifications/stream/). Streams stay open indefinitely,
+# so they are only served under ASGI (hustlehub_project.asgi, e.g. uvicorn or daphne); the
+# WSGI_APPLICATION above answers them with 501. Streams are held in-process; with several
+# worker processes set NOTIFICATION_BUS_BACKEND to a cross-process backend,
+# e.g. 'hustlehub.services.notification_bus.RedisNotificationBackend' (uses REDIS_URL).
+NOTIFICATION_BUS_BACKEND = os.getenv('NOTIFICATION_BUS_BACKEND') or None
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = int(os.getenv('NOTIFICATION_STREAM_HEARTBEAT_SECONDS', '15'))
+
+# Low-priority notifications (job alerts, rejections) are buffered and coalesced into one
+# digest notification per user per window by `manage.py flush_notification_digests`.
+NOTIFICATION_DIGEST_WINDOW_MINUTES = int(os.getenv('NOTIFICATION_DIGEST_WINDOW_MINUTES', '15'))
+
+# XP leaderboard. With REDIS_URL set it is a Redis sorted set with O(log n) rank lookups,
+# filled from the database on first use (`manage.py rebuild_leaderboard` refills it).
+# Without Redis, e.g. in local development, ranks are counted over the indexed
+# User.xp_points column, which slows as the user base grows.
+LEADERBOARD_BACKEND = os.getenv('LEADERBOARD_BACKEND') or (
+    'hustlehub.services.leaderboard_service.RedisLeaderboard' if REDIS_URL else None
+)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,